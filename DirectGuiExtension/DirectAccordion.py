@@ -0,0 +1,255 @@
+"""This module contains the DirectAccordion class."""
+
+__all__ = ['DirectAccordion']
+
+from bisect import bisect_left, bisect_right
+
+from panda3d.core import PGItem
+from direct.gui import DirectGuiGlobals as DGG
+from direct.gui.DirectFrame import DirectFrame
+from .DirectBoxSizer import DirectBoxSizer
+from . import DirectGuiHelper as DGH
+
+
+class DirectAccordion(DirectFrame):
+    """
+    A frame that stacks DirectCollapsibleFrame sections from top to bottom.
+    The heights of the sections are cached, so if one section gets
+    collapsed or extended, only the sections below it will be moved.
+    """
+
+    def __init__(self, parent = None, **kw):
+        self.skipInitRefresh = True
+        optiondefs = (
+            # Define type of DirectGuiWidget
+            ('pgFunc',         PGItem,      None),
+            ('numStates',      1,           None),
+            ('state',          DGG.NORMAL,  None),
+            ('borderWidth',    (0, 0),      self.setBorderWidth),
+
+            # Only allow one section to be extended at a time
+            ('exclusive',      False,       self.setExclusive),
+            # Only show the sections within the view range
+            ('virtualized',    False,       self.updateVisibleSections),
+            # The (top, bottom) range in which sections are visible if
+            # virtualized, e.g. the visible part of a scrolled frames canvas
+            ('viewRange',      (0, -2),     self.updateVisibleSections),
+            ('autoUpdateFrameSize', True,   None),
+
+            ('suppressMouse',  0,           None),
+            )
+
+        self.sections = []
+        # the cached height of every section and the distance of its top
+        # edge to the top of the accordion
+        self.sectionHeights = []
+        self.sectionOffsets = []
+        # gui ids of sections to their index
+        self.sectionIndex = {}
+        # gui ids of currently extended sections
+        self.extendedSections = set()
+        # the range of section indices that are currently not stashed
+        self.visibleRange = (0, 0)
+        self.maxSectionWidth = 0
+
+        # Merge keyword options with default options
+        self.defineoptions(kw, optiondefs)
+
+        # Initialize superclasses
+        DirectFrame.__init__(self, parent)
+
+        # Call option initialization functions
+        self.initialiseoptions(DirectAccordion)
+
+        self.skipInitRefresh = False
+        # initialize once at the end
+        self.refresh()
+
+    def addSection(self, section, skipRefresh=False):
+        """
+        Add the given DirectCollapsibleFrame to the bottom of the accordion
+        """
+        section.reparentTo(self)
+        section.accordionTop = DGH.getRealTop(section)
+        section.accordionLeft = DGH.getRealLeft(section)
+        section.accordionWidth = DGH.getRealWidth(section)
+        self.maxSectionWidth = max(self.maxSectionWidth, section.accordionWidth)
+
+        index = len(self.sections)
+        self.sections.append(section)
+        self.sectionIndex[section.guiId] = index
+        if self.sectionOffsets:
+            offset = self.sectionOffsets[-1] + self.sectionHeights[-1]
+        else:
+            offset = 0
+        self.sectionOffsets.append(offset)
+        self.sectionHeights.append(DGH.getRealHeight(section))
+
+        self.accept(section.getExtendedEvent(), self.__sectionExtended, [section])
+        self.accept(section.getCollapsedEvent(), self.__sectionCollapsed, [section])
+        if not section['collapsed']:
+            self.extendedSections.add(section.guiId)
+
+        if skipRefresh:
+            return
+        if self['exclusive'] and not section['collapsed']:
+            self.__collapseOthers(section)
+        self.__placeSection(index)
+        self.__updateFrameSize()
+        self.updateVisibleSections()
+
+    def removeSection(self, section, refresh=True):
+        """
+        Remove the given section from the accordion
+        """
+        index = self.sectionIndex.pop(section.guiId, None)
+        if index is None:
+            return 0
+        self.ignore(section.getExtendedEvent())
+        self.ignore(section.getCollapsedEvent())
+        self.extendedSections.discard(section.guiId)
+        del self.sections[index]
+        del self.sectionHeights[index]
+        del self.sectionOffsets[index]
+        for i in range(index, len(self.sections)):
+            self.sectionIndex[self.sections[i].guiId] = i
+        section.unstash()
+        if refresh:
+            self.refresh()
+        return 1
+
+    def removeAllSections(self, refresh=True):
+        """
+        Remove all sections from the accordion
+        """
+        for section in list(self.sections):
+            self.removeSection(section, refresh=False)
+        if refresh:
+            self.refresh()
+
+    def refresh(self):
+        """
+        Recalculate the offsets of all sections from their cached heights and
+        place them accordingly.
+        """
+        if self.skipInitRefresh: return
+
+        self.maxSectionWidth = max(
+            [section.accordionWidth for section in self.sections], default=0)
+        offset = 0
+        for i, height in enumerate(self.sectionHeights):
+            self.sectionOffsets[i] = offset
+            offset += height
+        if self['virtualized']:
+            for section in self.sections:
+                section.stash()
+        self.visibleRange = (0, 0)
+        self.__updateFrameSize()
+        # place and show all sections that are visible
+        self.updateVisibleSections()
+
+    def updateItemSize(self, section):
+        """
+        Called by the sections whenever their size changed, e.g. while being
+        collapsed or extended. Moves all sections below the given one.
+        """
+        if self.skipInitRefresh: return
+        index = self.sectionIndex.get(section.guiId)
+        if index is None:
+            return
+        height = DGH.getRealHeight(section)
+        delta = height - self.sectionHeights[index]
+        if delta == 0:
+            return
+        self.sectionHeights[index] = height
+
+        first, last = self.visibleRange
+        for i in range(index + 1, len(self.sections)):
+            self.sectionOffsets[i] += delta
+            if not self['virtualized'] or first <= i < last:
+                self.sections[i].setZ(self.sections[i].getZ() - delta)
+
+        self.__updateFrameSize()
+        self.updateVisibleSections()
+
+    def __placeSection(self, index):
+        section = self.sections[index]
+        section.setPos(
+            -section.accordionLeft, 0,
+            -self.sectionOffsets[index] - section.accordionTop)
+
+    def __updateFrameSize(self):
+        if not self["autoUpdateFrameSize"]:
+            return
+        width = self.maxSectionWidth
+        if self.sectionOffsets:
+            height = self.sectionOffsets[-1] + self.sectionHeights[-1]
+        else:
+            height = 0
+        oldFrameSize = self["frameSize"]
+        self["frameSize"] = (0, width, -height, 0)
+
+        if oldFrameSize is not None and oldFrameSize[2] != -height:
+            # let an enclosing sizer know about our new size
+            parent = DGH.getParentWidget(self)
+            if isinstance(parent, DirectBoxSizer):
+                parent.updateItemSize(self)
+
+    def updateVisibleSections(self):
+        """
+        Stash all sections outside of the view range and place and show the
+        ones that moved into it if the accordion is virtualized.
+        """
+        if self.skipInitRefresh: return
+        oldFirst, oldLast = self.visibleRange
+        if self['virtualized']:
+            top, bottom = self['viewRange']
+            first = max(bisect_right(self.sectionOffsets, -top) - 1, 0)
+            last = bisect_left(self.sectionOffsets, -bottom)
+        else:
+            first, last = 0, len(self.sections)
+        if (first, last) == (oldFirst, oldLast):
+            return
+
+        # only the sections at the changed ends of the range get touched
+        for i in range(oldFirst, min(oldLast, first)):
+            self.sections[i].stash()
+        for i in range(max(oldFirst, last), oldLast):
+            self.sections[i].stash()
+        for i in range(first, min(last, oldFirst)):
+            self.__showSection(i)
+        for i in range(max(first, oldLast), last):
+            self.__showSection(i)
+        self.visibleRange = (first, last)
+
+    def __showSection(self, index):
+        # stashed sections haven't been moved, place them now
+        self.__placeSection(index)
+        self.sections[index].unstash()
+
+    def setExclusive(self):
+        """Collapse all but the first extended section in exclusive mode"""
+        if not self['exclusive'] or len(self.extendedSections) < 2:
+            return
+        for section in self.sections:
+            if section.guiId in self.extendedSections:
+                self.__collapseOthers(section)
+                break
+
+    def __collapseOthers(self, section):
+        for guiId in list(self.extendedSections):
+            if guiId == section.guiId:
+                continue
+            other = self.sections[self.sectionIndex[guiId]]
+            other['collapsed'] = True
+
+    def __sectionExtended(self, section):
+        self.extendedSections.add(section.guiId)
+        if self['exclusive']:
+            self.__collapseOthers(section)
+
+    def __sectionCollapsed(self, section):
+        self.extendedSections.discard(section.guiId)
+
+    def getSections(self):
+        return list(self.sections)
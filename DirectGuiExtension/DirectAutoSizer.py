@@ -3,7 +3,7 @@
 __all__ = ['DirectAutoSizer']
 
 import inspect
-from panda3d.core import *
+from panda3d.core import BoundingVolume, LPoint3, LVecBase3f
 from direct.gui import DirectGuiGlobals as DGG
 from direct.gui.DirectFrame import DirectFrame
 from direct.gui.DirectGuiBase import DirectGuiWidget
@@ -28,6 +28,14 @@ class DirectAutoSizer(DirectFrame):
 
             ('suppressMouse',  0,           None),
             )
+
+        # available sizes to the measured (frame, child frame size)
+        self.measureCache = {}
+        # the result of the last measure call which arrange will use
+        self.measured = None
+        self.needsArrange = False
+        self.arrangedFrameSize = None
+
         # Merge keyword options with default options
         self.defineoptions(kw, optiondefs)
 
@@ -88,6 +96,82 @@ class DirectAutoSizer(DirectFrame):
         if self.child is None:
             return
 
+        self.invalidateMeasure()
+        self.measure()
+        self.arrange()
+
+    #
+    # MEASURE AND ARRANGE
+    #
+    def measure(self, availableSize=None):
+        """
+        Calculate the frame the child will be resized to from the size of the
+        parent and return the real frame (left, right, bottom, top) of this
+        sizer. The result is cached until invalidateMeasure is called.
+        """
+        if availableSize is not None:
+            availableSize = tuple(availableSize)
+        cached = self.measureCache.get(availableSize)
+        if cached is not None:
+            self.measured = cached
+            return cached[0]
+
+        if self.child is None:
+            return (
+                DGH.getRealLeft(self), DGH.getRealRight(self),
+                DGH.getRealBottom(self), DGH.getRealTop(self))
+
+        childFrameSize = self.__get_child_frame_size(self.__get_parent_size())
+        scale = self.getScale()
+        desired = (
+            childFrameSize[0] * scale[0], childFrameSize[1] * scale[0],
+            childFrameSize[2] * scale[1], childFrameSize[3] * scale[1])
+
+        self.measured = (desired, childFrameSize)
+        self.measureCache[availableSize] = self.measured
+        self.needsArrange = True
+        return desired
+
+    def arrange(self, frameSize=None):
+        """
+        Resize the child to the measured frame or, if given, to fill the
+        given frame size instead of the parent.
+        """
+        if self.child is None:
+            return
+        if self.measured is None:
+            self.measure()
+        if not self.needsArrange and frameSize == self.arrangedFrameSize:
+            return
+
+        if frameSize is not None:
+            childFrameSize = self.__get_child_frame_size(frameSize)
+        else:
+            childFrameSize = self.measured[1]
+
+        # actual resizing of our child element
+        self.child["frameSize"] = childFrameSize
+        self["frameSize"] = self.child["frameSize"]
+
+        self.needsArrange = False
+        self.arrangedFrameSize = frameSize
+
+        base.messenger.send(self.getUpdateSizeEvent())
+        if self['childUpdateSizeFunc'] is not None:
+            self['childUpdateSizeFunc']()
+
+    def invalidateMeasure(self):
+        """
+        Drop the cached measurements of this sizer and the layout widgets
+        enclosing it, so they will measure again on their next refresh.
+        """
+        if not self.measureCache and self.measured is None: return
+        self.measureCache = {}
+        self.measured = None
+        DGH.invalidateParentMeasure(self)
+
+    def __get_parent_size(self):
+        """Returns the left, right, bottom and top edges to fill"""
         # store left/right/bottom/top
         l=r=b=t=0
 
@@ -130,6 +214,11 @@ class DirectAutoSizer(DirectFrame):
             r=ur.getX()
             b=ll.getZ()
             t=ur.getZ()
+        return l, r, b, t
+
+    def __get_child_frame_size(self, parentSize):
+        """Returns the frame size of the child to fill the given size"""
+        l, r, b, t = parentSize
 
         childSize = self.child['frameSize']
         if childSize is None:
@@ -171,13 +260,7 @@ class DirectAutoSizer(DirectFrame):
         b -= self.child.getZ()
         t += self.child.getZ()
 
-        # actual resizing of our child element
-        self.child["frameSize"] = [l/childScale.getX(),r/childScale.getX(),b/childScale.getZ(),t/childScale.getZ()]
-        self["frameSize"] = self.child["frameSize"]
-
-        base.messenger.send(self.getUpdateSizeEvent())
-        if self['childUpdateSizeFunc'] is not None:
-            self['childUpdateSizeFunc']()
+        return [l/childScale.getX(),r/childScale.getX(),b/childScale.getZ(),t/childScale.getZ()]
 
     def getUpdateSizeEvent(self):
         return self.uniqueName("update-size")
@@ -2,7 +2,7 @@
 
 __all__ = ['DirectBoxSizer']
 
-from panda3d.core import *
+from panda3d.core import PGItem
 from direct.gui import DirectGuiGlobals as DGG
 from direct.gui.DirectFrame import DirectFrame
 from . import DirectGuiHelper as DGH
@@ -17,8 +17,19 @@ class DirectItemContainer():
         self.updateFunc = None
         if "updateFunc" in kw:
             self.updateFunc = kw.get("updateFunc")
-
-class DirectBoxSizer(DirectFrame):
+        # position and size along the orientation of the sizer as placed by
+        # the last refresh
+        self.layoutStart = None
+        self.layoutSize = None
+        # share of the free space along the orientation of the sizer this
+        # item takes if there is some left (grow) or missing (shrink)
+        self.grow = kw.get("grow", 0)
+        self.shrink = kw.get("shrink", 0)
+        # the frame size the element had before it got grown or shrunk
+        self.flexResized = False
+        self.flexFrameSize = None
+
+class DirectBoxSizer(DGH.BakeMixin, DirectFrame):
     """
     A frame to add multiple other directGui elements to that will then be
     automatically be placed stacked next to each other.
@@ -48,9 +59,30 @@ class DirectBoxSizer(DirectFrame):
             ('itemMargin',     (0,0,0,0),   self.refresh),
             ('itemAlign',  self.A_Left|self.A_Top, self.refresh),
             ('autoUpdateFrameSize', True,   None),
+            # Let items flow onto new lines if they exceed the wrap size
+            ('wrap',           False,       self.refresh),
+            # The length of the lines in wrap mode. If None, the width or
+            # height of the frame will be used if autoUpdateFrameSize is
+            # disabled
+            ('wrapSize',       None,        self.refresh),
+
+            # Combine the visuals of non interactive widgets into a few
+            # batched geoms after every layout change
+            ('bake',           False,       self.setBake),
 
             ('suppressMouse',  0,           None),
             )
+
+        # available sizes to the measured (frame, layout data)
+        self.measureCache = {}
+        # the result of the last measure call which arrange will use
+        self.measured = None
+        self.needsArrange = False
+        self.arrangedFrameSize = None
+        # the node holding the baked visuals and the hidden originals
+        self.bakedNode = None
+        self.bakedStateDefs = []
+
         # Merge keyword options with default options
         self.defineoptions(kw, optiondefs)
 
@@ -105,14 +137,15 @@ class DirectBoxSizer(DirectFrame):
         """
         if not hasattr(self, "bounds"): return 0
 
+        frames = [DGH.measure(item.element) for item in self["items"]]
         if self['orientation'] == DGG.HORIZONTAL \
         or self['orientation'] == DGG.HORIZONTAL_INVERTED:
             # Horizontal
-            width = self.__get_items_width()
+            width = self.__get_items_width(frames)
             return DGH.getRealWidth(self) - width
         elif self['orientation'] == DGG.VERTICAL \
         or self['orientation'] == DGG.VERTICAL_INVERTED:
-            height = self.__get_items_height()
+            height = self.__get_items_height(frames)
             return DGH.getRealHeight(self) - height
 
     def refresh(self):
@@ -123,62 +156,475 @@ class DirectBoxSizer(DirectFrame):
         if self.skipInitRefresh: return
         # sanity check so we don't get here to early
         if not hasattr(self, "bounds") and not self["autoUpdateFrameSize"]: return
-        if len(self["items"]) == 0: return
+        if len(self["items"]) == 0:
+            # baked visuals of removed items have to go
+            self.invalidateBake()
+            return
+
+        self.invalidateMeasure()
+        self.measure()
+        self.arrange()
+
+    #
+    # MEASURE AND ARRANGE
+    #
+    def measure(self, availableSize=None):
+        """
+        Measure every item once and return the real frame (left, right,
+        bottom, top) this sizer wants to have. The available (width, height)
+        limits the line length in wrap mode if no wrapSize is set. The result
+        is cached until invalidateMeasure is called.
+        """
+        if availableSize is not None:
+            availableSize = tuple(availableSize)
+        cached = self.measureCache.get(availableSize)
+        if cached is not None:
+            self.measured = cached
+            return cached[0]
 
         for item in self["items"]:
+            if item.flexResized:
+                # measure grown and shrunk items at their original size
+                if item.flexFrameSize is not None:
+                    DGH.arrange(item.element, item.flexFrameSize)
+                else:
+                    item.element["frameSize"] = None
+                item.flexResized = False
             item.element.frameInitialiseFunc()
+        frames = [DGH.measure(item.element) for item in self["items"]]
+
+        lines = None
+        lineSizes = None
+        wrapSize = None
+        if self["wrap"] and frames:
+            wrapSize = self.__get_wrap_size(availableSize)
+            lines = self.__get_lines(frames, wrapSize)
+            lineSizes = [
+                max(self.__get_cross_size(frames[i]) for i in line)
+                for line in lines]
+            if wrapSize is None:
+                margin = self.__get_main_margin()
+                wrapSize = max(
+                    sum(self.__get_main_size(frames[i]) + margin for i in line)
+                    for line in lines)
+
+        frameSize = None
+        if self["autoUpdateFrameSize"] and frames:
+            if lines is None:
+                width = self.__get_items_width(frames)
+                height = self.__get_items_height(frames)
+                frameSize = self.__get_frame_size(width, height)
+            elif self.__is_vertical():
+                frameSize = self.__get_frame_size(sum(lineSizes), wrapSize)
+            else:
+                frameSize = self.__get_frame_size(wrapSize, sum(lineSizes))
+            scale = self.getScale()
+            desired = (
+                frameSize[0] * scale[0], frameSize[1] * scale[0],
+                frameSize[2] * scale[1], frameSize[3] * scale[1])
+        else:
+            desired = (
+                DGH.getRealLeft(self), DGH.getRealRight(self),
+                DGH.getRealBottom(self), DGH.getRealTop(self))
 
-        self.__refresh_frame_size()
+        self.measured = (desired, (frames, frameSize, lines, lineSizes, wrapSize))
+        self.measureCache[availableSize] = self.measured
+        self.needsArrange = True
+        return desired
 
-        #
-        # Update Item Positions
-        #
-        if self['orientation'] == DGG.HORIZONTAL:
-            # Horizontal - Left to Right placement
-            self.__refresh_horizontal_ltr()
-        elif self['orientation'] == DGG.HORIZONTAL_INVERTED:
-            # Horizontal - Right to Left
-            self.__refresh_horizontal_rtl()
-        elif self['orientation'] == DGG.VERTICAL:
-            # Vertical - Top to Bottom
-            self.__refresh_vertical_ttb()
-        elif self['orientation'] == DGG.VERTICAL_INVERTED:
-            # Vertical - Bottom to Top
-            self.__refresh_vertical_btt()
+    def arrange(self, frameSize=None):
+        """
+        Place all items using the sizes found by the last measure call without
+        measuring them again. If a frame size is given, the sizer will take
+        that size and grow or shrink its items to fill it, otherwise it takes
+        its measured size if autoUpdateFrameSize is set.
+        """
+        if self.measured is None:
+            self.measure()
+        if not self.needsArrange and frameSize == self.arrangedFrameSize:
+            return
+        self.invalidateBake()
+        DGH.invalidateParentBake(self)
+        frames, measuredFrameSize, lines, lineSizes, wrapSize = self.measured[1]
+        if not frames:
+            return
+
+        if frameSize is not None:
+            self["frameSize"] = frameSize
+        elif measuredFrameSize is not None:
+            self["frameSize"] = measuredFrameSize
+
+        # flexible items change their size, keep the measured ones intact
+        frames = list(frames)
+        if lines is not None:
+            for line in lines:
+                self.__apply_flex(line, frames, wrapSize)
+            self.__refresh_wrapped(frames, lines, lineSizes)
         else:
-            raise ValueError('Invalid value for orientation: %s' % (self['orientation']))
+            if frameSize is not None or not self["autoUpdateFrameSize"]:
+                # fill or fit the fixed frame with the flexible items
+                selfFrame = (
+                    DGH.getRealLeft(self), DGH.getRealRight(self),
+                    DGH.getRealBottom(self), DGH.getRealTop(self))
+                self.__apply_flex(
+                    range(len(frames)), frames, self.__get_main_size(selfFrame))
+
+            #
+            # Update Item Positions
+            #
+            if self['orientation'] == DGG.HORIZONTAL:
+                # Horizontal - Left to Right placement
+                self.__refresh_horizontal_ltr(frames)
+            elif self['orientation'] == DGG.HORIZONTAL_INVERTED:
+                # Horizontal - Right to Left
+                self.__refresh_horizontal_rtl(frames)
+            elif self['orientation'] == DGG.VERTICAL:
+                # Vertical - Top to Bottom
+                self.__refresh_vertical_ttb(frames)
+            elif self['orientation'] == DGG.VERTICAL_INVERTED:
+                # Vertical - Bottom to Top
+                self.__refresh_vertical_btt(frames)
+            else:
+                raise ValueError('Invalid value for orientation: %s' % (self['orientation']))
 
         for item in self["items"]:
+            if not item.flexResized:
+                # nested layout widgets place their own items
+                DGH.arrange(item.element)
             if item.updateFunc is not None:
                 item.updateFunc()
 
-    def __refresh_frame_size(self):
-        if not self["autoUpdateFrameSize"]:
+        self.needsArrange = False
+        self.arrangedFrameSize = frameSize
+
+    def invalidateMeasure(self):
+        """
+        Drop the cached measurements of this sizer and the layout widgets
+        enclosing it, so they will measure again on their next refresh.
+        """
+        if not self.measureCache and self.measured is None: return
+        self.measureCache = {}
+        self.measured = None
+        DGH.invalidateParentMeasure(self)
+
+    def destroy(self):
+        self.clearBake()
+        DirectFrame.destroy(self)
+
+    def updateItemSize(self, element):
+        """
+        Update the layout after the size of the given item changed along the
+        orientation of this sizer. Rather than measuring and placing all
+        items again, only the item itself gets placed and the items after it
+        will be moved by the size difference.
+        """
+        if self.skipInitRefresh: return
+        for index, item in enumerate(self["items"]):
+            if item.element == element:
+                break
+        else:
+            return
+        if item.layoutSize is None or self.measured is None or self["wrap"] \
+        or (not self["autoUpdateFrameSize"]
+            and any(i.grow or i.shrink for i in self["items"])):
+            # lines and the free space of flexible items depend on all
+            # items, so they have to be laid out again
+            self.refresh()
+            return
+
+        # only the changed item needs to be measured again
+        frame = DGH.measure(element)
+        frames = self.measured[1][0]
+        frames[index] = frame
+
+        orientation = self['orientation']
+        vertical = orientation in [DGG.VERTICAL, DGG.VERTICAL_INVERTED]
+        size = self.__get_main_size(frame)
+        crossSize = self.__get_cross_size(frame)
+        if vertical:
+            frameCrossSize = DGH.getRealWidth(self)
+        else:
+            frameCrossSize = DGH.getRealHeight(self)
+        if self["autoUpdateFrameSize"] and crossSize > frameCrossSize:
+            # the item doesn't fit anymore, the whole sizer needs to grow
+            self.refresh()
             return
 
-        width = self.__get_items_width()# + self["pad"][0]*2
-        height = self.__get_items_height()# + self["pad"][1]*2
+        self.invalidateBake()
+        DGH.invalidateParentBake(self)
+
+        delta = size - item.layoutSize
+        item.layoutSize = size
+        if delta != 0 and self["autoUpdateFrameSize"]:
+            fs = self["frameSize"]
+            if orientation == DGG.HORIZONTAL:
+                self["frameSize"] = (fs[0], fs[1] + delta, fs[2], fs[3])
+            elif orientation == DGG.HORIZONTAL_INVERTED:
+                self["frameSize"] = (fs[0] - delta, fs[1], fs[2], fs[3])
+            elif orientation == DGG.VERTICAL:
+                self["frameSize"] = (fs[0], fs[1], fs[2] - delta, fs[3])
+            elif orientation == DGG.VERTICAL_INVERTED:
+                self["frameSize"] = (fs[0], fs[1], fs[2], fs[3] + delta)
+
+        # place the changed item at its old start position
+        if orientation == DGG.HORIZONTAL:
+            element.setPos(
+                item.layoutStart - frame[0], 0,
+                self.__get_vertical_item_alignment(frame))
+        elif orientation == DGG.HORIZONTAL_INVERTED:
+            element.setPos(
+                item.layoutStart - frame[1], 0,
+                self.__get_vertical_item_alignment(frame))
+        elif orientation == DGG.VERTICAL:
+            element.setPos(
+                self.__get_horizontal_item_alignment(frame), 0,
+                item.layoutStart - frame[3])
+        elif orientation == DGG.VERTICAL_INVERTED:
+            element.setPos(
+                self.__get_horizontal_item_alignment(frame), 0,
+                item.layoutStart - frame[2])
+
+        # move all following items by the size difference
+        if orientation in [DGG.HORIZONTAL_INVERTED, DGG.VERTICAL]:
+            delta = -delta
+        if delta != 0:
+            for following in self["items"][index+1:]:
+                following.layoutStart += delta
+                if vertical:
+                    following.element.setZ(following.element.getZ() + delta)
+                else:
+                    following.element.setX(following.element.getX() + delta)
+
+        if item.updateFunc is not None:
+            item.updateFunc()
+
+        if delta != 0 and self["autoUpdateFrameSize"]:
+            # keep the measurement in sync with the new frame size
+            fs = self["frameSize"]
+            scale = self.getScale()
+            desired = (
+                fs[0] * scale[0], fs[1] * scale[0],
+                fs[2] * scale[1], fs[3] * scale[1])
+            data = self.measured[1]
+            self.measured = (desired, (frames, tuple(fs)) + data[2:])
+            self.measureCache = {None: self.measured}
+
+            # our own size changed, let an enclosing sizer know about it
+            parent = DGH.getParentWidget(self)
+            if isinstance(parent, DirectBoxSizer):
+                parent.updateItemSize(self)
+            else:
+                DGH.invalidateParentMeasure(self)
 
+    def __get_frame_size(self, width, height):
         # dependent on orientation, start at 0 and extend to the
         # maximum height or width and keep the respective other
         # direction centered
         if self['orientation'] == DGG.HORIZONTAL:
-            self["frameSize"] = (0, width, -height/2, height/2)
+            return (0, width, -height/2, height/2)
         elif self['orientation'] == DGG.HORIZONTAL_INVERTED:
-            self["frameSize"] = (-width, 0, -height/2, height/2)
+            return (-width, 0, -height/2, height/2)
         elif self['orientation'] == DGG.VERTICAL:
-            self["frameSize"] = (-width/2, width/2, -height, 0)
+            return (-width/2, width/2, -height, 0)
         elif self['orientation'] == DGG.VERTICAL_INVERTED:
-            self["frameSize"] = (-width/2, width/2, 0, height)
+            return (-width/2, width/2, 0, height)
+        raise ValueError('Invalid value for orientation: %s' % (self['orientation']))
+
+    #
+    # WRAP AND FLEX
+    #
+    def __is_vertical(self):
+        return self['orientation'] in [DGG.VERTICAL, DGG.VERTICAL_INVERTED]
+
+    def __get_main_size(self, frame):
+        # the size along the orientation of this sizer
+        if self.__is_vertical():
+            return frame[3] - frame[2]
+        return frame[1] - frame[0]
+
+    def __get_main_margin(self):
+        if self.__is_vertical():
+            return self["itemMargin"][2] + self["itemMargin"][3]
+        return self["itemMargin"][0] + self["itemMargin"][1]
+
+    def __get_cross_size(self, frame):
+        # the size including margins crosswise to the orientation
+        if self.__is_vertical():
+            return (frame[1] - frame[0]
+                + self["itemMargin"][0] + self["itemMargin"][1])
+        return (frame[3] - frame[2]
+            + self["itemMargin"][2] + self["itemMargin"][3])
+
+    def __apply_flex(self, indices, frames, available):
+        """
+        Distribute the space that is left or missing in the available length
+        over the items by their grow or shrink factors.
+        """
+        if available is None: return
+        items = self["items"]
+        margin = self.__get_main_margin()
+        sizes = {i: self.__get_main_size(frames[i]) for i in indices}
+        freeSpace = available - sum(sizes.values()) - margin * len(sizes)
+        if freeSpace > 0:
+            total = sum(items[i].grow for i in sizes)
+            if total == 0: return
+            for i, size in sizes.items():
+                if items[i].grow:
+                    frames[i] = self.__resize_item(
+                        items[i], frames[i],
+                        size + freeSpace * items[i].grow / total)
+        elif freeSpace < 0:
+            # like in CSS, bigger items shrink more than small ones
+            total = sum(items[i].shrink * size for i, size in sizes.items())
+            if total == 0: return
+            for i, size in sizes.items():
+                if items[i].shrink:
+                    frames[i] = self.__resize_item(
+                        items[i], frames[i],
+                        max(0, size + freeSpace * items[i].shrink * size / total))
+
+    def __resize_item(self, item, frame, size):
+        """
+        Set the frame size of the items element to match the given size
+        along the orientation of this sizer and keep its other edges.
+        Returns the new real frame of the item.
+        """
+        element = item.element
+        if not item.flexResized:
+            item.flexFrameSize = element["frameSize"]
+            item.flexResized = True
+        left, right, bottom, top = frame
+        if self.__is_vertical():
+            bottom = top - size
+        else:
+            right = left + size
+        scale = element.getScale()
+        DGH.arrange(element, (
+            left / scale[0], right / scale[0],
+            bottom / scale[1], top / scale[1]))
+        return (left, right, bottom, top)
+
+    def __get_wrap_size(self, availableSize):
+        if self["wrapSize"] is not None:
+            return self["wrapSize"]
+        if self["autoUpdateFrameSize"]:
+            # the frame size follows the items, so only an available size
+            # given by an enclosing layout can limit them
+            if availableSize is None:
+                return None
+            if self.__is_vertical():
+                return availableSize[1]
+            return availableSize[0]
+        return self.__get_main_size((
+            DGH.getRealLeft(self), DGH.getRealRight(self),
+            DGH.getRealBottom(self), DGH.getRealTop(self)))
+
+    def __get_lines(self, frames, wrapSize):
+        """
+        Split the item indices into lines that don't exceed the wrap size.
+        Every line contains at least one item.
+        """
+        margin = self.__get_main_margin()
+        lines = []
+        line = []
+        lineSize = 0
+        for i, frame in enumerate(frames):
+            size = self.__get_main_size(frame) + margin
+            if line and wrapSize is not None and lineSize + size > wrapSize:
+                lines.append(line)
+                line = []
+                lineSize = 0
+            line.append(i)
+            lineSize += size
+        if line:
+            lines.append(line)
+        return lines
+
+    def __refresh_wrapped(self, frames, lines, lineSizes):
+        """
+        Place the items in lines along the orientation which will be stacked
+        from top to bottom or left to right respectively.
+        """
+        items = self["items"]
+        mL, mR, mB, mT = self["itemMargin"]
+        orientation = self['orientation']
+        if orientation in [DGG.HORIZONTAL, DGG.HORIZONTAL_INVERTED]:
+            lineTop = DGH.getRealTop(self)
+            for line, lineHeight in zip(lines, lineSizes):
+                if orientation == DGG.HORIZONTAL:
+                    nextX = DGH.getRealLeft(self)
+                else:
+                    nextX = DGH.getRealRight(self)
+                for i in line:
+                    item = items[i]
+                    frame = frames[i]
+                    width = frame[1] - frame[0]
+                    z = self.__get_line_vertical_alignment(
+                        frame, lineTop, lineHeight)
+                    if orientation == DGG.HORIZONTAL:
+                        nextX += mL
+                        item.element.setPos(nextX - frame[0], 0, z)
+                        item.layoutStart = nextX
+                        nextX += width + mR
+                    else:
+                        nextX -= mR
+                        item.element.setPos(nextX - frame[1], 0, z)
+                        item.layoutStart = nextX
+                        nextX -= width + mL
+                    item.layoutSize = width
+                lineTop -= lineHeight
+        elif orientation in [DGG.VERTICAL, DGG.VERTICAL_INVERTED]:
+            lineLeft = DGH.getRealLeft(self)
+            for line, lineWidth in zip(lines, lineSizes):
+                if orientation == DGG.VERTICAL:
+                    nextY = DGH.getRealTop(self)
+                else:
+                    nextY = DGH.getRealBottom(self)
+                for i in line:
+                    item = items[i]
+                    frame = frames[i]
+                    height = frame[3] - frame[2]
+                    x = self.__get_line_horizontal_alignment(
+                        frame, lineLeft, lineWidth)
+                    if orientation == DGG.VERTICAL:
+                        nextY -= mT
+                        item.element.setPos(x, 0, nextY - frame[3])
+                        item.layoutStart = nextY
+                        nextY -= height + mB
+                    else:
+                        nextY += mB
+                        item.element.setPos(x, 0, nextY - frame[2])
+                        item.layoutStart = nextY
+                        nextY += height + mT
+                    item.layoutSize = height
+                lineLeft += lineWidth
+        else:
+            raise ValueError('Invalid value for orientation: %s' % (self['orientation']))
+
+    def __get_line_vertical_alignment(self, frame, lineTop, lineHeight):
+        # align the item within its line of a horizontal sizer
+        if self["itemAlign"] & self.A_Bottom:
+            return lineTop - lineHeight + self["itemMargin"][2] - frame[2]
+        elif self["itemAlign"] & self.A_Middle:
+            return lineTop - lineHeight / 2 - (frame[3] + frame[2]) / 2
+        return lineTop - self["itemMargin"][3] - frame[3]
 
-    def __get_items_width(self):
+    def __get_line_horizontal_alignment(self, frame, lineLeft, lineWidth):
+        # align the item within its line of a vertical sizer
+        if self["itemAlign"] & self.A_Right:
+            return lineLeft + lineWidth - self["itemMargin"][1] - frame[1]
+        elif self["itemAlign"] & self.A_Center:
+            return lineLeft + lineWidth / 2 - (frame[0] + frame[1]) / 2
+        return lineLeft + self["itemMargin"][0] - frame[0]
+
+    def __get_items_width(self, frames):
         '''
         Get the maximum item width
         '''
         width = 0
-        for item in self["items"]:
+        for frame in frames:
             item_width = (
-                DGH.getRealWidth(item.element)
+                frame[1] - frame[0]
                 + self["itemMargin"][0]   # margin left
                 + self["itemMargin"][1])  # margin right
             if self['orientation'] in [DGG.VERTICAL, DGG.VERTICAL_INVERTED]:
@@ -189,14 +635,14 @@ class DirectBoxSizer(DirectFrame):
                 width += item_width
         return width
 
-    def __get_items_height(self):
+    def __get_items_height(self, frames):
         '''
         Get the maximum item height
         '''
         height = 0
-        for item in self["items"]:
+        for frame in frames:
             item_height = (
-                DGH.getRealHeight(item.element)
+                frame[3] - frame[2]
                 + self["itemMargin"][3]   # margin top
                 + self["itemMargin"][2])  # margin bottom
             if self['orientation'] in [DGG.HORIZONTAL, DGG.HORIZONTAL_INVERTED]:
@@ -211,72 +657,80 @@ class DirectBoxSizer(DirectFrame):
     # ITEM ORDER POSITION REFRESH
     #
     # HORIZONTAL
-    def __refresh_horizontal_ltr(self):
+    def __refresh_horizontal_ltr(self, frames):
         # Horizontal - Left to Right placement
         # get the left side of the box sizer frame
         nextX = DGH.getRealLeft(self)
 
         # go through all items in the box and place them
-        for item in self["items"]:
+        for item, frame in zip(self["items"], frames):
             # place the element and calculate the next x position
-            y = self.__get_vertical_item_alignment(item.element)
-            item.element.setPos(nextX - DGH.getRealLeft(item.element), 0, y)
-            nextX += DGH.getRealWidth(item.element)
+            y = self.__get_vertical_item_alignment(frame)
+            item.element.setPos(nextX - frame[0], 0, y)
+            item.layoutStart = nextX
+            item.layoutSize = frame[1] - frame[0]
+            nextX += item.layoutSize
 
 
-    def __refresh_horizontal_rtl(self):
+    def __refresh_horizontal_rtl(self, frames):
         # Horizontal - Right to Left
         # get the right side of the box sizer frame
         nextX = DGH.getRealRight(self)
 
         # go through all items in the box and place them
-        for item in self["items"]:
+        for item, frame in zip(self["items"], frames):
             # place the element and calculate the next x position
-            y = self.__get_vertical_item_alignment(item.element)
-            item.element.setPos(nextX - DGH.getRealRight(item.element), 0, y)
-            nextX -= DGH.getRealWidth(item.element)
+            y = self.__get_vertical_item_alignment(frame)
+            item.element.setPos(nextX - frame[1], 0, y)
+            item.layoutStart = nextX
+            item.layoutSize = frame[1] - frame[0]
+            nextX -= item.layoutSize
 
     # VERTICAL
-    def __refresh_vertical_ttb(self):
+    def __refresh_vertical_ttb(self, frames):
         # Vertical - Top to Bottom
         # get the top side of the box sizer frame
         nextY = DGH.getRealTop(self)
 
         # go through all items in the box and place them
-        for item in self["items"]:
+        for item, frame in zip(self["items"], frames):
             # place the element and calculate the next y position
-            x = self.__get_horizontal_item_alignment(item.element)
-            item.element.setPos(x, 0, nextY - DGH.getRealTop(item.element))
-            nextY -= DGH.getRealHeight(item.element)
+            x = self.__get_horizontal_item_alignment(frame)
+            item.element.setPos(x, 0, nextY - frame[3])
+            item.layoutStart = nextY
+            item.layoutSize = frame[3] - frame[2]
+            nextY -= item.layoutSize
 
-    def __refresh_vertical_btt(self):
+    def __refresh_vertical_btt(self, frames):
         # Vertical - Bottom to Top
         # get the bottom side of the box sizer frame
         nextY = DGH.getRealBottom(self)
 
         # go through all items in the box and place them
-        for item in self["items"]:
+        for item, frame in zip(self["items"], frames):
             # place the element and calculate the next y position
-            x = self.__get_horizontal_item_alignment(item.element)
-            item.element.setPos(x, 0, nextY - DGH.getRealBottom(item.element))
-            nextY += DGH.getRealHeight(item.element)
+            x = self.__get_horizontal_item_alignment(frame)
+            item.element.setPos(x, 0, nextY - frame[2])
+            item.layoutStart = nextY
+            item.layoutSize = frame[3] - frame[2]
+            nextY += item.layoutSize
 
     #
     # ITEM ALIGN POSITION CALCULATIONS
     #
-    def __get_horizontal_item_alignment(self, curElem):
+    def __get_horizontal_item_alignment(self, frame):
         # Horizontal Alingment
         if self["itemAlign"] & self.A_Left:
             # get the left side of the frame
             x = self["frameSize"][0]
             # shift x right to be aligned with the items left side
-            x -= DGH.getRealLeft(curElem)
+            x -= frame[0]
             return x
         elif self["itemAlign"] & self.A_Right:
             # get the right side of the frame
             x = self["frameSize"][1]
             # shift x left to be aligned with the items right side
-            x -= DGH.getRealRight(curElem)
+            x -= frame[1]
             return x
         elif self["itemAlign"] & self.A_Center:
             # aligned by the center of the frame
@@ -284,25 +738,25 @@ class DirectBoxSizer(DirectFrame):
             self_r = DGH.getRealRight(self)
             x = (self_l + self_r) / 2
             # shift x by items center shift
-            item_l = DGH.getRealLeft(curElem)
-            item_r = DGH.getRealRight(curElem)
+            item_l = frame[0]
+            item_r = frame[1]
             x += (item_l + item_r) / 2
             return x
         return 0
 
-    def __get_vertical_item_alignment(self, curElem):
+    def __get_vertical_item_alignment(self, frame):
         # Vertical Alingment
         if self["itemAlign"] & self.A_Bottom:
             # Vertical adjustment to the box' size
             y = DGH.getRealBottom(self)# self["frameSize"][2]
             # shift y up to be aligned with the items bottom side
-            y += DGH.getRealBottom(curElem)
+            y += frame[2]
             return y
         elif self["itemAlign"] & self.A_Top:
             # Items are alligned by their upper edge
             y = DGH.getRealTop(self)# self["frameSize"][3]
             # shift y down to be aligned with the items top side
-            y -= DGH.getRealTop(curElem)
+            y -= frame[3]
             return y
         elif self["itemAlign"] & self.A_Middle:
             # Items are alligned by their center
@@ -311,8 +765,8 @@ class DirectBoxSizer(DirectFrame):
             self_b = DGH.getRealBottom(self)
             y = (self_t + self_b) / 2
             # shift y by items center shift
-            item_t = DGH.getRealTop(curElem)
-            item_b = DGH.getRealBottom(curElem)
+            item_t = frame[3]
+            item_b = frame[2]
             y += (item_t + item_b) / 2
             return y
         return 0
@@ -2,10 +2,15 @@
 
 __all__ = ['DirectCollapsibleFrame']
 
-from panda3d.core import *
+from panda3d.core import TextNode
 from direct.gui import DirectGuiGlobals as DGG
+from direct.gui.DirectGuiBase import DirectGuiWidget
 from direct.gui.DirectFrame import DirectFrame
 from direct.gui.DirectButton import DirectButton
+from direct.interval.LerpInterval import LerpFunctionInterval
+from direct.interval.MetaInterval import Sequence
+from direct.interval.FunctionInterval import Func
+from .DirectBoxSizer import DirectBoxSizer
 from . import DirectGuiHelper as DGH
 
 
@@ -14,11 +19,22 @@ class DirectCollapsibleFrame(DirectFrame):
     A frame containing a clickable header to show and hide its content frame
     """
 
+    # Collapse modes
+    # hide every child of the frame
+    CM_Hide = 'hide'
+    # stash the contentNode which holds all the content at once
+    CM_Stash = 'stash'
+
     def __init__(self, parent = None, **kw):
         self.skipInitRefresh = True
         optiondefs = (
             ('headerheight',           0.1, None),
             ('collapsed',           False, self.setCollapsed),
+            ('collapseMode', DirectCollapsibleFrame.CM_Hide, None),
+            # Seconds to animate the height change, 0 to change it at once
+            ('animationTime',          0, None),
+            # Inform an enclosing DirectBoxSizer about the size change
+            ('notifySizer',         True, None),
 
             ('collapseText',   'collapse >>', None),
             ('extendText',     'extend <<', None),
@@ -30,6 +46,12 @@ class DirectCollapsibleFrame(DirectFrame):
         # Initialize superclasses
         DirectFrame.__init__(self, parent)
 
+        self.collapseInterval = None
+
+        # available sizes to the measured frame
+        self.measureCache = {}
+        self.measured = None
+
         frameSize = self['frameSize']
 
         # set up the header button to collapse/extend
@@ -48,6 +70,10 @@ class DirectCollapsibleFrame(DirectFrame):
                 frameSize[3]-self['headerheight'], frameSize[3]),
             command=self.toggleCollapsed)
 
+        # all content parented to this node can be collapsed by stashing it
+        # in the CM_Stash mode
+        self.contentNode = self.attachNewNode('content')
+
         # Call option initialization functions
         self.initialiseoptions(DirectCollapsibleFrame)
 
@@ -62,6 +88,57 @@ class DirectCollapsibleFrame(DirectFrame):
             DGH.getRealTop(self)-self['headerheight'], DGH.getRealTop(self))
         self.originalFrameSize = self['frameSize']
         self.toggleCollapseButton["text_pos"] = (DGH.getRealLeft(self)+0.02, DGH.getRealTop(self)-self['headerheight']/2.0)
+        self.invalidateMeasure()
+
+    #
+    # MEASURE AND ARRANGE
+    #
+    def measure(self, availableSize=None):
+        """
+        Returns the real frame (left, right, bottom, top) of this frame in its
+        current collapsed or extended state. The result is cached until the
+        frame size changes.
+        """
+        if availableSize is not None:
+            availableSize = tuple(availableSize)
+        cached = self.measureCache.get(availableSize)
+        if cached is not None:
+            self.measured = cached
+            return cached
+        self.resetFrameSize()
+        self.measured = (
+            DGH.getRealLeft(self), DGH.getRealRight(self),
+            DGH.getRealBottom(self), DGH.getRealTop(self))
+        self.measureCache[availableSize] = self.measured
+        return self.measured
+
+    def arrange(self, frameSize=None):
+        """
+        Take the given frame size as the extended size and place the header
+        accordingly. While collapsed, only the width changes right away.
+        """
+        if frameSize is None or frameSize == self.originalFrameSize:
+            return
+        if self.collapseInterval is not None:
+            self.collapseInterval.finish()
+        if self['collapsed']:
+            l, r, b, t = frameSize
+            self['frameSize'] = (l, r, t - self['headerheight'], t)
+            self.updateFrameSize()
+            self.originalFrameSize = frameSize
+        else:
+            self['frameSize'] = frameSize
+            self.updateFrameSize()
+
+    def invalidateMeasure(self):
+        """
+        Drop the cached measurement of this frame and the layout widgets
+        enclosing it.
+        """
+        if not self.measureCache and self.measured is None: return
+        self.measureCache = {}
+        self.measured = None
+        DGH.invalidateParentMeasure(self)
 
     def toggleCollapsed(self):
         self['collapsed'] = not self['collapsed']
@@ -74,42 +151,116 @@ class DirectCollapsibleFrame(DirectFrame):
         # we're probably to early here
         if not hasattr(self, 'originalFrameSize'): return
 
+        if self.collapseInterval is not None:
+            # stop a running animation where it currently is
+            self.collapseInterval.pause()
+            self.collapseInterval = None
+
         fs = self['frameSize']
 
         if self['collapsed']:
             # collapse
-            self['frameSize'] = (fs[0],fs[1],fs[3]-self['headerheight'],fs[3])
-
-            # hide all children
-            for child in self.getChildren():
-                # skip our toggle collapse button
-                if child == self.toggleCollapseButton: continue
-                # hide the child
-                child.hide()
+            self.__hideContent()
 
             # change the toggle button text
             self.toggleCollapseButton['text'] = self['extendText']
 
+            self.__resizeTo((fs[0],fs[1],fs[3]-self['headerheight'],fs[3]))
+
             # send notice about us being collapsed
             base.messenger.send(self.getCollapsedEvent())
 
         else:
             # extend
-            self['frameSize'] = self.originalFrameSize
+            # change the toggle button text
+            self.toggleCollapseButton['text'] = self['collapseText']
+
+            # show the content once we've got our full size again
+            self.__resizeTo(self.originalFrameSize, self.__showContent)
+
+            # send notice about us being extended
+            base.messenger.send(self.getExtendedEvent())
+
+    def __hideContent(self):
+        if self['collapseMode'] == DirectCollapsibleFrame.CM_Stash:
+            # move children that have been added directly to the frame into
+            # the content node, so they will be stashed with it
+            for child in self.getChildren():
+                if child == self.toggleCollapseButton \
+                or child == self.contentNode: continue
+                child.reparentTo(self.contentNode)
+            self.contentNode.stash()
+        else:
+            # hide all children
+            for child in self.getChildren():
+                # skip our toggle collapse button
+                if child == self.toggleCollapseButton: continue
+                # hide the child
+                child.hide()
+
+    def __showContent(self):
+        if self['collapseMode'] == DirectCollapsibleFrame.CM_Stash:
+            self.contentNode.unstash()
+        else:
             for child in self.getChildren():
                 # skip our toggle collapse button
                 if child == self.toggleCollapseButton: continue
                 # show the child
                 child.show()
 
-            # change the toggle button text
-            self.toggleCollapseButton['text'] = self['collapseText']
+    def __resizeTo(self, frameSize, doneFunc=None):
+        """Change the frame size, animated if an animation time is set"""
+        if self['animationTime'] > 0:
+            self.collapseInterval = Sequence(
+                LerpFunctionInterval(
+                    self.__animateFrameSize,
+                    duration=self['animationTime'],
+                    blendType='easeInOut',
+                    extraArgs=[self['frameSize'], frameSize]),
+                name=self.uniqueName('collapseInterval'))
+            if doneFunc is not None:
+                self.collapseInterval.append(Func(doneFunc))
+            self.collapseInterval.start()
+        else:
+            self['frameSize'] = frameSize
+            self.__notifySizer()
+            if doneFunc is not None:
+                doneFunc()
 
-            # send notice about us being extended
-            base.messenger.send(self.getExtendedEvent())
+    def __animateFrameSize(self, t, startFrameSize, endFrameSize):
+        self['frameSize'] = tuple(
+            start + (end - start) * t
+            for start, end in zip(startFrameSize, endFrameSize))
+        self.__notifySizer()
+
+    def __notifySizer(self):
+        """Let an enclosing box sizer or accordion move the items
+        following us"""
+        # our size changed, but the enclosing sizer will measure us again
+        # itself, so only drop our own measurement here
+        self.measureCache = {}
+        self.measured = None
+        sizer = DGH.getParentWidget(self)
+        if self['notifySizer'] and (isinstance(sizer, DirectBoxSizer) \
+        or hasattr(sizer, 'updateItemSize')):
+            sizer.updateItemSize(self)
+        else:
+            DGH.invalidateParentMeasure(self)
 
     def getCollapsedEvent(self):
         return self.uniqueName("collapsed")
 
     def getExtendedEvent(self):
         return self.uniqueName("extended")
+
+    def destroy(self):
+        if self.collapseInterval is not None:
+            self.collapseInterval.pause()
+            self.collapseInterval = None
+        # widgets moved into the content node aren't our direct children
+        # anymore, so DirectFrame wouldn't find them for destruction
+        for child in self.contentNode.getChildren():
+            widget = DirectGuiWidget.guiDict.get(child.getName().split('-')[-1])
+            if widget is not None:
+                widget.destroy()
+        DirectFrame.destroy(self)
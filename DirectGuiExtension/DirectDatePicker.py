@@ -1,11 +1,13 @@
 """This module contains the DirectBoxSizer class."""
 
-__all__ = ['DirectGridSizer']
+__all__ = ['DirectDatePicker', 'DirectDatePickerPool']
 
 import calendar
 import datetime
-from panda3d.core import *
+import functools
+from panda3d.core import Point3, TextNode
 from direct.gui import DirectGuiGlobals as DGG
+from direct.showbase import ShowBaseGlobal
 from direct.gui.DirectButton import DirectButton
 from direct.gui.DirectLabel import DirectLabel
 from . import DirectGuiHelper as DGH
@@ -14,6 +16,29 @@ from .DirectSpinBox import DirectSpinBox
 from .DirectOptionMenu import DirectOptionMenu
 
 
+@functools.lru_cache(maxsize=64)
+def getMonthLayout(year, month, firstweekday=0):
+    """
+    Returns the dates shown in the 6x7 grid of the picker for the given month
+    as a flat tuple of 42 dates together with a tuple of the 6 week numbers.
+    The result only depends on the arguments, so it is cached.
+    """
+    start = calendar.Calendar(firstweekday).monthdatescalendar(year, month)[0][0]
+    if start.day == 1:
+        # months that start with the first weekday get one week of the
+        # previous month prepended
+        start = start.toordinal() - 7
+    else:
+        start = start.toordinal()
+
+    minOrdinal = datetime.date.min.toordinal()
+    maxOrdinal = datetime.date.max.toordinal()
+    dates = tuple(
+        datetime.date.fromordinal(min(max(start + i, minOrdinal), maxOrdinal))
+        for i in range(42))
+    weekNumbers = tuple(dates[row*7].isocalendar()[1] for row in range(6))
+    return dates, weekNumbers
+
 class DirectDatePicker(DirectGridSizer):
     def __init__(self, parent = None, **kw):
         optiondefs = (
@@ -24,6 +49,15 @@ class DirectDatePicker(DirectGridSizer):
             ('normalDayFrameColor', None, None),
             ('activeDayFrameColor', None, None),
             ('todayFrameColor', None, None),
+            ('rangeFrameColor', None, None),
+
+            # either 'single' to pick one date or 'range' to pick a start
+            # and an end date with two consecutive clicks
+            ('selectionMode', 'single', self.clearRange),
+            # called with the picked date or with the start and end date of
+            # a picked range followed by the extraArgs
+            ('command',         None,   None),
+            ('extraArgs',       [],     None),
             ('frameSize',       (-1, 1, -1, 1),  self.setFrameSize)
             # Define type of DirectGuiWidget
             )
@@ -60,6 +94,18 @@ class DirectDatePicker(DirectGridSizer):
             (0.6,0.6,0.6,1)
         ) if self['todayFrameColor'] is None else self['todayFrameColor']
 
+        # color of the days between the start and end of a picked range
+        self['rangeFrameColor'] = (
+            (0.7,0.8,0.9,1),
+            (0.8,0.9,1.0,1),
+            (0.8,0.0,0.0,1),
+            (0.6,0.7,0.8,1)
+        ) if self['rangeFrameColor'] is None else self['rangeFrameColor']
+
+        # start and end date of the range in range selection mode
+        self.rangeStart = None
+        self.rangeEnd = None
+
         # current date
         now = datetime.datetime.now()
 
@@ -79,6 +125,10 @@ class DirectDatePicker(DirectGridSizer):
             self.addItem(lbl, i, 0)
 
         self.dateButtons = []
+        # the state of each day button and week number label as it has
+        # been rendered the last time, used to only update what changed
+        self.renderedCells = [None] * 42
+        self.renderedWeekNumbers = [None] * 6
         day = 0
         for row in range(1, 7):
             self.dateButtons.append([])
@@ -151,7 +201,7 @@ class DirectDatePicker(DirectGridSizer):
             state=DGG.NORMAL if enabled else DGG.DISABLED,
             frameColor=self['normalDayFrameColor'],
             frameSize=(-0.05,0.05,-0.035,0.0625),
-            command=self.setDay,
+            command=self.__selectDay,
             extraArgs=[day])
 
     def createLabel(self, txt):
@@ -164,6 +214,55 @@ class DirectDatePicker(DirectGridSizer):
             frameSize=(-0.05,0.05,-0.035,0.0625)
         )
 
+    def __selectDay(self, day):
+        if self['selectionMode'] == 'range':
+            self.__selectRangeDate(datetime.date(self['year'], self['month'], day))
+            return
+        self.setDay(day)
+        if self['command']:
+            self['command'](*[self.getDate()] + self['extraArgs'])
+
+    def __selectRangeDate(self, date):
+        if self.rangeStart is None or self.rangeEnd is not None:
+            # start a new range
+            self.rangeStart = date
+            self.rangeEnd = None
+        else:
+            # close the range, the clicked date may be before the start
+            self.rangeStart, self.rangeEnd = \
+                min(self.rangeStart, date), max(self.rangeStart, date)
+        self['day'] = date.day
+
+        if self.rangeEnd is not None and self['command']:
+            self['command'](*list(self.getRange()) + self['extraArgs'])
+
+    def setRange(self, start, end):
+        """Set the picked range, the picker will not change the shown month"""
+        # the cells of the picker are dates, datetimes as returned by
+        # getRange can not be compared with them
+        if isinstance(start, datetime.datetime):
+            start = start.date()
+        if isinstance(end, datetime.datetime):
+            end = end.date()
+        self.rangeStart = min(start, end)
+        self.rangeEnd = max(start, end)
+        self.refreshPicker()
+
+    def getRange(self):
+        """Returns the start and end of the picked range or None if no range
+        has been picked completely yet"""
+        if self.rangeStart is None or self.rangeEnd is None:
+            return None
+        return (
+            datetime.datetime(self.rangeStart.year, self.rangeStart.month, self.rangeStart.day),
+            datetime.datetime(self.rangeEnd.year, self.rangeEnd.month, self.rangeEnd.day))
+
+    def clearRange(self):
+        if not hasattr(self, 'rangeStart'): return
+        self.rangeStart = None
+        self.rangeEnd = None
+        self.refreshPicker()
+
     def setDay(self, day):
         self['day'] = day
         self.refreshPicker()
@@ -198,6 +297,14 @@ class DirectDatePicker(DirectGridSizer):
     def getYear(self):
         return self['year']
 
+    def setDate(self, date):
+        """Show the given date and sync the year and month pickers to it"""
+        self['year'] = date.year
+        self['month'] = date.month
+        self['day'] = date.day
+        self.yearPicker.setValue(date.year)
+        self.monthPicker.set(date.month-1, fCommand=False)
+
     def getDate(self):
         return datetime.datetime(self['year'], self['month'], self['day'])
 
@@ -209,65 +316,114 @@ class DirectDatePicker(DirectGridSizer):
         if self['year'] is None or self['month'] is None or self['day'] is None:
             return
 
-        datesPrev = None
-        if calendar.monthrange(self['year'], self['month'])[0] == 0:
-            # get the previous dates for months that start with monday as first weekday and need one week prepended
-            year = self['year'] if self['month'] > 1 else self['year']-1 if self['year'] > 0 else 1
-            month = self['month']-1 if self['month'] > 1 else 12
-            datesPrev = self.cal.monthdatescalendar(year,month)
-
-        dates = self.cal.monthdatescalendar(self['year'],self['month'])
-
-        datesNext = None
-        if datesPrev is None and len(dates) < 7:
-            # get the next dates for months that do not cover 6 lines of the calendar
-            year = self['year'] if self['month'] < 12 else self['year']+1 if self['year'] < 9999 else 9999
-            month = self['month']+1 if self['month'] < 12 else 1
-            datesNext = self.cal.monthdatescalendar(year,month)
-
-
-        def updateInfo(row, column, date):
-            # update button
-            btn = self.dateButtons[row][column]
-            btn["text"] = str(date.day)
-            btn["extraArgs"] = [date.day]
-            btn["state"] = DGG.NORMAL if date.month == self['month'] else DGG.DISABLED
-            now = datetime.datetime.now()
-            isToday = now.day == date.day and now.month == date.month and now.year == date.year
-            if isToday:
+        dates, weekNumbers = getMonthLayout(
+            self['year'], self['month'], self.cal.firstweekday)
+        today = datetime.date.today()
+        rangeStart = self.rangeStart
+        rangeEnd = self.rangeEnd if self.rangeEnd is not None else rangeStart
+
+        # only touch the buttons and labels whose content actually changed
+        # since the last time the picker got rendered
+        for i, date in enumerate(dates):
+            isCurrentMonth = date.month == self['month']
+            if rangeStart is not None:
+                isSelected = date == rangeStart or date == rangeEnd
+            else:
+                isSelected = isCurrentMonth and self['day'] == date.day
+            if isSelected:
+                # the selected one or the start and end of a range
+                frameColor = self['activeDayFrameColor']
+            elif rangeStart is not None and rangeStart < date < rangeEnd:
+                # within the selected range
+                frameColor = self['rangeFrameColor']
+            elif date == today:
                 # the current day
-                btn["frameColor"] = self['todayFrameColor']
-            if self['day'] == date.day:
-                # the selected one
-                btn["frameColor"] = self['activeDayFrameColor']
-            elif not isToday:
-                btn["frameColor"] = self['normalDayFrameColor']
-
-            # update week numbers
-            if column == 0:
-                weeknumber = datetime.date(date.year, date.month, date.day).isocalendar()[1]
-                self.weekNumbers[row]["text"] = str(weeknumber)
-
-        for row in range(1, 7):
-            r = row - 1
-            column = 0
-            if datesPrev and r == 0:
-                for date in datesPrev[-1]:
-                    updateInfo(r, column, date)
-                    column += 1
-
-            elif len(dates) > r - (1 if datesPrev else 0):
-                hadPrev = 1 if datesPrev else 0
-                for date in dates[r - hadPrev]:
-                    updateInfo(r, column, date)
-                    column += 1
-
-            elif datesNext:
-                idx = 1
-                if dates[-1][-1].month == self['month']:
-                    idx = 0
-
-                for date in datesNext[idx]:
-                    updateInfo(r, column, date)
-                    column += 1
-
+                frameColor = self['todayFrameColor']
+            else:
+                frameColor = self['normalDayFrameColor']
+
+            cell = (date.day, isCurrentMonth, frameColor)
+            prevCell = self.renderedCells[i]
+            if cell == prevCell:
+                continue
+
+            btn = self.dateButtons[i // 7][i % 7]
+            if prevCell is None or prevCell[0] != date.day:
+                btn["text"] = str(date.day)
+                btn["extraArgs"] = [date.day]
+            if prevCell is None or prevCell[1] != isCurrentMonth:
+                btn["state"] = DGG.NORMAL if isCurrentMonth else DGG.DISABLED
+            if prevCell is None or prevCell[2] != frameColor:
+                btn["frameColor"] = frameColor
+            self.renderedCells[i] = cell
+
+        # update week numbers
+        for row, weekNumber in enumerate(weekNumbers):
+            if self.renderedWeekNumbers[row] != weekNumber:
+                self.weekNumbers[row]["text"] = str(weekNumber)
+                self.renderedWeekNumbers[row] = weekNumber
+
+
+class DirectDatePickerPool:
+    """
+    Hands out date pickers for popups so they do not have to be constructed
+    each time a popup is opened. A picker that got released will be reused
+    by the next call to acquire, new pickers are only created if all pickers
+    of the pool are currently in use.
+
+    All keyword arguments given to the pool will be passed to the pickers
+    when they are created.
+    """
+    def __init__(self, **kw):
+        self.pickerKw = kw
+        self.freePickers = []
+        self.usedPickers = []
+
+    def acquire(self, parent=None, date=None, selectionMode='single',
+                command=None, extraArgs=[], pos=(0, 0, 0), rangeStart=None,
+                rangeEnd=None):
+        """
+        Returns a picker reparented to parent showing the given date which
+        defaults to today. If rangeStart and rangeEnd are given, the picker
+        will show this range in range selection mode.
+        """
+        if self.freePickers:
+            picker = self.freePickers.pop()
+        else:
+            picker = DirectDatePicker(ShowBaseGlobal.hidden, **self.pickerKw)
+        self.usedPickers.append(picker)
+
+        if rangeStart is not None and rangeEnd is not None:
+            # a given range can only be shown and changed in range mode
+            selectionMode = 'range'
+        picker['selectionMode'] = selectionMode
+        picker['command'] = command
+        picker['extraArgs'] = extraArgs
+        if date is None:
+            date = rangeStart if rangeStart is not None else datetime.date.today()
+        picker.setDate(date)
+        if rangeStart is not None and rangeEnd is not None:
+            picker.setRange(rangeStart, rangeEnd)
+
+        picker.reparentTo(parent if parent is not None else ShowBaseGlobal.aspect2d)
+        picker.setPos(pos)
+        picker.show()
+        return picker
+
+    def release(self, picker):
+        """Hide the picker and give it back to the pool"""
+        if picker not in self.usedPickers:
+            return
+        self.usedPickers.remove(picker)
+        picker['command'] = None
+        picker['extraArgs'] = []
+        picker.clearRange()
+        picker.hide()
+        picker.reparentTo(ShowBaseGlobal.hidden)
+        self.freePickers.append(picker)
+
+    def destroy(self):
+        for picker in self.freePickers + self.usedPickers:
+            picker.destroy()
+        self.freePickers = []
+        self.usedPickers = []
@@ -3,14 +3,56 @@
 __all__ = ['DirectDiagram']
 
 import math
-from panda3d.core import *
+from array import array
+from panda3d.core import (
+    TextNode,
+    Geom,
+    GeomLines,
+    GeomNode,
+    GeomPoints,
+    GeomTriangles,
+    GeomVertexData,
+    GeomVertexFormat)
 from direct.gui import DirectGuiGlobals as DGG
 from direct.gui.DirectFrame import DirectFrame
 from direct.gui.DirectLabel import DirectLabel
 from . import DirectGuiHelper as DGH
 from direct.directtools.DirectGeometry import LineNodePath
 
+LINE = 'line'
+BAR = 'bar'
+STACKED_BAR = 'stackedBar'
+SCATTER = 'scatter'
+AREA = 'area'
+CHART_TYPES = (LINE, BAR, STACKED_BAR, SCATTER, AREA)
+
+# default colors of the data series, the first matches the line color of
+# the diagram
+SERIES_COLORS = [
+    (1, 0, 0, 1),
+    (0, 0, 1, 1),
+    (0, 0.6, 0, 1),
+    (1, 0.5, 0, 1),
+    (0.5, 0, 0.5, 1),
+    (0, 0.6, 0.6, 1)]
+
+REFRESH_TASK_CHAIN = 'DirectDiagram'
+
 class DirectDiagram(DirectFrame):
+    """
+    A diagram showing one or more series of values. The data can either be
+    a list of values or a list of series which are lists of values.
+
+    The chartType option defines how the series will be drawn, as lines,
+    grouped bars, stacked bars, scattered points or filled areas. All bars,
+    points or areas of one series are drawn by a single geom which will be
+    updated in place if the data changes.
+
+    With threadedRefresh, the scale, labels and vertices get prepared on a
+    worker thread. The main thread only swaps the prepared vertex data of
+    the series in at the next frame, while the series keep showing their
+    previous data until then.
+    """
 
     def __init__(self, parent = None, **kw):
         optiondefs = (
@@ -26,6 +68,11 @@ class DirectDiagram(DirectFrame):
             ('stepAccuracy',    2,          self.refresh),
             ('stepFormat',      float,      self.refresh),
             ('numberAreaWidth', 0.15,          self.refresh),
+            ('chartType',       LINE,       self.refresh),
+            ('seriesColors',    SERIES_COLORS, self.refresh),
+            ('barWidth',        0.8,        self.refresh),
+            ('pointSize',       5,          self.refresh),
+            ('threadedRefresh', False,      self.setThreadedRefresh),
             #('numStates',      1,           None),
             #('state',          DGG.NORMAL,  None),
             ("frameSize",       (-0.5, 0.5, -0.5, 0.5), self.setFrameSize)
@@ -36,8 +83,19 @@ class DirectDiagram(DirectFrame):
         self.lines = None
         self.measureLines = None
         self.centerLine = None
+        # the labels of the axis and the data points which will be updated
+        # in place on refresh
         self.xDescriptions = []
         self.points = []
+        # (node path, geom, primitive type, [vertex data, back buffer]) of
+        # the geometry of the data series, used by all charts but the line
+        # chart without threaded refresh
+        self.seriesGeoms = []
+        # state of the preparation on the worker thread, results prepared
+        # for an older generation will be dropped
+        self.refreshRunning = False
+        self.refreshPending = False
+        self.refreshGeneration = 0
 
         # Initialize superclasses
         DirectFrame.__init__(self, parent)
@@ -48,80 +106,142 @@ class DirectDiagram(DirectFrame):
         self.refresh()
 
     def setData(self, data):
-        self["data"] = [float(value) for value in data]
+        if data and isinstance(data[0], (list, tuple)):
+            self["data"] = [[float(value) for value in series] for series in data]
+        else:
+            self["data"] = [float(value) for value in data]
         self.refresh()
 
+    def getSeries(self):
+        """Returns the data as list of series"""
+        data = self['data']
+        if data and isinstance(data[0], (list, tuple)):
+            return data
+        return [data] if data else []
+
+    def setThreadedRefresh(self):
+        """
+        Switching between threaded and synchronous refreshes makes the
+        results of running preparations stale, they would overwrite newer
+        synchronous refreshes otherwise.
+        """
+        self.refreshGeneration += 1
+
     def refresh(self):
         # sanity check so we don't get here to early
         if not hasattr(self, "bounds"): return
         self.frameInitialiseFunc()
 
-        textLeftSizeArea = self['numberAreaWidth']
+        if not self['threadedRefresh']:
+            self.__apply(self.__prepare(self.__getLayout()))
+            return
+
+        if self.refreshRunning:
+            # only one preparation runs at a time, the latest state will be
+            # prepared once the running one is done
+            self.refreshPending = True
+            return
+        self.refreshRunning = True
+        self.refreshPending = False
+        if not taskMgr.hasTaskChain(REFRESH_TASK_CHAIN):
+            taskMgr.setupTaskChain(REFRESH_TASK_CHAIN, numThreads=1)
+        # the vertex data not shown by the series geoms can be filled by the
+        # worker while the geoms are rendered with their current data
+        backBuffers = [buffers[1] for _, _, _, buffers in self.seriesGeoms]
+        taskMgr.add(
+            self.__prepareTask, self.uniqueName('prepare'),
+            extraArgs=[self.__getLayout(), backBuffers, self.refreshGeneration],
+            taskChain=REFRESH_TASK_CHAIN)
+
+    def __getLayout(self):
+        """
+        Returns everything the preparation of the diagram needs to know
+        about the widget, so it can run without accessing the widget.
+        """
+        if self['chartType'] not in CHART_TYPES:
+            raise ValueError(
+                "Unknown chart type {}".format(self['chartType']))
+        series = [list(values) for values in self.getSeries()]
+        return dict(
+            series = series,
+            hasData = bool(series),
+            chartType = self['chartType'],
+            numPosSteps = self['numPosSteps'],
+            numPosStepsStep = self['numPosStepsStep'],
+            numNegSteps = self['numNegSteps'],
+            numNegStepsStep = self['numNegStepsStep'],
+            showDataNumbers = self['showDataNumbers'],
+            stepAccuracy = self['stepAccuracy'],
+            stepFormat = self['stepFormat'],
+            numberAreaWidth = self['numberAreaWidth'],
+            barWidth = self['barWidth'],
+            left = DGH.getRealLeft(self),
+            right = DGH.getRealRight(self),
+            top = DGH.getRealTop(self),
+            bottom = DGH.getRealBottom(self),
+            width = DGH.getRealWidth(self),
+            # lines are drawn as series geoms if they are prepared by the
+            # worker thread
+            lineGeoms = self['threadedRefresh'])
+
+    def __prepare(self, layout):
+        """
+        Calculate the scale, the measure lines, the labels and the vertices
+        of the series of the diagram from the given layout.
+        """
+        chartType = layout['chartType']
+        series = layout['series']
+        numValues = max([len(values) for values in series], default=0)
+
+        # the values the axis have to cover, stacked bars reach up to the
+        # sums of their positive and negative values
+        if chartType == STACKED_BAR:
+            rangeValues = []
+            for i in range(numValues):
+                column = [values[i] for values in series if i < len(values)]
+                rangeValues.append(sum(v for v in column if v > 0))
+                rangeValues.append(sum(v for v in column if v < 0))
+        else:
+            rangeValues = [v for values in series for v in values]
+        maxValue = max(rangeValues, default=0)
+        minValue = min(rangeValues, default=0)
+
+        textLeftSizeArea = layout['numberAreaWidth']
         # get the left and right edge of our frame
-        left = DGH.getRealLeft(self)
-        right = DGH.getRealRight(self)
-        diagramLeft = left + textLeftSizeArea
+        right = layout['right']
+        diagramLeft = layout['left'] + textLeftSizeArea
+        top = layout['top']
+        bottom = layout['bottom']
+        stepFormat = layout['stepFormat']
+        stepAccuracy = layout['stepAccuracy']
 
         # If there is no data we can not calculate 'numPosSteps' and 'numNegSteps'
-        if not self["data"] and self["numPosSteps"] <= 0:
+        if not layout["hasData"] and layout["numPosSteps"] <= 0:
             numPosSteps = 5
         else:
-            numPosSteps = self['numPosSteps']
+            numPosSteps = layout['numPosSteps']
 
-        if not self["data"] and self["numNegSteps"] <= 0:
+        if not layout["hasData"] and layout["numNegSteps"] <= 0:
             numNegSteps = 5
         else:
-            numNegSteps = self['numNegSteps']
-
-        xStep = (DGH.getRealWidth(self) - textLeftSizeArea) / max(1, len(self['data'])-1)
-        posYRes = numPosSteps if numPosSteps > 0 else int(max(self['data']))
-        posYRes = DGH.getRealTop(self) / (posYRes if posYRes != 0 else 1)
-        negYRes = -numNegSteps if numNegSteps > 0 else int(min(self['data']))
-        negYRes = DGH.getRealBottom(self) / (negYRes if negYRes != 0 else 1)
-
-        # remove old content
-        if self.lines is not None:
-            self.lines.removeNode()
+            numNegSteps = layout['numNegSteps']
 
-        if self.measureLines is not None:
-            self.measureLines.removeNode()
+        diagramWidth = layout['width'] - textLeftSizeArea
+        xStep = diagramWidth / max(1, numValues-1)
+        posYRes = numPosSteps if numPosSteps > 0 else int(maxValue)
+        posYRes = top / (posYRes if posYRes != 0 else 1)
+        negYRes = -numNegSteps if numNegSteps > 0 else int(minValue)
+        negYRes = bottom / (negYRes if negYRes != 0 else 1)
 
-        if self.centerLine is not None:
-            self.centerLine.removeNode()
+        centerLineData = [((diagramLeft, 0, 0), (right, 0, 0))]
 
-        for text in self.xDescriptions:
-            text.removeNode()
-        self.xDescriptions = []
-
-        for text in self.points:
-            text.removeNode()
-        self.points = []
-
-        # prepare the line drawings
-        self.lines = LineNodePath(parent=self, thickness=3.0, colorVec=(1, 0, 0, 1))
-        self.measureLines = LineNodePath(parent=self, thickness=1.0, colorVec=(0, 0, 0, 1))
-        self.centerLine = LineNodePath(parent=self, thickness=2.0, colorVec=(0, 0, 0, 1))
-
-        # draw the center line
-        self.centerLine.reset()
-        self.centerLine.drawLines([((diagramLeft, 0, 0), (right, 0, 0))])
-        self.centerLine.create()
-
-        self.xDescriptions.append(
-            self.createcomponent(
-                'value0', (), None,
-                DirectLabel, (self,),
-                text = "0",
-                text_scale = self['numtextScale'],
-                text_align = TextNode.ARight,
-                pos = (diagramLeft, 0, -0.01),
-                relief = None,
-                state = 'normal'))
+        # (text, position) of the axis labels
+        axisLabels = [("0", (diagramLeft, 0, -0.01))]
 
         # calculate the positive measure lines and add the numbers
         measureLineData = []
-        numSteps = (numPosSteps if numPosSteps > 0 else math.floor(max(self['data']))) + 1
-        for i in range(1, numSteps, self['numPosStepsStep']):
+        numSteps = (numPosSteps if numPosSteps > 0 else math.floor(maxValue)) + 1
+        for i in range(1, numSteps, layout['numPosStepsStep']):
             measureLineData.append(
                 (
                     (diagramLeft, 0, i*posYRes),
@@ -129,24 +249,15 @@ class DirectDiagram(DirectFrame):
                 )
             )
 
-            calcBase = 1 / DGH.getRealTop(self)
-            maxData = numPosSteps if numPosSteps > 0 else max(self['data'])
-            value = self['stepFormat'](round(i * posYRes * calcBase * maxData, self['stepAccuracy']))
+            calcBase = 1 / top
+            maxData = numPosSteps if numPosSteps > 0 else maxValue
+            value = stepFormat(round(i * posYRes * calcBase * maxData, stepAccuracy))
             y = i*posYRes
-            self.xDescriptions.append(
-                self.createcomponent(
-                    'value{}'.format(value), (), None,
-                    DirectLabel, (self,),
-                    text = str(value),
-                    text_scale = self['numtextScale'],
-                    text_align = TextNode.ARight,
-                    pos = (diagramLeft, 0, y-0.025),
-                    relief = None,
-                    state = 'normal'))
+            axisLabels.append((str(value), (diagramLeft, 0, y-0.025)))
 
         # calculate the negative measure lines and add the numbers
-        numSteps = (numNegSteps if numNegSteps > 0 else math.floor(abs(min(self['data'])))) + 1
-        for i in range(1, numSteps, self['numNegStepsStep']):
+        numSteps = (numNegSteps if numNegSteps > 0 else math.floor(abs(minValue))) + 1
+        for i in range(1, numSteps, layout['numNegStepsStep']):
             measureLineData.append(
                 (
                     (diagramLeft, 0, -i*negYRes),
@@ -154,53 +265,318 @@ class DirectDiagram(DirectFrame):
                 )
             )
 
-            calcBase = 1 / DGH.getRealBottom(self)
-            maxData = numPosSteps if numPosSteps > 0 else max(self['data'])
-            value = self['stepFormat'](round(i * negYRes * calcBase * maxData, self['stepAccuracy']))
+            calcBase = 1 / bottom
+            maxData = numPosSteps if numPosSteps > 0 else maxValue
+            value = stepFormat(round(i * negYRes * calcBase * maxData, stepAccuracy))
             y = -i*negYRes
-            self.xDescriptions.append(
-                self.createcomponent(
-                    'value{}'.format(value), (), None,
-                    DirectLabel, (self,),
-                    text = str(value),
-                    text_scale = self['numtextScale'],
-                    text_align = TextNode.ARight,
-                    pos = (diagramLeft, 0, y+0.01),
-                    relief = None,
-                    state = 'normal'))
+            axisLabels.append((str(value), (diagramLeft, 0, y+0.01)))
+
+        def getY(value):
+            return value * (posYRes if value >= 0 else negYRes)
+
+        # (text, position) of the data point labels, None if they are hidden
+        pointLabels = [] if layout['showDataNumbers'] else None
+        if chartType == LINE:
+            seriesVertices = self.__getLineVertices(
+                series, diagramLeft, xStep, getY, stepAccuracy, pointLabels)
+            primitiveType = GeomLines
+        elif chartType == BAR or chartType == STACKED_BAR:
+            seriesVertices = self.__getBarVertices(
+                series, diagramLeft, diagramWidth, numValues, getY,
+                stepAccuracy, layout['barWidth'], chartType == STACKED_BAR,
+                pointLabels)
+            primitiveType = GeomTriangles
+        elif chartType == SCATTER:
+            seriesVertices = self.__getScatterVertices(
+                series, diagramLeft, xStep, getY, stepAccuracy, pointLabels)
+            primitiveType = GeomPoints
+        else:
+            seriesVertices = self.__getAreaVertices(
+                series, diagramLeft, xStep, getY, stepAccuracy, pointLabels)
+            primitiveType = GeomTriangles
+
+        return dict(
+            centerLineData = centerLineData,
+            measureLineData = measureLineData,
+            axisLabels = axisLabels,
+            pointLabels = pointLabels or [],
+            seriesVertices = seriesVertices,
+            primitiveType = primitiveType,
+            lineGeoms = layout['lineGeoms'])
+
+    def __prepareTask(self, layout, backBuffers, generation):
+        """
+        Runs on the refresh task chain. Prepares the diagram and writes the
+        series vertices into vertex data which isn't shown yet, then hands
+        the result to the main thread.
+        """
+        result = self.__prepare(layout)
+        vertexDatas = []
+        for seriesIndex, vertices in enumerate(result['seriesVertices']):
+            vdata = None
+            if seriesIndex < len(backBuffers):
+                vdata = backBuffers[seriesIndex]
+            if vdata is None:
+                vdata = GeomVertexData(
+                    'series', GeomVertexFormat.getV3(), Geom.UHDynamic)
+            self.__writeVertices(vdata, vertices)
+            vertexDatas.append(vdata)
+        result['vertexDatas'] = vertexDatas
+        result['generation'] = generation
+        # swap the buffers on the main thread before the next frame renders
+        taskMgr.add(
+            self.__swapTask, self.uniqueName('swap'), extraArgs=[result])
+
+    def __swapTask(self, result):
+        self.refreshRunning = False
+        if self.isEmpty():
+            # the diagram got destroyed while it was prepared
+            return
+        if result['generation'] == self.refreshGeneration:
+            self.__apply(result)
+        if self.refreshPending:
+            self.refresh()
+
+    def __apply(self, result):
+        """Show the prepared lines, labels and series of the diagram"""
+        # prepare the line drawings, they are kept and redrawn on refresh
+        if self.lines is None:
+            self.lines = LineNodePath(parent=self, thickness=3.0, colorVec=(1, 0, 0, 1))
+            self.measureLines = LineNodePath(parent=self, thickness=1.0, colorVec=(0, 0, 0, 1))
+            self.centerLine = LineNodePath(parent=self, thickness=2.0, colorVec=(0, 0, 0, 1))
+
+        # draw the center line
+        self.centerLine.reset()
+        self.centerLine.drawLines(result['centerLineData'])
+        self.centerLine.create()
+
+        self.__updateLabels(
+            self.xDescriptions, 'axisLabel', result['axisLabels'],
+            self['numtextScale'])
 
         # Draw the lines
         self.measureLines.reset()
-        self.measureLines.drawLines(measureLineData)
+        self.measureLines.drawLines(result['measureLineData'])
         self.measureLines.create()
 
-        lineData = []
-        for i in range(1, len(self['data'])):
-            yResA = posYRes if self['data'][i-1] >= 0 else negYRes
-            yResB = posYRes if self['data'][i] >= 0 else negYRes
-            lineData.append(
-                (
-                    # Point A
-                    (diagramLeft+(i-1)*xStep, 0, self['data'][i-1] * yResA),
-                    # Point B
-                    (diagramLeft+i*xStep, 0, self['data'][i] * yResB)
-                )
-            )
+        colors = self['seriesColors']
+        primitiveType = result['primitiveType']
+        seriesVertices = result['seriesVertices']
+        self.lines.reset()
+        if primitiveType is GeomLines and not result['lineGeoms']:
+            self.__updateSeriesGeoms([], None, colors)
+            for seriesIndex, vertices in enumerate(seriesVertices):
+                self.lines.setColor(colors[seriesIndex % len(colors)])
+                for i in range(0, len(vertices), 6):
+                    self.lines.moveTo(*vertices[i:i+3])
+                    self.lines.drawTo(*vertices[i+3:i+6])
+            self.lines.create()
+        else:
+            self.__updateSeriesGeoms(
+                seriesVertices, primitiveType, colors,
+                result.get('vertexDatas'))
 
-            if (self['showDataNumbers']):
-                value = round(self['data'][i-1], self['stepAccuracy'])
-                self.points.append(
-                    self.createcomponent(
-                        'value{}'.format(value), (), None,
-                        DirectLabel, (self,),
-                        text = str(value),
-                        text_scale = self['dataNumtextScale'],
-                        text_align = TextNode.ARight,
-                        pos = (diagramLeft+(i-1)*xStep, 0, self['data'][i-1] * yResA),
-                        relief = None,
-                        state = 'normal'))
+        self.__updateLabels(
+            self.points, 'dataLabel', result['pointLabels'],
+            self['dataNumtextScale'])
 
-        # Draw the lines
-        self.lines.reset()
-        self.lines.drawLines(lineData)
-        self.lines.create()
+    def __getLineVertices(
+            self, series, diagramLeft, xStep, getY, stepAccuracy,
+            pointLabels):
+        """Returns the line segment vertices of each series"""
+        seriesVertices = []
+        for values in series:
+            vertices = array('f')
+            for i in range(1, len(values)):
+                # Point A and point B
+                vertices.extend((
+                    diagramLeft+(i-1)*xStep, 0, getY(values[i-1]),
+                    diagramLeft+i*xStep, 0, getY(values[i])))
+
+                if pointLabels is not None:
+                    value = round(values[i-1], stepAccuracy)
+                    pointLabels.append(
+                        (str(value),
+                         (diagramLeft+(i-1)*xStep, 0, getY(values[i-1]))))
+            seriesVertices.append(vertices)
+        return seriesVertices
+
+    def __getBarVertices(
+            self, series, diagramLeft, diagramWidth, numValues, getY,
+            stepAccuracy, barWidth, stacked, pointLabels):
+        """
+        Returns the triangle vertices of the bars of each series. Bars of
+        different series are placed next to each other or, for stacked bar
+        charts, on top of each other.
+        """
+        slotWidth = diagramWidth / max(1, numValues)
+        groupWidth = slotWidth * barWidth
+        barWidth = groupWidth if stacked else groupWidth / max(1, len(series))
+        # the current top of the positive and negative stacks per slot
+        posStacks = [0] * numValues
+        negStacks = [0] * numValues
+
+        seriesVertices = []
+        for seriesIndex, values in enumerate(series):
+            vertices = array('f')
+            for i, value in enumerate(values):
+                x = diagramLeft + i*slotWidth + (slotWidth - groupWidth) / 2
+                if stacked:
+                    stacks = posStacks if value >= 0 else negStacks
+                    base = stacks[i]
+                    stacks[i] = top = base + value
+                else:
+                    x += seriesIndex * barWidth
+                    base = 0
+                    top = value
+                self.__addRect(
+                    vertices, x, getY(base), x + barWidth, getY(top))
+                if pointLabels is not None:
+                    pointLabels.append(
+                        (str(round(value, stepAccuracy)),
+                         (x + barWidth / 2, 0, getY(top))))
+            seriesVertices.append(vertices)
+        return seriesVertices
+
+    def __getScatterVertices(
+            self, series, diagramLeft, xStep, getY, stepAccuracy,
+            pointLabels):
+        """Returns the point vertices of each series"""
+        seriesVertices = []
+        for values in series:
+            vertices = array('f')
+            for i, value in enumerate(values):
+                x = diagramLeft + i*xStep
+                vertices.extend((x, 0, getY(value)))
+                if pointLabels is not None:
+                    pointLabels.append(
+                        (str(round(value, stepAccuracy)),
+                         (x, 0, getY(value))))
+            seriesVertices.append(vertices)
+        return seriesVertices
+
+    def __getAreaVertices(
+            self, series, diagramLeft, xStep, getY, stepAccuracy,
+            pointLabels):
+        """
+        Returns the triangle vertices of the areas between the line of each
+        series and the center line.
+        """
+        seriesVertices = []
+        for values in series:
+            vertices = array('f')
+            for i, value in enumerate(values):
+                if pointLabels is not None:
+                    pointLabels.append(
+                        (str(round(value, stepAccuracy)),
+                         (diagramLeft + i*xStep, 0, getY(value))))
+                if i == 0:
+                    continue
+                xA = diagramLeft + (i-1)*xStep
+                xB = diagramLeft + i*xStep
+                yA = getY(values[i-1])
+                yB = getY(value)
+                if yA * yB < 0:
+                    # the line crosses the center line, split the segment
+                    # into a positive and a negative triangle
+                    xCross = xA + (xB - xA) * yA / (yA - yB)
+                    vertices.extend((
+                        xA, 0, 0, xCross, 0, 0, xA, 0, yA,
+                        xCross, 0, 0, xB, 0, 0, xB, 0, yB))
+                else:
+                    vertices.extend((
+                        xA, 0, 0, xB, 0, 0, xB, 0, yB,
+                        xA, 0, 0, xB, 0, yB, xA, 0, yA))
+            seriesVertices.append(vertices)
+        return seriesVertices
+
+    def __addRect(self, vertices, left, bottom, right, top):
+        vertices.extend((
+            left, 0, bottom, right, 0, bottom, right, 0, top,
+            left, 0, bottom, right, 0, top, left, 0, top))
+
+    def __writeVertices(self, vdata, vertices):
+        vdata.uncleanSetNumRows(len(vertices) // 3)
+        if vertices:
+            memoryview(vdata.modifyArray(0)).cast('B').cast('f')[:] = vertices
+
+    def __updateSeriesGeoms(
+            self, seriesVertices, primitiveType, colors, vertexDatas=None):
+        """
+        Show the vertices of each series with the geom of the series. Geoms
+        are kept and rewritten in place, they are only created if a series
+        was added or the chart type changed its primitive type. If filled
+        vertex datas are given, they get swapped in and the vertex data
+        shown until now will be filled by the next threaded refresh.
+        """
+        for seriesIndex, vertices in enumerate(seriesVertices):
+            if seriesIndex < len(self.seriesGeoms) \
+                    and self.seriesGeoms[seriesIndex][2] is primitiveType:
+                seriesNP, geom, _, buffers = self.seriesGeoms[seriesIndex]
+            else:
+                vdata = GeomVertexData(
+                    'series', GeomVertexFormat.getV3(), Geom.UHDynamic)
+                geom = Geom(vdata)
+                geom.addPrimitive(primitiveType(Geom.UHDynamic))
+                node = GeomNode('series{}'.format(seriesIndex))
+                node.addGeom(geom)
+                seriesNP = self.attachNewNode(node, -1)
+                seriesNP.setTwoSided(True)
+                # the shown vertex data and the one to fill next
+                buffers = [vdata, None]
+                if seriesIndex < len(self.seriesGeoms):
+                    self.seriesGeoms[seriesIndex][0].removeNode()
+                    self.seriesGeoms[seriesIndex] = (
+                        seriesNP, geom, primitiveType, buffers)
+                else:
+                    self.seriesGeoms.append(
+                        (seriesNP, geom, primitiveType, buffers))
+
+            if vertexDatas is None:
+                self.__writeVertices(buffers[0], vertices)
+            else:
+                buffers[:] = [vertexDatas[seriesIndex], buffers[0]]
+            # the primitive has to match the new vertex data before it is
+            # set, the geom checks that all referenced vertices exist
+            geom.modifyPrimitive(0).setNonindexedVertices(
+                0, len(vertices) // 3)
+            geom.setVertexData(buffers[0])
+            seriesNP.node().markInternalBoundsStale()
+            seriesNP.setColor(colors[seriesIndex % len(colors)])
+            if primitiveType is GeomPoints:
+                seriesNP.setRenderModeThickness(self['pointSize'])
+            elif primitiveType is GeomLines:
+                seriesNP.setRenderModeThickness(3.0)
+        while len(self.seriesGeoms) > len(seriesVertices):
+            self.seriesGeoms.pop()[0].removeNode()
+
+    def __updateLabels(self, labels, group, texts, textScale):
+        """
+        Show the given (text, position) tuples with the labels of the given
+        list and component group. Existing labels only get their text and
+        position updated, labels are only created or destroyed if the
+        number of texts changed.
+        """
+        for index, (text, pos) in enumerate(texts):
+            if index < len(labels):
+                label = labels[index]
+                if label['text'] != text:
+                    label['text'] = text
+                if label.textScale != textScale:
+                    label['text_scale'] = textScale
+                    label.textScale = textScale
+            else:
+                label = self.createcomponent(
+                    '{}{}'.format(group, index), (), group,
+                    DirectLabel, (self,),
+                    text = text,
+                    text_scale = textScale,
+                    text_align = TextNode.ARight,
+                    relief = None,
+                    state = 'normal')
+                label.textScale = textScale
+                labels.append(label)
+            label.setPos(pos)
+        while len(labels) > len(texts):
+            labels.pop()
+            self.destroycomponent('{}{}'.format(group, len(labels)))
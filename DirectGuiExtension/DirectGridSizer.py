@@ -2,7 +2,7 @@
 
 __all__ = ['DirectGridSizer']
 
-from panda3d.core import *
+from panda3d.core import PGItem, TextNode
 from direct.gui import DirectGuiGlobals as DGG
 from direct.gui.DirectFrame import DirectFrame
 from . import DirectGuiHelper as DGH
@@ -16,7 +16,7 @@ class DirectItemContainer():
         self.widthInColumns = widthInColumns
         self.heightInRows = heightInRows
 
-class DirectGridSizer(DirectFrame):
+class DirectGridSizer(DGH.BakeMixin, DirectFrame):
     """
     A frame to add multiple other directGui elements to that will then be
     automatically be placed stacked next to each other.
@@ -37,8 +37,23 @@ class DirectGridSizer(DirectFrame):
             ('autoUpdateFrameSize', True,   None),
             ('boxAlign',    TextNode.ALeft, self.refresh),
 
+            # Combine the visuals of non interactive widgets into a few
+            # batched geoms after every layout change
+            ('bake',           False,       self.setBake),
+
             ('suppressMouse',  0,           None),
             )
+
+        # available sizes to the measured (frame, layout data)
+        self.measureCache = {}
+        # the result of the last measure call which arrange will use
+        self.measured = None
+        self.needsArrange = False
+        self.arrangedFrameSize = None
+        # the node holding the baked visuals and the hidden originals
+        self.bakedNode = None
+        self.bakedStateDefs = []
+
         # Merge keyword options with default options
         self.defineoptions(kw, optiondefs)
 
@@ -86,18 +101,38 @@ class DirectGridSizer(DirectFrame):
         if self.skipInitRefresh: return
         if not hasattr(self, "bounds"): return
 
+        self.invalidateMeasure()
+        self.measure()
+        self.arrange()
+
+    #
+    # MEASURE AND ARRANGE
+    #
+    def measure(self, availableSize=None):
+        """
+        Measure every item once and return the real frame (left, right,
+        bottom, top) this sizer wants to have. The result is cached until
+        invalidateMeasure is called.
+        """
+        if availableSize is not None:
+            availableSize = tuple(availableSize)
+        cached = self.measureCache.get(availableSize)
+        if cached is not None:
+            self.measured = cached
+            return cached[0]
+
         for item in self["items"]:
+            if item.rowIndex >= self["numRows"]:
+                raise IndexError(f"Row index defined in item {item.element} exceeded number of rows in grid sizer: numRows={self['numRows']}")
+            if item.columnIndex >= self["numColumns"]:
+                raise IndexError(f"Column index defined in item {item.element} exceeded number of columns in grid sizer: numColumns={self['numColumns']}")
             item.element.frameInitialiseFunc()
+        frames = [DGH.measure(item.element) for item in self["items"]]
 
         # variables to store the maximum row and column widths
         rowHeights = [0]*self["numRows"]
         columnWidths = [0]*self["numColumns"]
 
-        b_top = 0
-        b_bottom = 0
-        b_left = 0
-        b_right = 0
-
         pad_x = self["pad"][0]
         pad_y = self["pad"][1]
 
@@ -106,55 +141,106 @@ class DirectGridSizer(DirectFrame):
         margin_bottom = self["itemMargin"][2]
         margin_top = self["itemMargin"][3]
 
-        if self["autoUpdateFrameSize"]:
-            self["frameSize"] = (0, 0, 0, 0)
-
-        # get the max row and column sizes
-        for r in range(self["numRows"]):
-            for c in range(self["numColumns"]):
-
-                for item in self["items"]:
-                    if item.rowIndex == r and item.columnIndex == c:
-                        rowHeights[r] = max(rowHeights[r], DGH.getRealHeight(item.element) / item.heightInRows + margin_bottom + margin_top)
-                        columnWidths[c] = max(columnWidths[c], DGH.getRealWidth(item.element) / item.widthInColumns + margin_left + margin_right)
-                        break
-
-        for item in self["items"]:
+        # get the max row and column sizes, only the first item placed in a
+        # cell counts
+        cells = set()
+        for item, frame in zip(self["items"], frames):
             r = item.rowIndex
             c = item.columnIndex
+            if (r, c) in cells: continue
+            cells.add((r, c))
+            rowHeights[r] = max(rowHeights[r], (frame[3] - frame[2]) / item.heightInRows + margin_bottom + margin_top)
+            columnWidths[c] = max(columnWidths[c], (frame[1] - frame[0]) / item.widthInColumns + margin_left + margin_right)
+
+        # the offset of every row and column
+        rowOffsets = [0]*self["numRows"]
+        for r in range(1, self["numRows"]):
+            rowOffsets[r] = rowOffsets[r-1] - rowHeights[r-1]
+        columnOffsets = [0]*self["numColumns"]
+        for c in range(1, self["numColumns"]):
+            columnOffsets[c] = columnOffsets[c-1] + columnWidths[c-1]
+
+        positions = []
+        for item in self["items"]:
+            positions.append((
+                pad_x + columnOffsets[item.columnIndex] + margin_left,
+                pad_y + rowOffsets[item.rowIndex] + margin_top))
 
-            if r >= self["numRows"]:
-                raise IndexError(f"Row index defined in item {item.element} exceeded number of rows in grid sizer: numRows={self['numRows']}")
-            if c >= self["numColumns"]:
-                raise IndexError(f"Column index defined in item {item.element} exceeded number of columns in grid sizer: numColumns={self['numColumns']}")
-
-            z = 0
-            for i in range(r):
-                z -= rowHeights[i]
-
-            x = 0
-            for i in range(c):
-                x += columnWidths[i]
-
-            item.element.setPos(pad_x + x + margin_left, 0, pad_y + z + margin_top)
-
+        frameSize = None
         if self["autoUpdateFrameSize"]:
-
-            for item in self["items"]:
-                b_left = min(b_left, DGH.getRealLeft(item.element) + item.element.getX())
-                b_right = max(b_right, DGH.getRealRight(item.element) + item.element.getX())
-
-                b_bottom = min(b_bottom, DGH.getRealBottom(item.element) + item.element.getZ())
-                b_top = max(b_top, DGH.getRealTop(item.element) + item.element.getZ())
-
-            self["frameSize"] = [b_left+pad_x, b_right+pad_x, b_bottom+pad_y, b_top+pad_y]
-
-            xShift = 0
-            if self["boxAlign"] == TextNode.ACenter:
-                self["frameSize"][0] = self["frameSize"][0] - self["frameSize"][1]/2
-                self["frameSize"][1] = self["frameSize"][1]/2
-                xShift = -self["frameSize"][1]/2
-            if self["boxAlign"] == TextNode.ARight:
-                self["frameSize"][0] = self["frameSize"][1]
-                self["frameSize"][1] = self["frameSize"][0]
-                xShift = -self["frameSize"][1]
+            b_top = 0
+            b_bottom = 0
+            b_left = 0
+            b_right = 0
+            for frame, (x, z) in zip(frames, positions):
+                b_left = min(b_left, frame[0] + x)
+                b_right = max(b_right, frame[1] + x)
+
+                b_bottom = min(b_bottom, frame[2] + z)
+                b_top = max(b_top, frame[3] + z)
+
+            frameSize = [b_left+pad_x, b_right+pad_x, b_bottom+pad_y, b_top+pad_y]
+            alignedFrameSize = self.__align_frame_size(list(frameSize))
+            scale = self.getScale()
+            desired = (
+                alignedFrameSize[0] * scale[0], alignedFrameSize[1] * scale[0],
+                alignedFrameSize[2] * scale[1], alignedFrameSize[3] * scale[1])
+        else:
+            desired = (
+                DGH.getRealLeft(self), DGH.getRealRight(self),
+                DGH.getRealBottom(self), DGH.getRealTop(self))
+
+        self.measured = (desired, (positions, frameSize))
+        self.measureCache[availableSize] = self.measured
+        self.needsArrange = True
+        return desired
+
+    def arrange(self, frameSize=None):
+        """
+        Place all items using the sizes found by the last measure call without
+        measuring them again and set the given or measured frame size.
+        """
+        if self.measured is None:
+            self.measure()
+        if not self.needsArrange and frameSize == self.arrangedFrameSize:
+            return
+        self.invalidateBake()
+        DGH.invalidateParentBake(self)
+        positions, measuredFrameSize = self.measured[1]
+
+        for item, (x, z) in zip(self["items"], positions):
+            item.element.setPos(x, 0, z)
+            # nested layout widgets place their own items
+            DGH.arrange(item.element)
+
+        if frameSize is not None:
+            self["frameSize"] = frameSize
+        elif measuredFrameSize is not None:
+            self["frameSize"] = list(measuredFrameSize)
+            self.__align_frame_size(self["frameSize"])
+
+        self.needsArrange = False
+        self.arrangedFrameSize = frameSize
+
+    def invalidateMeasure(self):
+        """
+        Drop the cached measurements of this sizer and the layout widgets
+        enclosing it, so they will measure again on their next refresh.
+        """
+        if not self.measureCache and self.measured is None: return
+        self.measureCache = {}
+        self.measured = None
+        DGH.invalidateParentMeasure(self)
+
+    def destroy(self):
+        self.clearBake()
+        DirectFrame.destroy(self)
+
+    def __align_frame_size(self, frameSize):
+        if self["boxAlign"] == TextNode.ACenter:
+            frameSize[0] = frameSize[0] - frameSize[1]/2
+            frameSize[1] = frameSize[1]/2
+        if self["boxAlign"] == TextNode.ARight:
+            frameSize[0] = frameSize[1]
+            frameSize[1] = frameSize[0]
+        return frameSize
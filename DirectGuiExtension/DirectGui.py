@@ -0,0 +1,56 @@
+"""
+Lazy namespace of all DirectGuiExtension widgets, like direct.gui.DirectGui
+is for the DirectGui widgets. The module defining a widget only gets
+imported once the widget is accessed for the first time:
+
+    from DirectGuiExtension import DirectGui as DGE
+    sizer = DGE.DirectBoxSizer()
+
+A star import will import all widget modules at once.
+"""
+
+import importlib
+
+# widget class names to the module they are defined in
+_WIDGETS = {
+    'DirectAccordion': 'DirectAccordion',
+    'DirectAutoSizer': 'DirectAutoSizer',
+    'DirectBoxSizer': 'DirectBoxSizer',
+    'DirectCollapsibleFrame': 'DirectCollapsibleFrame',
+    'DirectDatePicker': 'DirectDatePicker',
+    'DirectDatePickerPool': 'DirectDatePicker',
+    'DirectDiagram': 'DirectDiagram',
+    'DirectGridSizer': 'DirectGridSizer',
+    'DirectMenuBar': 'DirectMenuBar',
+    'DirectMenuItem': 'DirectMenuItem',
+    'DirectMenuItemEntry': 'DirectMenuItem',
+    'DirectMenuItemSubMenu': 'DirectMenuItem',
+    'DirectMenuSeparator': 'DirectMenuItem',
+    'DirectMenuController': 'DirectMenuItem',
+    'DirectMultiSplitFrame': 'DirectMultiSplitFrame',
+    'DirectSplitPane': 'DirectMultiSplitFrame',
+    'DirectSplitGroup': 'DirectMultiSplitFrame',
+    'DirectOptionMenu': 'DirectOptionMenu',
+    'DirectScrolledWindowFrame': 'DirectScrolledWindowFrame',
+    'DirectSpinBox': 'DirectSpinBox',
+    'DirectSplitFrame': 'DirectSplitFrame',
+    'DirectTabbedFrame': 'DirectTabbedFrame',
+    'DirectTooltip': 'DirectTooltip',
+    'DirectTreeView': 'DirectTreeView',
+    'DirectWidgetPool': 'DirectWidgetPool',
+}
+
+__all__ = list(_WIDGETS)
+
+def __getattr__(name):
+    moduleName = _WIDGETS.get(name)
+    if moduleName is None:
+        raise AttributeError(
+            "module {!r} has no attribute {!r}".format(__name__, name))
+    value = getattr(importlib.import_module('.' + moduleName, __package__), name)
+    # store it, so further accesses don't get here anymore
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
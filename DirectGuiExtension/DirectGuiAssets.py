@@ -0,0 +1,129 @@
+"""
+Shared fonts and textures of the DirectGuiExtension widgets.
+
+Every font and texture requested through this module gets loaded only once
+per process and the same object is handed out to all widgets using it, so
+creating many widgets does no loader work after the first one.
+
+The assets bundled in the data directory of the package can be loaded in
+the background before any widget gets created, e.g. while a splash screen
+is shown.
+
+    from DirectGuiExtension import DirectGuiAssets
+    DirectGuiAssets.preload(callback=showMainMenu)
+"""
+
+__all__ = ['getDataPath', 'getFont', 'getTexture', 'isLoaded', 'preload',
+    'clear']
+
+import os
+
+from panda3d.core import Filename, StaticTextFont
+
+DATA_DIR = Filename.fromOsSpecific(
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data'))
+
+# the assets bundled with the package, relative to the data directory
+FONTS = ['shuttle_controls']
+TEXTURES = ['icons/minusnode.gif', 'icons/plusnode.gif']
+
+# font files that are models and can be loaded with the model loader
+MODEL_EXTENSIONS = ('', 'egg', 'bam', 'pz', 'gz')
+
+PRELOAD_TASK_CHAIN = 'DirectGuiAssets'
+
+_fonts = {}
+_textures = {}
+
+
+def getDataPath(name):
+    """Returns the path of the given file in the packages data directory"""
+    return Filename(DATA_DIR, name)
+
+def getFont(path):
+    """Returns the font of the given path, loading it on first use"""
+    key = str(path)
+    font = _fonts.get(key)
+    if font is None:
+        font = _fonts[key] = loader.loadFont(key)
+    return font
+
+def getTexture(path):
+    """Returns the texture of the given path, loading it on first use"""
+    key = str(path)
+    texture = _textures.get(key)
+    if texture is None:
+        texture = _textures[key] = loader.loadTexture(key)
+    return texture
+
+def isLoaded(path):
+    """Returns True if the font or texture of the given path is loaded"""
+    key = str(path)
+    return key in _fonts or key in _textures
+
+def preload(fonts=None, textures=None, callback=None, extraArgs=[]):
+    """
+    Load the given fonts and textures in the background, by default all
+    assets bundled with the package. Model based fonts get loaded by the
+    asynchronous model loader. Textures and other fonts get loaded on a
+    separate task chain, as the loader has no asynchronous texture loading.
+    The callback will be called with the extraArgs on the main thread once
+    everything has been loaded. Assets that can't be loaded are skipped, the
+    loader reports them and widgets using them fail when they load them.
+    """
+    if fonts is None:
+        fonts = [getDataPath(name) for name in FONTS]
+    if textures is None:
+        textures = [getDataPath(name) for name in TEXTURES]
+    fonts = [str(path) for path in fonts if not isLoaded(path)]
+    textures = [str(path) for path in textures if not isLoaded(path)]
+
+    modelFonts = [path for path in fonts
+        if Filename(path).getExtension() in MODEL_EXTENSIONS]
+    otherFonts = [path for path in fonts if path not in modelFonts]
+
+    pending = [int(bool(modelFonts)) + int(bool(otherFonts or textures))]
+    def done():
+        pending[0] -= 1
+        if pending[0] <= 0 and callback is not None:
+            callback(*extraArgs)
+
+    if pending[0] == 0:
+        done()
+        return
+
+    if modelFonts:
+        def fontModelsLoaded(models):
+            try:
+                for path, model in zip(modelFonts, models):
+                    if model is not None and path not in _fonts:
+                        _fonts[path] = StaticTextFont(model.node())
+            finally:
+                done()
+        loader.loadModel(modelFonts, callback=fontModelsLoaded)
+
+    if otherFonts or textures:
+        if not taskMgr.hasTaskChain(PRELOAD_TASK_CHAIN):
+            taskMgr.setupTaskChain(PRELOAD_TASK_CHAIN, numThreads=1)
+        taskMgr.add(
+            _loadTask, 'DirectGuiAssets-preload',
+            extraArgs=[otherFonts, textures, done],
+            taskChain=PRELOAD_TASK_CHAIN)
+
+def _loadTask(fonts, textures, done):
+    try:
+        for load, paths in ((getFont, fonts), (getTexture, textures)):
+            for path in paths:
+                try:
+                    load(path)
+                except IOError:
+                    # already reported by the loader
+                    pass
+    finally:
+        # report back on the main thread
+        taskMgr.add(done, 'DirectGuiAssets-preloadDone', extraArgs=[])
+
+def clear():
+    """Drop all references to the loaded fonts and textures"""
+    _fonts.clear()
+    _textures.clear()
@@ -7,6 +7,8 @@ See License.txt or http://opensource.org/licenses/BSD-2-Clause for more info
 """
 
 from panda3d import core as p3d
+from direct.gui.DirectGuiBase import DirectGuiWidget
+from direct.task.TaskManagerGlobal import taskMgr
 
 
 def getBorderSize(guiItem):
@@ -56,3 +58,234 @@ def getRealTop(guiItem):
 
 def getRealBottom(guiItem):
     return (getBounds(guiItem)[2] - getBorderSize(guiItem)[1]) * guiItem.getScale()[1]
+
+def getParentWidget(guiItem):
+    """Returns the DirectGui widget the given item is parented to or None"""
+    parent = guiItem.getParent()
+    if parent.isEmpty():
+        return None
+    # the node names of widgets end with their gui id
+    return DirectGuiWidget.guiDict.get(parent.getName().split('-')[-1])
+
+#
+# MEASURE AND ARRANGE
+#
+# Layout widgets implement a two phase protocol. measure(availableSize)
+# returns the real frame (left, right, bottom, top) they want to have and
+# caches it, arrange(frameSize) places their children using the sizes found
+# while measuring. Helpers below treat all other widgets the same way.
+#
+def measure(guiItem, availableSize=None):
+    """
+    Returns the real frame (left, right, bottom, top) of the given item as
+    seen from its parent, not including its position. Layout widgets will
+    return their cached measurement, all others get measured once.
+    """
+    measureFunc = getattr(guiItem, 'measure', None)
+    if measureFunc is not None:
+        return measureFunc(availableSize)
+    guiItem.resetFrameSize()
+    return (
+        getRealLeft(guiItem), getRealRight(guiItem),
+        getRealBottom(guiItem), getRealTop(guiItem))
+
+def arrange(guiItem, frameSize=None):
+    """
+    Let layout widgets place their children within the given frame size or
+    their measured one if None. Other widgets only get the frame size set.
+    """
+    arrangeFunc = getattr(guiItem, 'arrange', None)
+    if arrangeFunc is not None:
+        arrangeFunc(frameSize)
+    elif frameSize is not None:
+        guiItem['frameSize'] = frameSize
+
+def invalidateParentMeasure(guiItem):
+    """
+    Drop the cached measurement of the closest layout widget enclosing the
+    given item, which will pass it on to its own enclosing layout widget.
+    Enclosing layout widgets with baked visuals will restore them.
+    """
+    invalidateParentBake(guiItem)
+    parent = guiItem.getParent()
+    while not parent.isEmpty():
+        widget = DirectGuiWidget.guiDict.get(parent.getName().split('-')[-1])
+        if widget is not None and hasattr(widget, 'invalidateMeasure'):
+            widget.invalidateMeasure()
+            return
+        # plain nodes and widgets may sit in between, e.g. content nodes
+        parent = parent.getParent()
+
+#
+# BAKING
+#
+# Frames and labels are drawn by their PGItem from the state definition of
+# their current state, which holds the frame, text and image geometry. A
+# layout widget can copy these into one flattened node, hide the originals
+# and still have all mouse regions of the widgets working.
+#
+def bakeVisuals(root):
+    """
+    Copy the visuals of all widgets below root that don't change with the
+    mouse, i.e. plain PGItems like frames and labels, into one flattened
+    node parented to root and hide the originals. Widgets that bake their
+    own children and the children of other PGItems, e.g. the canvas of a
+    scrolled frame, are skipped. Returns the baked node and the list of hidden
+    state definitions to be given to unbakeVisuals.
+
+    Flattening merges geometry by its render state, so the visuals are put
+    into layers which are drawn in order, first all untextured frames, then
+    textured frames and images and last all texts.
+    """
+    baked = p3d.NodePath('baked')
+    layers = [baked.attachNewNode(name) for name in ('frames', 'images', 'texts')]
+    hidden = []
+    _bakeChildren(root, root, p3d.RenderState.makeEmpty(), layers, hidden)
+    for layer in layers:
+        layer.flattenStrong()
+    # draw the baked visuals before the interactive widgets of root
+    baked.reparentTo(root, -1)
+    return baked, hidden
+
+def _bakeChildren(root, nodePath, parentState, layers, hidden):
+    frames, images, texts = layers
+    for child in nodePath.getChildren():
+        if child.node().isOverallHidden():
+            continue
+        widget = DirectGuiWidget.guiDict.get(child.getName().split('-')[-1])
+        if isinstance(widget, BakeMixin) and widget['bake']:
+            continue
+        state = parentState.compose(child.getState())
+        node = child.node()
+        if type(node) is p3d.PGItem:
+            stateDef = p3d.NodePath(node.getStateDef(node.getState()))
+            if not stateDef.isHidden():
+                transform = child.getTransform(root).compose(
+                    stateDef.getTransform())
+                partState = state.compose(stateDef.getState())
+                for part in stateDef.getChildren():
+                    if part.node().isOverallHidden():
+                        continue
+                    isText = part.node().isOfType(p3d.TextNode) \
+                        or not part.findAllMatches('**/+TextNode').isEmpty()
+                    if isText:
+                        layer = texts
+                    elif part.findAllTextures().getNumTextures():
+                        layer = images
+                    else:
+                        layer = frames
+                    copy = part.copyTo(layer)
+                    copy.setTransform(transform.compose(part.getTransform()))
+                    copy.setState(partState.compose(part.getState()))
+                    if isText:
+                        _generateTexts(copy)
+                stateDef.hide()
+                hidden.append(stateDef)
+        elif node.isOfType(p3d.PGItem):
+            # specialised items like scrolled frames and entries clip, move
+            # or change their children themselves, leave them as they are
+            continue
+        _bakeChildren(root, child, state, layers, hidden)
+
+def _generateTexts(nodePath):
+    """Replace the text nodes below nodePath with their generated geometry"""
+    textPaths = list(nodePath.findAllMatches('**/+TextNode'))
+    if nodePath.node().isOfType(p3d.TextNode):
+        textPaths.append(nodePath)
+    for textPath in textPaths:
+        generated = textPath.node().generate()
+        generated.setTransform(textPath.getTransform())
+        generated.setState(textPath.getState())
+        textPath.getParent().node().replaceChild(textPath.node(), generated)
+
+def unbakeVisuals(baked, hidden):
+    """Remove the baked node and show the original visuals again"""
+    for stateDef in hidden:
+        stateDef.show()
+    baked.removeNode()
+
+def invalidateParentBake(guiItem):
+    """
+    Let all layout widgets enclosing the given item restore their baked
+    visuals, they will bake again once the layout settled.
+    """
+    parent = guiItem.getParent()
+    while not parent.isEmpty():
+        widget = DirectGuiWidget.guiDict.get(parent.getName().split('-')[-1])
+        if isinstance(widget, BakeMixin):
+            widget.invalidateBake()
+        parent = parent.getParent()
+
+class BakeMixin:
+    """
+    Bake handling of layout widgets. The widget needs a bake option with
+    setBake as its handler, the bakedNode and bakedStateDefs attributes and
+    has to call clearBake when it gets destroyed.
+    """
+    def setBake(self):
+        if self['bake']:
+            self.invalidateBake()
+        else:
+            self.clearBake()
+
+    def bake(self):
+        """
+        Combine the frames, texts and images of all widgets of this layout
+        widget that don't change with the mouse into a few batched geoms.
+        Mouse regions of the widgets keep working. If the bake option is set,
+        this is done automatically once the layout changed.
+        """
+        self.unbake()
+        self.bakedNode, self.bakedStateDefs = bakeVisuals(self)
+
+    def unbake(self):
+        """Restore the original visuals of the baked widgets"""
+        if self.bakedNode is None: return
+        unbakeVisuals(self.bakedNode, self.bakedStateDefs)
+        self.bakedNode = None
+        self.bakedStateDefs = []
+
+    def invalidateBake(self):
+        """
+        Restore the original visuals and, if the bake option is set, bake
+        them again on the next frame. Call this after changing widgets of a
+        baked layout widget without refreshing it, e.g. the text of a label.
+        """
+        self.unbake()
+        if self['bake'] and not taskMgr.hasTaskNamed(self.uniqueName('bake')):
+            taskMgr.add(self.__bakeTask, self.uniqueName('bake'))
+
+    def clearBake(self):
+        """Cancel a pending bake and restore the original visuals"""
+        taskMgr.remove(self.uniqueName('bake'))
+        self.unbake()
+
+    def __bakeTask(self, task):
+        self.bake()
+        return task.done
+
+#
+# KEYSTROKE EVENTS
+#
+# The main button thrower only sends keystroke events if an event name has
+# been set on it. Widgets that need them set one up while they are active
+# and reset it afterwards, unless the application already had one set.
+#
+def acquireKeystrokeEvent():
+    """
+    Returns the name of the keystroke event of the main button thrower and
+    the thrower if the event has been set up by this call, which has to be
+    passed to releaseKeystrokeEvent once the events aren't needed anymore.
+    """
+    if not base.buttonThrowers:
+        return 'keystroke', None
+    buttonThrower = base.buttonThrowers[0].node()
+    if buttonThrower.getKeystrokeEvent():
+        return buttonThrower.getKeystrokeEvent(), None
+    buttonThrower.setKeystrokeEvent('keystroke')
+    return 'keystroke', buttonThrower
+
+def releaseKeystrokeEvent(buttonThrower):
+    """Reset the keystroke event set up by acquireKeystrokeEvent"""
+    if buttonThrower is not None:
+        buttonThrower.setKeystrokeEvent('')
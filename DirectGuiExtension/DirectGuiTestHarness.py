@@ -0,0 +1,378 @@
+"""
+Headless and deterministic harness to build DirectGuiExtension widgets
+without a window, snapshot their computed layout and simulate mouse and
+keyboard input.
+
+Record the layout of the built in scenes and check them again after a
+change to the layout code:
+
+    python -m DirectGuiExtension.DirectGuiTestHarness --record layout.json
+    python -m DirectGuiExtension.DirectGuiTestHarness --check layout.json
+
+The functions can be used from other scripts and test suites as well:
+
+    startHeadless()
+    mouse = FakeMouseWatcher()
+    mouse.install()
+    mouse.click(someButton)
+    data = snapshot(someSizer)
+"""
+
+__all__ = ['startHeadless', 'snapshot', 'compareSnapshots', 'FakeMouseWatcher',
+    'FakeMouseWatcherParameter', 'SCENES']
+
+import json
+import sys
+
+from panda3d.core import loadPrcFileData, ClockObject, Point2, Point3
+from direct.gui import DirectGuiGlobals as DGG
+from direct.gui.DirectGuiBase import DirectGuiWidget
+from direct.showbase import ShowBaseGlobal
+
+
+def startHeadless(windowType='none', frameRate=60):
+    """
+    Start a ShowBase without a visible window, if none is running yet, and
+    make the clock advance by a fixed time every frame, so timers and
+    intervals behave the same on every run.
+    """
+    if getattr(ShowBaseGlobal, 'base', None) is None:
+        loadPrcFileData('', 'window-type {}'.format(windowType))
+        loadPrcFileData('', 'audio-library-name null')
+        from direct.showbase.ShowBase import ShowBase
+        ShowBase()
+    clock = ClockObject.getGlobalClock()
+    clock.setMode(ClockObject.MForced)
+    clock.setFrameRate(frameRate)
+    return ShowBaseGlobal.base
+
+def step(frames=1):
+    """Run the given number of frames"""
+    for i in range(frames):
+        ShowBaseGlobal.base.taskMgr.step()
+
+#
+# SNAPSHOTS
+#
+def _getWidget(nodePath):
+    # the node names of widgets end with their gui id
+    return DirectGuiWidget.guiDict.get(nodePath.getName().split('-')[-1])
+
+def _round(values, digits):
+    if values is None:
+        return None
+    return [round(float(value), digits) for value in values]
+
+def _snapshotChildren(nodePath, digits):
+    children = []
+    for child in nodePath.getChildren():
+        widget = _getWidget(child)
+        if widget is not None:
+            children.append(snapshot(widget, digits))
+        else:
+            # plain nodes, e.g. content nodes, may hold widgets as well
+            children += _snapshotChildren(child, digits)
+    return children
+
+def snapshot(widget, digits=4):
+    """
+    Returns the computed layout of the widget and all widgets below it as
+    plain data which can be stored as JSON
+    """
+    return {
+        'type': type(widget).__name__,
+        'pos': _round(widget.getPos(), digits),
+        'scale': _round(widget.getScale(), digits),
+        'frameSize': _round(widget['frameSize'], digits),
+        'hidden': widget.isHidden(),
+        'children': _snapshotChildren(widget, digits),
+    }
+
+def compareSnapshots(expected, actual, tolerance=1e-4, path='root'):
+    """Returns a list of all differences between the two snapshots"""
+    differences = []
+    if expected['type'] != actual['type']:
+        return ['{}: type {} != {}'.format(path, expected['type'], actual['type'])]
+    path = '{}/{}'.format(path, expected['type'])
+    for key in ('pos', 'scale', 'frameSize'):
+        a = expected[key]
+        b = actual[key]
+        if a is None or b is None:
+            if a != b:
+                differences.append('{}: {} {} != {}'.format(path, key, a, b))
+        elif len(a) != len(b) \
+        or any(abs(x - y) > tolerance for x, y in zip(a, b)):
+            differences.append('{}: {} {} != {}'.format(path, key, a, b))
+    if expected['hidden'] != actual['hidden']:
+        differences.append('{}: hidden {} != {}'.format(
+            path, expected['hidden'], actual['hidden']))
+    if len(expected['children']) != len(actual['children']):
+        differences.append('{}: {} children != {}'.format(
+            path, len(expected['children']), len(actual['children'])))
+        return differences
+    for i, (a, b) in enumerate(zip(expected['children'], actual['children'])):
+        differences += compareSnapshots(a, b, tolerance, '{}[{}]'.format(path, i))
+    return differences
+
+#
+# INPUT SIMULATION
+#
+class FakeMouseWatcherParameter:
+    """Stands in for the parameter given to DirectGui event handlers"""
+    def __init__(self, mouse=None, button=None, keycode=0):
+        self.mouse = mouse
+        self.button = button
+        self.keycode = keycode
+
+    def hasMouse(self):
+        return self.mouse is not None
+
+    def getMouse(self):
+        return self.mouse
+
+    def getButton(self):
+        return self.button
+
+    def getKeycode(self):
+        return self.keycode
+
+class FakeMouseWatcher:
+    """
+    Stands in for base.mouseWatcherNode. The mouse can be placed by code and
+    DirectGui events get sent as if the mouse or keyboard had been used.
+    """
+    def __init__(self):
+        self.mouse = None
+        self.originalMouseWatcher = None
+
+    def install(self):
+        """Replace the mouse watcher of the running ShowBase"""
+        base = ShowBaseGlobal.base
+        self.originalMouseWatcher = base.mouseWatcherNode
+        base.mouseWatcherNode = self
+
+    def uninstall(self):
+        ShowBaseGlobal.base.mouseWatcherNode = self.originalMouseWatcher
+
+    # MouseWatcher interface
+    def hasMouse(self):
+        return self.mouse is not None
+
+    def getMouse(self):
+        return Point2(self.mouse)
+
+    def getMouseX(self):
+        return self.mouse[0]
+
+    def getMouseY(self):
+        return self.mouse[1]
+
+    def isButtonDown(self, button):
+        return False
+
+    # simulation
+    def moveMouse(self, x, y):
+        """Place the mouse at the given render2d coordinates"""
+        self.mouse = Point2(x, y)
+
+    def moveToWidget(self, widget):
+        """Place the mouse at the center of the given widget"""
+        l, r, b, t = widget['frameSize'] or widget.getBounds()
+        center = ShowBaseGlobal.render2d.getRelativePoint(
+            widget, Point3((l + r) / 2, 0, (b + t) / 2))
+        self.moveMouse(center.getX(), center.getZ())
+
+    def __send(self, event, widget):
+        messenger = ShowBaseGlobal.base.messenger
+        messenger.send(event + widget.guiId, [FakeMouseWatcherParameter(self.mouse)])
+
+    def enter(self, widget):
+        """Move the mouse onto the widget"""
+        self.moveToWidget(widget)
+        self.__send(DGG.ENTER, widget)
+        self.__send(DGG.WITHIN, widget)
+
+    def exit(self, widget):
+        """Move the mouse away from the widget"""
+        self.__send(DGG.WITHOUT, widget)
+        self.__send(DGG.EXIT, widget)
+
+    def press(self, widget, button=1):
+        self.moveToWidget(widget)
+        self.__send((DGG.B1PRESS, DGG.B2PRESS, DGG.B3PRESS)[button - 1], widget)
+
+    def release(self, widget, button=1):
+        self.__send((DGG.B1RELEASE, DGG.B2RELEASE, DGG.B3RELEASE)[button - 1], widget)
+
+    def click(self, widget, button=1):
+        """Press and release the mouse button on the widget and run the
+        commands of buttons like a real click would"""
+        self.press(widget, button)
+        self.release(widget, button)
+        if button == 1 and hasattr(widget, 'commandFunc') and widget['command']:
+            widget.commandFunc(None)
+
+    def wheel(self, widget, direction):
+        """Turn the mouse wheel up (positive) or down (negative)"""
+        wheelEvent = DGG.MWUP if direction > 0 else DGG.MWDOWN
+        self.__send(wheelEvent, widget)
+
+    def pressKey(self, key):
+        """Send the button event and its up event, e.g. 'arrow_down'"""
+        messenger = ShowBaseGlobal.base.messenger
+        messenger.send(key)
+        messenger.send(key + '-up')
+
+    def typeText(self, text, keystrokeEvent='keystroke'):
+        """Send a keystroke event for every character of the text"""
+        messenger = ShowBaseGlobal.base.messenger
+        for char in text:
+            messenger.send(keystrokeEvent, [char])
+
+#
+# SCENES
+#
+def _sceneBoxSizers():
+    from direct.gui.DirectFrame import DirectFrame
+    from direct.gui.DirectLabel import DirectLabel
+    from .DirectBoxSizer import DirectBoxSizer
+    root = DirectFrame()
+    orientations = [DGG.HORIZONTAL, DGG.HORIZONTAL_INVERTED, DGG.VERTICAL, DGG.VERTICAL_INVERTED]
+    aligns = [
+        DirectBoxSizer.A_Left | DirectBoxSizer.A_Top,
+        DirectBoxSizer.A_Center | DirectBoxSizer.A_Middle,
+        DirectBoxSizer.A_Right | DirectBoxSizer.A_Bottom]
+    for orientation in orientations:
+        for align in aligns:
+            sizer = DirectBoxSizer(
+                parent=root, orientation=orientation, itemAlign=align,
+                itemMargin=(0.01, 0.02, 0.03, 0.04))
+            for i in range(4):
+                sizer.addItem(DirectLabel(
+                    text='label {}'.format('x' * i), scale=0.05 + 0.01 * i,
+                    borderWidth=(0.1 * i, 0.05)))
+            sizer.addItem(DirectFrame(frameSize=(-0.1, 0.2, -0.05, 0.15)))
+    return root
+
+def _sceneGridSizer():
+    from direct.gui.DirectLabel import DirectLabel
+    from .DirectGridSizer import DirectGridSizer
+    grid = DirectGridSizer(numRows=3, numColumns=3, itemMargin=(0.01, 0.01, 0.02, 0.02))
+    for row in range(3):
+        for column in range(3):
+            if row == column == 1:
+                continue
+            grid.addItem(DirectLabel(
+                text='cell {} {}'.format(row, column) * (column + 1),
+                scale=0.05), row, column)
+    grid.addItem(DirectLabel(text='span', scale=0.07), 1, 1, 2, 2)
+    return grid
+
+def _sceneSplitFrames():
+    from direct.gui.DirectFrame import DirectFrame
+    from .DirectSplitFrame import DirectSplitFrame
+    from .DirectMultiSplitFrame import DirectMultiSplitFrame, DirectSplitGroup, DirectSplitPane
+    root = DirectFrame()
+    DirectSplitFrame(parent=root, frameSize=(-1, 1, -1, 1), splitterPos=0.3, firstFrameMinSize=0.5)
+    DirectSplitFrame(parent=root, frameSize=(-1, 1, -0.5, 0.5), orientation=DGG.VERTICAL, splitterPos=-0.2)
+    DirectMultiSplitFrame(parent=root, frameSize=(-1, 1, -1, 1), layout=DirectSplitGroup(
+        DGG.HORIZONTAL, [
+            DirectSplitPane('a', minSize=0.5),
+            DirectSplitGroup(DGG.VERTICAL, [
+                DirectSplitPane('b', weight=3),
+                DirectSplitPane('c', maxSize=0.2)], weight=2),
+            DirectSplitPane('d', maxSize=0.3)]))
+    return root
+
+def _sceneCollapsible():
+    from direct.gui.DirectFrame import DirectFrame
+    from direct.gui.DirectLabel import DirectLabel
+    from .DirectBoxSizer import DirectBoxSizer
+    from .DirectCollapsibleFrame import DirectCollapsibleFrame
+    from .DirectAccordion import DirectAccordion
+    root = DirectFrame()
+    sizer = DirectBoxSizer(parent=root, orientation=DGG.VERTICAL)
+    accordion = DirectAccordion(parent=root)
+    for i in range(4):
+        frame = DirectCollapsibleFrame(frameSize=(-0.5, 0.5, -0.2 - 0.1 * i, 0.2))
+        DirectLabel(parent=frame, text='content {}'.format(i), scale=0.05)
+        sizer.addItem(frame)
+        section = DirectCollapsibleFrame(
+            frameSize=(-0.5, 0.5, -0.2 - 0.1 * i, 0.2),
+            collapseMode=DirectCollapsibleFrame.CM_Stash)
+        DirectLabel(parent=section.contentNode, text='section {}'.format(i), scale=0.05)
+        accordion.addSection(section)
+    sizer['items'][1].element.toggleCollapsed()
+    accordion.getSections()[2].toggleCollapsed()
+    return root
+
+def _sceneMenus():
+    from direct.gui.DirectFrame import DirectFrame
+    from .DirectOptionMenu import DirectOptionMenu
+    from .DirectMenuItem import DirectMenuItem, DirectMenuItemEntry, DirectMenuItemSubMenu, DirectMenuSeparator
+    root = DirectFrame()
+    menu = DirectOptionMenu(parent=root, items=['first', 'second item', 'third'], scale=0.1)
+    menu.showPopupMenu()
+    menuItem = DirectMenuItem(parent=root, text='File', scale=0.1, item_relief=1, items=[
+        DirectMenuItemEntry('Save', print, []),
+        DirectMenuSeparator(),
+        DirectMenuItemSubMenu('Recent >', [DirectMenuItemEntry('A', print, [])]),
+        DirectMenuItemEntry('Quit', print, [])])
+    menuItem.showPopupMenu()
+    return root
+
+# name to function that builds the scene and returns its root widget
+SCENES = {
+    'boxSizers': _sceneBoxSizers,
+    'gridSizer': _sceneGridSizer,
+    'splitFrames': _sceneSplitFrames,
+    'collapsible': _sceneCollapsible,
+    'menus': _sceneMenus,
+}
+
+def snapshotScenes(names=None):
+    """Build the scenes and return their snapshots"""
+    snapshots = {}
+    for name, buildFunc in SCENES.items():
+        if names and name not in names:
+            continue
+        root = buildFunc()
+        step()
+        snapshots[name] = snapshot(root)
+        root.destroy()
+        step()
+    return snapshots
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(
+        description="Snapshot and check the layout of DirectGuiExtension widgets")
+    parser.add_argument('--record', metavar='FILE', help="store the snapshots")
+    parser.add_argument('--check', metavar='FILE', help="compare with stored snapshots")
+    parser.add_argument('--scenes', nargs='+', choices=list(SCENES), help="only use the given scenes")
+    parser.add_argument('--tolerance', type=float, default=1e-4)
+    args = parser.parse_args()
+
+    startHeadless()
+    snapshots = snapshotScenes(args.scenes)
+    if args.record:
+        with open(args.record, 'w') as f:
+            json.dump(snapshots, f, indent=1)
+        print('recorded {} scene(s)'.format(len(snapshots)))
+    if args.check:
+        with open(args.check) as f:
+            expected = json.load(f)
+        failed = 0
+        for name, data in snapshots.items():
+            if name not in expected:
+                print('{}: no stored snapshot'.format(name))
+                continue
+            differences = compareSnapshots(expected[name], data, args.tolerance)
+            for difference in differences:
+                print('{}: {}'.format(name, difference))
+            failed += bool(differences)
+        print('{} of {} scene(s) differ'.format(failed, len(snapshots)))
+        sys.exit(1 if failed else 0)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,171 @@
+"""
+Opt-in profiling of the layout calculations of the DirectGuiExtension
+widgets.
+
+While enabled, the refresh methods of the layout widgets, the measure and
+size helpers of DirectGuiHelper and resetFrameSize of all DirectGui widgets
+get wrapped to count their calls and measure the time spent in refresh per
+widget class and per widget instance. Helper and resetFrameSize calls made
+during a refresh are accounted to the refreshing widget, others to the
+measured one.
+The refresh time is also reported to PStats with one collector per class,
+e.g. GUI:Layout:DirectBoxSizer.
+
+While disabled, the original methods are in place, so there is no overhead.
+
+    from DirectGuiExtension import DirectLayoutProfiler
+    DirectLayoutProfiler.enable()
+    ...
+    DirectLayoutProfiler.printReport()
+"""
+
+__all__ = ['enable', 'disable', 'isEnabled', 'reset', 'getReport',
+    'getInstanceReport', 'printReport']
+
+import time
+
+from panda3d.core import PStatCollector
+from direct.gui.DirectGuiBase import DirectGuiWidget
+from . import DirectGuiHelper as DGH
+
+# (module name, class name, method name) of the layout methods to profile
+LAYOUT_METHODS = [
+    ('DirectAccordion', 'DirectAccordion', 'refresh'),
+    ('DirectAutoSizer', 'DirectAutoSizer', 'refresh'),
+    ('DirectBoxSizer', 'DirectBoxSizer', 'refresh'),
+    ('DirectDatePicker', 'DirectDatePicker', 'refreshPicker'),
+    ('DirectDiagram', 'DirectDiagram', 'refresh'),
+    ('DirectGridSizer', 'DirectGridSizer', 'refresh'),
+    ('DirectMultiSplitFrame', 'DirectMultiSplitFrame', 'refresh'),
+    ('DirectSplitFrame', 'DirectSplitFrame', 'refresh'),
+    ('DirectTreeView', 'DirectTreeView', 'refreshTree'),
+]
+
+# the counted values of every class and instance
+COUNTERS = ('refresh', 'refreshTime', 'measure', 'getRealWidth',
+    'getRealHeight', 'resetFrameSize')
+
+_enabled = False
+# (owner, attribute name, original) of everything that got wrapped
+_originals = []
+_classStats = {}
+_instanceStats = {}
+_collectors = {}
+# the widgets whose refresh is currently running
+_refreshStack = []
+
+
+def _getStats(widget):
+    """Returns the class and instance counters of the given widget"""
+    className = type(widget).__name__
+    classStats = _classStats.get(className)
+    if classStats is None:
+        classStats = _classStats[className] = dict.fromkeys(COUNTERS, 0)
+    key = (className, getattr(widget, 'guiId', id(widget)))
+    instanceStats = _instanceStats.get(key)
+    if instanceStats is None:
+        instanceStats = _instanceStats[key] = dict.fromkeys(COUNTERS, 0)
+    return classStats, instanceStats
+
+def _getCollector(className):
+    collector = _collectors.get(className)
+    if collector is None:
+        collector = _collectors[className] = PStatCollector(
+            'GUI:Layout:{}'.format(className))
+    return collector
+
+def _wrapRefresh(func):
+    def refresh(self, *args, **kwargs):
+        if not _enabled:
+            return func(self, *args, **kwargs)
+        classStats, instanceStats = _getStats(self)
+        collector = _getCollector(type(self).__name__)
+        collector.start()
+        _refreshStack.append(self)
+        start = time.perf_counter()
+        try:
+            return func(self, *args, **kwargs)
+        finally:
+            duration = time.perf_counter() - start
+            _refreshStack.pop()
+            collector.stop()
+            for stats in (classStats, instanceStats):
+                stats['refresh'] += 1
+                stats['refreshTime'] += duration
+    refresh.__name__ = func.__name__
+    refresh.__doc__ = func.__doc__
+    return refresh
+
+def _wrapCounter(func, counter):
+    def counted(guiItem, *args, **kwargs):
+        if _enabled:
+            widget = _refreshStack[-1] if _refreshStack else guiItem
+            for stats in _getStats(widget):
+                stats[counter] += 1
+        return func(guiItem, *args, **kwargs)
+    counted.__name__ = func.__name__
+    counted.__doc__ = func.__doc__
+    return counted
+
+def _replace(owner, name, wrapper):
+    original = owner.__dict__[name]
+    _originals.append((owner, name, original))
+    setattr(owner, name, wrapper(original))
+
+def enable():
+    """
+    Start profiling. Only widgets created after this call will report the
+    refresh calls triggered by changing their options.
+    """
+    global _enabled
+    if _enabled:
+        return
+    import importlib
+    for moduleName, className, methodName in LAYOUT_METHODS:
+        module = importlib.import_module('.' + moduleName, __package__)
+        _replace(getattr(module, className), methodName, _wrapRefresh)
+    _replace(DGH, 'measure', lambda f: _wrapCounter(f, 'measure'))
+    _replace(DGH, 'getRealWidth', lambda f: _wrapCounter(f, 'getRealWidth'))
+    _replace(DGH, 'getRealHeight', lambda f: _wrapCounter(f, 'getRealHeight'))
+    _replace(DirectGuiWidget, 'resetFrameSize',
+        lambda f: _wrapCounter(f, 'resetFrameSize'))
+    _enabled = True
+
+def disable():
+    """Stop profiling and restore the original methods"""
+    global _enabled
+    _enabled = False
+    while _originals:
+        owner, name, original = _originals.pop()
+        setattr(owner, name, original)
+
+def isEnabled():
+    return _enabled
+
+def reset():
+    """Clear all counters"""
+    _classStats.clear()
+    _instanceStats.clear()
+
+def getReport():
+    """Returns a dict of widget class names to their counters"""
+    return {name: dict(stats) for name, stats in _classStats.items()}
+
+def getInstanceReport():
+    """Returns a dict of (class name, gui id) to the counters of the widget"""
+    return {key: dict(stats) for key, stats in _instanceStats.items()}
+
+def printReport(sortBy='refreshTime', perInstance=False, limit=20):
+    """Print the counters sorted by the given counter, highest first"""
+    report = getInstanceReport() if perInstance else getReport()
+    rows = sorted(report.items(), key=lambda row: row[1][sortBy], reverse=True)
+    print('{:<40} {:>8} {:>10} {:>8} {:>12} {:>13} {:>14}'.format(
+        'widget', 'refresh', 'time (s)', 'measure', 'getRealWidth',
+        'getRealHeight', 'resetFrameSize'))
+    for key, stats in rows[:limit]:
+        if perInstance:
+            key = '{} {}'.format(*key)
+        print('{:<40} {:>8} {:>10.4f} {:>8} {:>12} {:>13} {:>14}'.format(
+            key, stats['refresh'], stats['refreshTime'], stats['measure'],
+            stats['getRealWidth'], stats['getRealHeight'],
+            stats['resetFrameSize']))
@@ -2,21 +2,48 @@
 
 __all__ = ['DirectMenuBar']
 
-from panda3d.core import *
 from direct.gui import DirectGuiGlobals as DGG
-from direct.gui.DirectButton import *
-from direct.gui.DirectLabel import *
-from direct.gui.DirectFrame import *
 from .DirectBoxSizer import DirectBoxSizer
 from .DirectAutoSizer import DirectAutoSizer
+from .DirectMenuItem import (
+    DirectMenuItem,
+    DirectMenuItemEntry,
+    DirectMenuItemSubMenu,
+    DirectMenuSeparator,
+    menuController)
 from . import DirectGuiHelper as DGH
 
+def _getMnemonic(text, mnemonic=None):
+    """Returns the lower case key to select an item with the given text"""
+    if mnemonic:
+        return mnemonic.lower()
+    for char in text or "":
+        if char.isalnum():
+            return char.lower()
+    return None
+
 class DirectMenuBar(DirectBoxSizer):
     def __init__(self, parent = None, **kw):
         optiondefs = (
             # List of items to display on the popup menu
             ('menuItems',       [],             self.setItems),
+            # Call the commands of menu entries by their shortcut events
+            ('acceptShortcuts', True,           self.setAcceptShortcuts),
+            # Navigate the opened menus with the arrow keys, enter, escape
+            # and the mnemonics of the items
+            ('keyboardNavigation', True,        None),
+            # Modifier to open the top level menus by their mnemonic
+            ('mnemonicModifier', 'alt',         None),
         )
+        # Maps shortcut events to the menu entries
+        self.shortcutIndex = {}
+        # Maps mnemonics to the top level menus
+        self.mnemonicIndex = {}
+        self.indexedMenuItems = []
+        self.keystrokeEvent = None
+        # the button thrower we set up the keystroke event on, if any
+        self.keystrokeThrower = None
+
         # Merge keyword options with default options
         self.defineoptions(kw, optiondefs)
 
@@ -33,16 +60,26 @@ class DirectMenuBar(DirectBoxSizer):
     def setItems(self):
         self.removeAllItems()
 
+        for menuItem in list(self.indexedMenuItems):
+            if menuItem not in self["menuItems"]:
+                self.__unindexMenuItem(menuItem)
+
         for item in self["menuItems"]:
             self.addItem(item, skipRefresh=True)
             item.onCloseMenuFunc = self.setSelectedMenuItem
+            item.onItemsChangedFunc = self.indexMenuItem
             item.bind(DGG.B1PRESS, self.showPopupMenuItem, [item])
             item.bind(DGG.WITHIN, self.toggleMenuItem, [item])
             item.cancelFrame.bind(DGG.B1PRESS, self.hidePopupMenu, extraArgs=[item])
+            self.indexMenuItem(item)
         self.refresh()
 
     def setSelectedMenuItem(self, item=None):
         self.selected_menu_item = item
+        if item is None:
+            self.__ignoreNavigation()
+        elif self['keyboardNavigation']:
+            self.__acceptNavigation()
 
     def showPopupMenuItem(self, item, event=None):
         item.showPopupMenu(event)
@@ -60,3 +97,229 @@ class DirectMenuBar(DirectBoxSizer):
     def hidePopupMenu(self, item, event=None):
         item.hidePopupMenu(event, True)
         self.setSelectedMenuItem()
+
+    #
+    # Shortcut and mnemonic index
+    #
+    def indexMenuItem(self, menuItem):
+        """
+        (Re)build the index entries of the given top level menu. This only
+        walks the item descriptions and doesn't need any popup widgets. It is
+        called automatically whenever the items of the menu change.
+        """
+        self.__unindexMenuItem(menuItem)
+        self.indexedMenuItems.append(menuItem)
+
+        mnemonic = _getMnemonic(menuItem['text'], menuItem['mnemonic'])
+        menuItem.menuBarMnemonic = mnemonic
+        if mnemonic is not None:
+            self.mnemonicIndex[mnemonic] = menuItem
+            if self['keyboardNavigation']:
+                self.accept(
+                    self.__getMnemonicEvent(mnemonic),
+                    self.openMenuByMnemonic, [mnemonic])
+
+        shortcuts = []
+        stack = list(menuItem['items'])
+        while stack:
+            item = stack.pop()
+            if type(item) is DirectMenuItemSubMenu:
+                stack += item.items
+            elif type(item) is DirectMenuItemEntry and item.shortcut:
+                shortcuts.append((item.shortcut, item))
+                self.shortcutIndex[item.shortcut] = item
+                if self['acceptShortcuts']:
+                    self.accept(item.shortcut, self.runShortcut, [item.shortcut])
+        menuItem.menuBarShortcuts = shortcuts
+
+    def __unindexMenuItem(self, menuItem):
+        """Remove the index entries of the given top level menu"""
+        if menuItem not in self.indexedMenuItems:
+            return
+        self.indexedMenuItems.remove(menuItem)
+
+        mnemonic = menuItem.menuBarMnemonic
+        if self.mnemonicIndex.get(mnemonic) is menuItem:
+            # fall back to another menu using the same mnemonic
+            replacement = None
+            for otherMenuItem in self.indexedMenuItems:
+                if otherMenuItem.menuBarMnemonic == mnemonic:
+                    replacement = otherMenuItem
+            if replacement is not None:
+                self.mnemonicIndex[mnemonic] = replacement
+            else:
+                del self.mnemonicIndex[mnemonic]
+                self.ignore(self.__getMnemonicEvent(mnemonic))
+        menuItem.menuBarMnemonic = None
+
+        for shortcut, item in menuItem.menuBarShortcuts:
+            if self.shortcutIndex.get(shortcut) is not item:
+                # another entry with this shortcut has been indexed later
+                continue
+            # fall back to an entry of another menu using the same shortcut
+            replacement = None
+            for otherMenuItem in self.indexedMenuItems:
+                for otherShortcut, otherItem in otherMenuItem.menuBarShortcuts:
+                    if otherShortcut == shortcut:
+                        replacement = otherItem
+            if replacement is not None:
+                self.shortcutIndex[shortcut] = replacement
+            else:
+                del self.shortcutIndex[shortcut]
+                self.ignore(shortcut)
+        menuItem.menuBarShortcuts = []
+
+    def __getMnemonicEvent(self, mnemonic):
+        if self['mnemonicModifier']:
+            return '{}-{}'.format(self['mnemonicModifier'], mnemonic)
+        return mnemonic
+
+    def setAcceptShortcuts(self):
+        """Accept or ignore the shortcut events of all indexed entries"""
+        for shortcut in self.shortcutIndex.keys():
+            if self['acceptShortcuts']:
+                self.accept(shortcut, self.runShortcut, [shortcut])
+            else:
+                self.ignore(shortcut)
+
+    def findShortcut(self, shortcut):
+        """Returns the menu entry for the given shortcut or None"""
+        return self.shortcutIndex.get(shortcut)
+
+    def runShortcut(self, shortcut):
+        """Call the command of the entry with the given shortcut"""
+        entry = self.shortcutIndex.get(shortcut)
+        if entry is None or entry.command is None:
+            return False
+        entry.command(*(entry.extraArgs or []))
+        return True
+
+    #
+    # Keyboard navigation
+    #
+    def openMenuByMnemonic(self, mnemonic):
+        """Open the top level menu with the given mnemonic"""
+        menuItem = self.mnemonicIndex.get(mnemonic)
+        if menuItem is None:
+            return
+        if self.selected_menu_item is not None:
+            self.selected_menu_item.hidePopupMenu(hideParentMenu=True)
+        self.showPopupMenuItem(menuItem)
+        self.__highlightNext(menuItem, 1)
+
+    def __acceptNavigation(self):
+        self.accept('arrow_up', self.__navigate, ['up'])
+        self.accept('arrow_down', self.__navigate, ['down'])
+        self.accept('arrow_left', self.__navigate, ['left'])
+        self.accept('arrow_right', self.__navigate, ['right'])
+        self.accept('enter', self.__navigate, ['enter'])
+        self.accept('escape', self.__navigate, ['escape'])
+        if self.keystrokeEvent is None:
+            self.keystrokeEvent, self.keystrokeThrower = DGH.acquireKeystrokeEvent()
+            self.accept(self.keystrokeEvent, self.__selectMnemonic)
+
+    def __ignoreNavigation(self):
+        for event in ('arrow_up', 'arrow_down', 'arrow_left', 'arrow_right',
+                      'enter', 'escape'):
+            self.ignore(event)
+        if self.keystrokeEvent is not None:
+            self.ignore(self.keystrokeEvent)
+            self.keystrokeEvent = None
+            DGH.releaseKeystrokeEvent(self.keystrokeThrower)
+            self.keystrokeThrower = None
+
+    def __getActiveMenu(self):
+        """Returns the deepest menu which currently shows its popup"""
+        menu = self.selected_menu_item
+        if menu is None:
+            return None
+        while True:
+            item = menu.highlightedItem
+            if type(item) is DirectMenuItem \
+            and item.popupMenu is not None \
+            and not item.popupMenu.isHidden():
+                menu = item
+            else:
+                return menu
+
+    def __getSelectableItems(self, menu):
+        if menu.popupMenu is None:
+            return []
+        return [
+            container.element for container in menu.popupMenu["items"]
+            if type(container.element.menuItemEntry) is not DirectMenuSeparator]
+
+    def __highlightNext(self, menu, direction):
+        """Move the highlight of the menu by the direction, wrapping around"""
+        items = self.__getSelectableItems(menu)
+        if not items:
+            return
+        if menu.highlightedItem in items:
+            index = (items.index(menu.highlightedItem) + direction) % len(items)
+        else:
+            index = 0 if direction > 0 else len(items) - 1
+        menuController.highlight(menu, items[index], openSubMenu=False)
+
+    def __openSubMenu(self, item):
+        item.showPopupMenu()
+        self.__highlightNext(item, 1)
+
+    def __switchMenu(self, direction):
+        menuItems = self["menuItems"]
+        index = menuItems.index(self.selected_menu_item)
+        menuItem = menuItems[(index + direction) % len(menuItems)]
+        self.selected_menu_item.hidePopupMenu(hideParentMenu=True)
+        self.showPopupMenuItem(menuItem)
+        self.__highlightNext(menuItem, 1)
+
+    def __activate(self, menu, item):
+        """Open the item if it is a sub menu or call its command"""
+        if type(item) is DirectMenuItem:
+            self.__openSubMenu(item)
+        else:
+            menuController.highlight(menu, item, openSubMenu=False)
+            menu._selectHighlighted()
+
+    def __navigate(self, key):
+        menu = self.__getActiveMenu()
+        if menu is None:
+            return
+        item = menu.highlightedItem
+        if key == 'up':
+            self.__highlightNext(menu, -1)
+        elif key == 'down':
+            self.__highlightNext(menu, 1)
+        elif key == 'right':
+            if type(item) is DirectMenuItem:
+                self.__openSubMenu(item)
+            else:
+                self.__switchMenu(1)
+        elif key == 'left':
+            if menu['isSubMenu']:
+                menu.hidePopupMenu()
+            else:
+                self.__switchMenu(-1)
+        elif key == 'enter':
+            if item is not None:
+                self.__activate(menu, item)
+        elif key == 'escape':
+            if menu['isSubMenu']:
+                menu.hidePopupMenu()
+            else:
+                self.hidePopupMenu(menu)
+
+    def __selectMnemonic(self, keyname):
+        """Activate the item of the open menu with the typed mnemonic"""
+        menu = self.__getActiveMenu()
+        if menu is None or not keyname.isprintable():
+            return
+        for item in self.__getSelectableItems(menu):
+            entry = item.menuItemEntry
+            if _getMnemonic(entry.text, entry.mnemonic) == keyname.lower():
+                self.__activate(menu, item)
+                return
+
+    def destroy(self):
+        DGH.releaseKeystrokeEvent(self.keystrokeThrower)
+        self.keystrokeThrower = None
+        DirectBoxSizer.destroy(self)
@@ -1,13 +1,12 @@
 """Implements a pop-up menu containing multiple clickable options and sub-menus."""
 
 __all__ = ['DirectMenuItem', 'DirectMenuItemEntry', 'DirectMenuItemSubMenu',
-    'DirectMenuSeparator']
+    'DirectMenuSeparator', 'DirectMenuController']
 
-from panda3d.core import *
+from panda3d.core import MouseButton, OmniBoundingVolume, PGButton, TextNode
 from direct.gui import DirectGuiGlobals as DGG
-from direct.gui.DirectButton import *
-from direct.gui.DirectLabel import *
-from direct.gui.DirectFrame import *
+from direct.gui.DirectButton import DirectButton
+from direct.gui.DirectFrame import DirectFrame
 from .DirectBoxSizer import DirectBoxSizer
 from . import DirectGuiHelper as DGH
 
@@ -19,15 +18,21 @@ DGG.ABOVE = "above"
 DGG.BELOW = "below"
 
 class DirectMenuItemEntry:
-    def __init__(self, text, command, extraArgs=None):
+    def __init__(self, text, command, extraArgs=None, shortcut=None, mnemonic=None):
         self.text = text
         self.command = command
         self.extraArgs = extraArgs
+        # event name of the hotkey, e.g. "control-s", to call the command
+        self.shortcut = shortcut
+        # key to select the item with while the menu is open, defaults to
+        # the first letter of the text
+        self.mnemonic = mnemonic
 
 class DirectMenuItemSubMenu:
-    def __init__(self, text, items):
+    def __init__(self, text, items, mnemonic=None):
         self.text = text
         self.items = items
+        self.mnemonic = mnemonic
 
 class DirectMenuSeparator:
     def __init__(self, height=0.05, padding=(0, 0.1)):
@@ -38,6 +43,8 @@ class DirectMenuItem(DirectButton):
     def __init__(self, parent = None, **kw):
         # this function will be called when the menu gets closed
         self.onCloseMenuFunc = None
+        # this function will be called with the menu when its items changed
+        self.onItemsChangedFunc = None
         optiondefs = (
             # List of items to display on the popup menu
             ('items',       [],             self.setItems),
@@ -57,14 +64,36 @@ class DirectMenuItem(DirectButton):
             ('parentMenu',      None,       None),
             # color of the separator line
             ('separatorFrameColor', (.2, .2, .2, 1),   None),
+            # Only build the popup menu once it is shown the first time
+            ('lazyItems',       False,      None),
+            # Build the popup menus of sub menus once they are opened
+            ('lazySubMenus',    True,       None),
+            # Seconds after a sub menu got closed until its popup menu will
+            # be destroyed again to free memory. It will be rebuilt once it
+            # gets opened again. None to keep the popup menu.
+            ('subMenuEvictDelay', None,     None),
+            # Seconds the mouse has to rest on a sub menu item until it gets
+            # opened or, once left, closed again
+            ('subMenuDelay',    0.2,        None),
+            # key to open the menu with, defaults to the first letter of the
+            # text
+            ('mnemonic',        None,       None),
            )
         self.kw_args_copy = kw.copy()
+        # the options of the popup menu components are applied by
+        # __getGroupKeywords whenever those get created, which may be long
+        # after the construction of this menu
+        for option in list(kw):
+            if option.split('_')[0] in ('item', 'separator', 'popupMenu'):
+                del kw[option]
         # Merge keyword options with default options
         self.defineoptions(kw, optiondefs)
         # Initialize superclasses
         DirectButton.__init__(self, parent)
-        # This is created when you set the menu's items
+        # This is created when you set the menu's items or, for lazily
+        # built menus, once the popup menu is shown the first time
         self.popupMenu = None
+        self.popupMenuRequested = False
         # the selected item
         self.highlightedItem = None
         # A big screen encompassing frame to catch the cancel clicks
@@ -90,106 +119,95 @@ class DirectMenuItem(DirectButton):
     def setItems(self):
         """
         self['items'] = list of DirectMenuItemEntry and DirectMenuItemSubMenu
-        Create new popup menu to reflect specified set of items
+        Update the popup menu to reflect specified set of items. Widgets of
+        items which are still in the list will be kept.
         """
-        # Remove old component if it exits
-        if self.popupMenu != None:
-            self.destroycomponent('popupMenu')
-        # Create new component
-        self.popupMenu = self.createcomponent('popupMenu', (), None,
-                                              DirectBoxSizer,
-                                              (self,),
-                                              itemAlign = DirectBoxSizer.A_Left,
-                                              orientation = DGG.VERTICAL,
-                                              )
-        # Make sure it is on top of all the other gui widgets
-        self.popupMenu.setBin('gui-popup', 0)
+        if self.onItemsChangedFunc:
+            self.onItemsChangedFunc(self)
+        if self['lazyItems'] and not self.popupMenuRequested:
+            # the popup menu will be built once it gets shown
+            return
+        newPopupMenu = self.popupMenu is None
+        if newPopupMenu:
+            # Create new component
+            popupMenuKW = dict(
+                itemAlign = DirectBoxSizer.A_Left,
+                orientation = DGG.VERTICAL)
+            popupMenuKW.update(self.__getGroupKeywords('popupMenu'))
+            self.popupMenu = self.createcomponent('popupMenu', (), None,
+                                                  DirectBoxSizer,
+                                                  (self,),
+                                                  **popupMenuKW
+                                                  )
+            # Make sure it is on top of all the other gui widgets
+            self.popupMenu.setBin('gui-popup', 0)
+            self.itemCounter = 0
         if not self['items']:
+            for container in self.popupMenu["items"]:
+                self.destroycomponent(container.element.menuComponentName)
+            self.popupMenu.removeAllItems(refresh=False)
             return
-        # Create a new component for each item
-        # Find the maximum extents of all items
-        itemIndex = 0
-        self.minX = self.maxX = self.minZ = self.maxZ = None
-        for item in self['items']:
-            if type(item) is DirectMenuItemSubMenu:
-                subMenuKW = self.kw_args_copy.copy()
-                toRemove = ["text", "popupMenuLocation", "items", "isSubMenu", "parentMenu", "frameSize", "scale"]
-                for r in toRemove:
-                    if r in subMenuKW:
-                        del subMenuKW[r]
-
-                c = self.createcomponent(
-                    'item%d' % itemIndex, (), 'item',
-                    DirectMenuItem,
-                    (self.popupMenu,),
-                    text=item.text,
-                    popupMenuLocation=DGG.RIGHT,
-                    items=item.items,
-                    isSubMenu=True,
-                    parentMenu=self,
-                    **subMenuKW,
-                    )
-            elif type(item) is DirectMenuSeparator:
-                c = self.createcomponent(
-                    'separator%d' % itemIndex, (), 'separator',
-                    DirectFrame,
-                    (self.popupMenu,),
-                    frameColor=self["separatorFrameColor"] if self["separatorFrameColor"] else self["frameColor"],
-                    # set width to 0, we'll fit it to the width of the box later
-                    frameSize=(0, 0, -item.height/2, item.height/2),
-                    pad=item.padding,
-                    )
+
+        # Match the items with the widgets that already exist for them
+        oldWidgets = {}
+        for container in self.popupMenu["items"]:
+            c = container.element
+            oldWidgets.setdefault(c.menuItemKey, []).append(c)
+        widgets = [None] * len(self['items'])
+        unmatched = []
+        for i, item in enumerate(self['items']):
+            key = self.__getItemKey(item)
+            if oldWidgets.get(key):
+                widgets[i] = oldWidgets[key].pop(0)
+                self.__updateItemWidget(widgets[i], item)
+            else:
+                unmatched.append(i)
+        # Entries of removed items can be reused for entries with a new text
+        leftoverEntries = []
+        for key, cs in oldWidgets.items():
+            for c in cs:
+                if key[0] == 'entry':
+                    leftoverEntries.append(c)
+                else:
+                    self.destroycomponent(c.menuComponentName)
+        for i in unmatched:
+            item = self['items'][i]
+            if type(item) is DirectMenuItemEntry and leftoverEntries:
+                c = leftoverEntries.pop()
+                c['text'] = item.text
+                c['frameSize'] = None
+                self.__measureItemWidget(c, item)
+                self.__updateItemWidget(c, item)
             else:
-                c = self.createcomponent(
-                    'item%d' % itemIndex, (), 'item',
-                    DirectButton,
-                    (self.popupMenu,),
-                    text=item.text,
-                    text_align=TextNode.ALeft,
-                    command=item.command,
-                    extraArgs=item.extraArgs,
-                    frameColor=self["itemFrameColor"] if self["itemFrameColor"] else self["frameColor"])
-
-                c.bind(DGG.B1RELEASE, self.hidePopupMenu, extraArgs=[True])
-            bounds = DGH.getBounds(c)
-
-            c.resetFrameSize()
-
-            self.popupMenu.addItem(c)
-
-            bw_w = c["borderWidth"][0] + c["pad"][0]
-            bw_h = c["borderWidth"][1] + c["pad"][1]
-
-            # accept events only for actual selectable elements
-            if type(item) is not DirectMenuSeparator:
-                self.minX = min(self.minX if self.minX else bounds[0]-bw_w, bounds[0]-bw_w)
-                self.maxX = max(self.maxX if self.maxX else bounds[1]+bw_w, bounds[1]+bw_w)
-                self.minZ = min(self.minZ if self.minZ else bounds[2]-bw_h, bounds[2]-bw_h)
-                self.maxZ = max(self.maxZ if self.maxZ else bounds[3]+bw_h, bounds[3]+bw_h)
-
-                # Highlight background when mouse is in item
-                c.bind(DGG.WITHIN,
-                          lambda x, item=c: self._highlightItem(item))
-                # Restore specified color upon exiting
-                fc = self['itemFrameColor'] if self['itemFrameColor'] else c['frameColor']
-                c.bind(DGG.WITHOUT,
-                          lambda x, item=c, fc=fc: self._unhighlightItem(item, fc))
-            c.bind(DGG.MWDOWN, self.scrollPopUpMenu, [-1])
-            c.bind(DGG.MWUP, self.scrollPopUpMenu, [1])
-
-            itemIndex += 1
-
-        # Calc max width and height
-        if self.minX is None:
+                c = self.__createItemWidget(item)
+            widgets[i] = c
+        for c in leftoverEntries:
+            self.destroycomponent(c.menuComponentName)
+
+        # Lay out all items with their natural size
+        self.popupMenu.removeAllItems(refresh=False)
+        for c in widgets:
+            if c['frameSize'] is not None:
+                c['frameSize'] = c.naturalFrameSize
+            self.popupMenu.addItem(c, skipRefresh=True)
+        self.popupMenu.refresh()
+
+        # Find the maximum extents of all selectable items
+        bounds = [c.menuItemBounds for c in widgets if c.menuItemBounds is not None]
+        if bounds:
+            self.minX = min(b[0] for b in bounds)
+            self.maxX = max(b[1] for b in bounds)
+            self.minZ = min(b[2] for b in bounds)
+            self.maxZ = max(b[3] for b in bounds)
+        else:
             self.minX = 0
             self.maxX = 1
             self.minZ = 0
             self.maxZ = 1
         self.maxWidth = self.maxX - self.minX
         self.maxHeight = self.maxZ - self.minZ
-        # Adjust frame size for each item and bind actions to mouse events
-        for i in self.popupMenu["items"]:
-            item = i.element
+        # Adjust frame size for each item
+        for item in widgets:
             if type(item) is DirectFrame:
                 fs = item["frameSize"]
                 item['frameSize'] = (self.minX, self.maxX, fs[2], fs[3])
@@ -202,7 +220,8 @@ class DirectMenuItem(DirectButton):
         self.popupMenu.setRelief(self['popupMenu_relief'])
 
         # Set initial state
-        self.hidePopupMenu()
+        if newPopupMenu:
+            self.hidePopupMenu()
         self.bind(DGG.MWDOWN, self.scrollPopUpMenu, [-1])
         self.bind(DGG.MWUP, self.scrollPopUpMenu, [1])
         self.cancelFrame.bind(DGG.MWDOWN, self.scrollPopUpMenu, [-1])
@@ -210,6 +229,172 @@ class DirectMenuItem(DirectButton):
 
         #self.popupMenu.refresh()
 
+    def __getItemKey(self, item):
+        """Returns the key used to find the widget of an item on updates"""
+        if type(item) is DirectMenuItemSubMenu:
+            return ('subMenu', item.text)
+        elif type(item) is DirectMenuSeparator:
+            return ('separator', item.height, tuple(item.padding))
+        return ('entry', item.text)
+
+    def __createItemWidget(self, item):
+        """Create the widget for the given item of the popup menu"""
+        itemIndex = self.itemCounter
+        self.itemCounter += 1
+        if type(item) is DirectMenuItemSubMenu:
+            subMenuKW = self.kw_args_copy.copy()
+            toRemove = ["text", "popupMenuLocation", "items", "isSubMenu", "parentMenu", "frameSize", "scale", "mnemonic"]
+            for r in toRemove:
+                if r in subMenuKW:
+                    del subMenuKW[r]
+
+            subMenuKW.update(self.__getGroupKeywords('item'))
+            subMenuKW.update(
+                text=item.text,
+                popupMenuLocation=DGG.RIGHT,
+                items=item.items,
+                isSubMenu=True,
+                parentMenu=self,
+                mnemonic=item.mnemonic,
+                lazyItems=self['lazySubMenus'])
+
+            name = 'item%d' % itemIndex
+            c = self.createcomponent(
+                name, (), 'item',
+                DirectMenuItem,
+                (self.popupMenu,),
+                **subMenuKW,
+                )
+        elif type(item) is DirectMenuSeparator:
+            separatorKW = dict(
+                frameColor=self["separatorFrameColor"] if self["separatorFrameColor"] else self["frameColor"],
+                # set width to 0, we'll fit it to the width of the box later
+                frameSize=(0, 0, -item.height/2, item.height/2),
+                pad=item.padding)
+            separatorKW.update(self.__getGroupKeywords('separator'))
+
+            name = 'separator%d' % itemIndex
+            c = self.createcomponent(
+                name, (), 'separator',
+                DirectFrame,
+                (self.popupMenu,),
+                **separatorKW,
+                )
+        else:
+            itemKW = dict(
+                text=item.text,
+                text_align=TextNode.ALeft,
+                command=item.command,
+                extraArgs=item.extraArgs,
+                frameColor=self["itemFrameColor"] if self["itemFrameColor"] else self["frameColor"])
+            itemKW.update(self.__getGroupKeywords('item'))
+
+            name = 'item%d' % itemIndex
+            c = self.createcomponent(
+                name, (), 'item',
+                DirectButton,
+                (self.popupMenu,),
+                **itemKW)
+
+            c.bind(DGG.B1RELEASE, self.hidePopupMenu, extraArgs=[True])
+        c.menuComponentName = name
+        c.menuItemEntry = item
+        self.__measureItemWidget(c, item)
+
+        # accept events only for actual selectable elements
+        if type(item) is not DirectMenuSeparator:
+            # Highlight background when mouse is in item
+            c.bind(DGG.WITHIN,
+                      lambda x, item=c: self._highlightItem(item))
+            # Restore specified color upon exiting
+            c.menuItemFrameColor = self['itemFrameColor'] if self['itemFrameColor'] else c['frameColor']
+            c.bind(DGG.WITHOUT,
+                      lambda x, item=c: self._unhighlightItem(item))
+        c.bind(DGG.MWDOWN, self.scrollPopUpMenu, [-1])
+        c.bind(DGG.MWUP, self.scrollPopUpMenu, [1])
+        return c
+
+    def __getGroupKeywords(self, group):
+        """
+        Returns the options given at construction time for the given
+        component group. They override the defaults of the components just
+        like DirectGui would apply them while the menu itself is constructed.
+        """
+        prefix = group + '_'
+        return {
+            key[len(prefix):]: value
+            for key, value in self.kw_args_copy.items()
+            if key.startswith(prefix)}
+
+    def __measureItemWidget(self, c, item):
+        """
+        Store the size of the widget at its natural size, so it will not be
+        measured again as long as the item doesn't change.
+        """
+        c.menuItemKey = self.__getItemKey(item)
+        bounds = DGH.getBounds(c)
+
+        c.resetFrameSize()
+
+        if type(item) is DirectMenuSeparator:
+            c.naturalFrameSize = c['frameSize']
+            c.menuItemBounds = None
+            return
+
+        # a frame size that results in the same size as the natural one
+        bw = DGH.getBorderSize(c)
+        b = DGH.getBounds(c)
+        c.naturalFrameSize = (b[0] - bw[0], b[1] + bw[0], b[2] - bw[1], b[3] + bw[1])
+
+        bw_w = c["borderWidth"][0] + c["pad"][0]
+        bw_h = c["borderWidth"][1] + c["pad"][1]
+        c.menuItemBounds = (
+            bounds[0]-bw_w, bounds[1]+bw_w, bounds[2]-bw_h, bounds[3]+bw_h)
+
+    def __updateItemWidget(self, c, item):
+        """Update a kept widget with the values of the given item"""
+        c.menuItemEntry = item
+        if type(item) is DirectMenuItemSubMenu:
+            c['mnemonic'] = item.mnemonic
+            c['items'] = item.items
+        elif type(item) is DirectMenuItemEntry:
+            c['command'] = item.command
+            c['extraArgs'] = item.extraArgs
+
+    def insertItem(self, index, item):
+        """Insert the item at the given index of the items list"""
+        items = list(self['items'])
+        items.insert(index, item)
+        self['items'] = items
+
+    def removeItem(self, index):
+        """Remove the item at the given index or the given item"""
+        index = self.index(index)
+        if index is None:
+            return
+        items = list(self['items'])
+        del items[index]
+        self['items'] = items
+
+    def updateItem(self, index, item):
+        """Replace the item at the given index or the given item"""
+        index = self.index(index)
+        if index is None:
+            return
+        items = list(self['items'])
+        items[index] = item
+        self['items'] = items
+
+    def index(self, index):
+        """Returns the index of the given item or None if it isn't in the
+        items list, integers are returned as they are"""
+        if isinstance(index, int):
+            return index
+        for i, item in enumerate(self['items']):
+            if item == index:
+                return i
+        return None
+
     def showPopupMenu(self, event = None):
         """
         Make popup visible.
@@ -222,6 +407,12 @@ class DirectMenuItem(DirectButton):
         items = self['items']
         assert items and len(items) > 0, 'Cannot show an empty popup menu! You must add items!'
 
+        taskMgr.remove(self.taskName('evictPopupMenu'))
+        if self.popupMenu is None:
+            # build the popup menu on first use
+            self.popupMenuRequested = True
+            self.setItems()
+
         # Show the menu
         self.popupMenu.show()
         # Compute bounds
@@ -296,6 +487,7 @@ class DirectMenuItem(DirectButton):
                 # Try to set height to line up selected item with button
                 self.popupMenu.setZ(
                     self, self.minZ)
+        menuController.menuOpened(self)
         # Also display cancel frame to catch clicks outside of the popup
         self.cancelFrame.show()
         # Position and scale cancel frame to fill entire window
@@ -306,7 +498,15 @@ class DirectMenuItem(DirectButton):
 
     def hidePopupMenu(self, event = None, hideParentMenu=False, callOnClose=True):
         """ Put away popup and cancel frame """
-        self.popupMenu.hide()
+        if self.popupMenu is not None:
+            self.popupMenu.hide()
+            menuController.menuClosed(self)
+            if self['isSubMenu'] and self['subMenuEvictDelay'] is not None:
+                taskMgr.doMethodLater(
+                    self['subMenuEvictDelay'],
+                    self.evictPopupMenu,
+                    self.taskName('evictPopupMenu'),
+                    extraArgs=[])
         self.cancelFrame.hide()
 
         # call up the ancestry tree
@@ -317,11 +517,35 @@ class DirectMenuItem(DirectButton):
         if self.onCloseMenuFunc and callOnClose:
             self.onCloseMenuFunc()
 
+    def evictPopupMenu(self):
+        """
+        Destroy the popup menu and all its items. It will be built again the
+        next time it gets shown.
+        """
+        taskMgr.remove(self.taskName('evictPopupMenu'))
+        if self.popupMenu is None or self.popupMenu.isEmpty():
+            return
+        for container in self.popupMenu["items"]:
+            self.destroycomponent(container.element.menuComponentName)
+        self.popupMenu.removeAllItems(refresh=False)
+        self.destroycomponent('popupMenu')
+        menuController.menuClosed(self)
+        self.popupMenu = None
+        self.popupMenuRequested = False
+        self.highlightedItem = None
+
+    def destroy(self):
+        taskMgr.remove(self.taskName('evictPopupMenu'))
+        menuController.menuDestroyed(self)
+        DirectButton.destroy(self)
+
     def scrollPopUpMenu(self, direction, event = None):
         """ Scroll the item frame up and down depending on the direction
         which must be a nummeric value. A positive value will scroll up
         while a negative value will scroll down. It will only work if
         items are out of bounds of the window """
+        if self.popupMenu is None:
+            return
 
         #TODO: If the mouse is over a SubMenu, close it to make sure the menu under the mouse is scrolled, not any sub menus
         #      Also, need to check since we don't want to close the upper levels of menus. (Currently this code closses all)
@@ -352,26 +576,118 @@ class DirectMenuItem(DirectButton):
 
     def _highlightItem(self, item):
         """ Set frame color of highlighted item, record index """
+        menuController.highlight(self, item)
 
-        for i in self.popupMenu["items"]:
-            # make sure all other items are unhighlighted
-            base.messenger.send(DGG.WITHOUT + i.element.guiId, [""])
-
-        item['frameColor'] = self['highlightColor']
-        self.highlightedItem = item
-
-        if type(item) is DirectMenuItem:
-            if item['isSubMenu']:
-                taskMgr.doMethodLater(0.2, item.showPopupMenu, "highlight")
-
-    def _unhighlightItem(self, item, frameColor):
+    def _unhighlightItem(self, item):
         """ Clear frame color """
-        item['frameColor'] = frameColor
-        self.highlightedItem = None
-
-        if type(item) is DirectMenuItem:
-            if item['isSubMenu']:
-                def unhiglight(item):
-                    if not item.highlightedItem:
-                        item.hidePopupMenu()
-                taskMgr.doMethodLater(0.2, unhiglight, "unhighlight", extraArgs=[item])
+        menuController.unhighlight(self, item)
+
+
+class DirectMenuController:
+    """
+    Keeps track of the hovered path through all open menus. Highlighting is
+    done per menu by its highlighted item and sub menus get opened and closed
+    by one shared timer task once the mouse rested for the menus
+    subMenuDelay rather than by one task per hovered item.
+    """
+    taskName = 'DirectMenuController-update'
+
+    def __init__(self):
+        # the menu containing the hovered item and the item itself
+        self.hoverMenu = None
+        self.hoverItem = None
+        # sub menu items that got hovered or left since the last update
+        self.pendingSubMenus = set()
+        # sub menus which currently show their popup menu
+        self.openSubMenus = set()
+        self.updateTime = 0
+        self.taskRunning = False
+
+    def highlight(self, menu, item, openSubMenu=True):
+        """
+        Highlight the item of the given menu and mark it as hovered. If
+        openSubMenu is False, a highlighted sub menu will not be opened after
+        the delay, e.g. if it got highlighted by the keyboard.
+        """
+        previous = menu.highlightedItem
+        if previous is not None and previous is not item:
+            # only the previously highlighted item needs to be cleared
+            self.unhighlight(menu, previous)
+
+        item['frameColor'] = menu['highlightColor']
+        menu.highlightedItem = item
+        self.hoverMenu = menu
+        self.hoverItem = item
+
+        if openSubMenu and type(item) is DirectMenuItem and item['isSubMenu']:
+            self.pendingSubMenus.add(item)
+        self.__scheduleUpdate(menu['subMenuDelay'])
+
+    def unhighlight(self, menu, item):
+        """ Restore the color of the item and forget it as being hovered """
+        item['frameColor'] = item.menuItemFrameColor
+        if menu.highlightedItem is item:
+            menu.highlightedItem = None
+        if self.hoverItem is item:
+            self.hoverItem = None
+
+        if type(item) is DirectMenuItem and item['isSubMenu']:
+            self.pendingSubMenus.add(item)
+            self.__scheduleUpdate(menu['subMenuDelay'])
+
+    def menuOpened(self, menu):
+        """ Remember the sub menu to close it once it is left """
+        if menu['isSubMenu']:
+            self.openSubMenus.add(menu)
+
+    def menuClosed(self, menu):
+        """ Forget about the menu after its popup got hidden """
+        self.pendingSubMenus.discard(menu)
+        self.openSubMenus.discard(menu)
+        if self.hoverMenu is menu:
+            self.hoverMenu = None
+            self.hoverItem = None
+
+    def menuDestroyed(self, menu):
+        """ Forget about all hover and pending state referring to the menu """
+        self.menuClosed(menu)
+        if self.hoverItem is menu:
+            self.hoverItem = None
+
+    def __scheduleUpdate(self, delay):
+        """ Delay the next update, starting the timer task if necessary """
+        self.updateTime = globalClock.getFrameTime() + delay
+        if not self.taskRunning:
+            self.taskRunning = True
+            taskMgr.add(self.__update, self.taskName)
+
+    def __update(self, task):
+        """ Open the hovered sub menu and close all others off the path """
+        if globalClock.getFrameTime() < self.updateTime:
+            return task.cont
+        self.taskRunning = False
+
+        # the hovered menu and all its parents have to stay open
+        hoverPath = set()
+        menu = self.hoverMenu
+        while menu is not None and not menu.isEmpty():
+            hoverPath.add(menu)
+            menu = menu['parentMenu'] if menu['isSubMenu'] else None
+
+        pendingSubMenus = self.pendingSubMenus | self.openSubMenus
+        self.pendingSubMenus = set()
+        for subMenu in pendingSubMenus:
+            if subMenu.isEmpty():
+                continue
+            if subMenu is self.hoverItem:
+                if subMenu.popupMenu is None or subMenu.popupMenu.isHidden():
+                    subMenu.showPopupMenu()
+            elif subMenu not in hoverPath \
+                    and subMenu.popupMenu is not None \
+                    and not subMenu.popupMenu.isHidden():
+                subMenu.hidePopupMenu()
+        return task.done
+
+
+# The controller shared by all menus
+menuController = DirectMenuController()
@@ -0,0 +1,447 @@
+"""This module contains the DirectMultiSplitFrame class."""
+
+__all__ = ['DirectMultiSplitFrame', 'DirectSplitPane', 'DirectSplitGroup']
+
+import math
+
+from panda3d.core import PGItem, Point3, Vec3
+from direct.gui import DirectGuiGlobals as DGG
+from direct.gui.DirectFrame import DirectFrame
+
+
+class DirectSplitPane:
+    """A leaf of the split tree which gets its own frame"""
+    def __init__(self, name, weight=1, minSize=None, maxSize=None):
+        self.name = name
+        # share of the size of the parent group, relative to the siblings
+        self.weight = weight
+        # size limits along the orientation of the parent group
+        self.minSize = minSize
+        self.maxSize = maxSize
+        # set by the layout pass
+        self.rect = None
+        self.limits = None
+
+    def toDict(self):
+        return dict(
+            pane=self.name,
+            weight=self.weight,
+            minSize=self.minSize,
+            maxSize=self.maxSize)
+
+
+class DirectSplitGroup:
+    """A node of the split tree which places its children side by side"""
+    def __init__(self, orientation, children, weight=1, minSize=None, maxSize=None):
+        # DGG.HORIZONTAL to place the children from left to right or
+        # DGG.VERTICAL to place them from top to bottom
+        self.orientation = orientation
+        self.children = children
+        self.weight = weight
+        self.minSize = minSize
+        self.maxSize = maxSize
+        # set by the layout pass
+        self.rect = None
+        self.limits = None
+        self.splitters = []
+
+    def toDict(self):
+        return dict(
+            orientation=self.orientation,
+            weight=self.weight,
+            minSize=self.minSize,
+            maxSize=self.maxSize,
+            children=[child.toDict() for child in self.children])
+
+
+def _nodeFromDict(data):
+    """Create the split tree described by the given dict"""
+    if 'pane' in data:
+        return DirectSplitPane(
+            data['pane'],
+            data.get('weight', 1),
+            data.get('minSize'),
+            data.get('maxSize'))
+    return DirectSplitGroup(
+        data['orientation'],
+        [_nodeFromDict(child) for child in data['children']],
+        data.get('weight', 1),
+        data.get('minSize'),
+        data.get('maxSize'))
+
+
+def _distribute(total, weights, limits):
+    """
+    Split total into sizes proportional to the weights which stay within
+    the given (min, max) limits. Sizes that would violate their limits get
+    fixed to them and the remaining size is distributed among the others.
+    """
+    sizes = [None] * len(weights)
+    free = list(range(len(weights)))
+    remaining = total
+    while free:
+        weightSum = sum(max(weights[i], 0) for i in free)
+        violated = []
+        for i in free:
+            if weightSum > 0:
+                size = remaining * max(weights[i], 0) / weightSum
+            else:
+                size = remaining / len(free)
+            lo, hi = limits[i]
+            if size < lo:
+                violated.append((i, lo))
+            elif size > hi:
+                violated.append((i, hi))
+            else:
+                sizes[i] = size
+        if not violated:
+            break
+        for i, size in violated:
+            sizes[i] = size
+            remaining -= size
+            free.remove(i)
+    return sizes
+
+
+class DirectMultiSplitFrame(DirectFrame):
+    """
+    Any number of frames placed in a tree of horizontal and vertical splits
+    which can be resized by dragging the splitters between them. All panes
+    are sized in one pass over the tree.
+    """
+
+    def __init__(self, parent = None, **kw):
+        self.skipInitRefresh = True
+        optiondefs = (
+            # Define type of DirectGuiWidget
+            ('pgFunc',         PGItem,      None),
+            ('numStates',      1,           None),
+            ('state',          DGG.NORMAL,  None),
+            ('borderWidth',    (0, 0),      self.setBorderWidth),
+            ('frameSize',      (-1,1,-1,1), None),
+
+            # The split tree, a DirectSplitGroup or DirectSplitPane or a dict
+            # as returned by getLayout
+            ('layout',         None,        self.setLayout),
+
+            ('splitterWidth',  0.02,        self.refresh),
+            ('splitterColor', (.7, .7, .7, 1), None),
+            ('splitterHighlightColor', (.9, .9, .9, 1), None),
+
+            # Dict of pane names to functions called after the pane resized
+            ('paneUpdateSizeFuncs', {},     None),
+
+            ('suppressMouse',  0,           None)
+            )
+
+        # the root of the split tree
+        self.rootNode = None
+        # pane names to their frames
+        self.panes = {}
+        self.unusedSplitters = []
+        self.componentCounter = 0
+        self.changedPanes = []
+        self.dragDropTask = None
+
+        # Merge keyword options with default options
+        self.defineoptions(kw, optiondefs)
+
+        # Initialize superclasses
+        DirectFrame.__init__(self, parent)
+
+        self.resetFrameSize()
+
+        # create the panes now, so component options given to the
+        # constructor will be applied to them
+        self.setLayout()
+
+        # Call option initialization functions
+        self.initialiseoptions(DirectMultiSplitFrame)
+
+        self.skipInitRefresh = False
+        # initialize once at the end
+        self.refresh()
+
+    def setLayout(self):
+        """
+        Build the panes and splitters of the split tree. Frames of panes
+        which are still in the tree will be kept.
+        """
+        for splitter in self.__getAllSplitters():
+            splitter.hide()
+            self.unusedSplitters.append(splitter)
+
+        layout = self['layout']
+        if isinstance(layout, dict):
+            layout = _nodeFromDict(layout)
+        self.rootNode = layout
+
+        oldPanes = self.panes
+        self.panes = {}
+        if self.rootNode is not None:
+            self.__buildNode(self.rootNode, oldPanes)
+
+        for name, pane in oldPanes.items():
+            self.destroycomponent(pane.paneComponentName)
+
+        self.refresh()
+
+    def __getAllSplitters(self):
+        splitters = []
+        stack = [self.rootNode] if self.rootNode is not None else []
+        while stack:
+            node = stack.pop()
+            if isinstance(node, DirectSplitGroup):
+                splitters += node.splitters
+                stack += node.children
+        return splitters
+
+    def __buildNode(self, node, oldPanes):
+        if isinstance(node, DirectSplitPane):
+            if node.name in oldPanes:
+                pane = oldPanes.pop(node.name)
+            else:
+                name = 'pane%d' % self.componentCounter
+                self.componentCounter += 1
+                pane = self.createcomponent(
+                    name, (), 'pane',
+                    DirectFrame, (self,))
+                pane.paneComponentName = name
+                pane.paneSize = None
+            self.panes[node.name] = pane
+            return
+
+        node.splitters = []
+        for i, child in enumerate(node.children):
+            self.__buildNode(child, oldPanes)
+            if i < len(node.children) - 1:
+                node.splitters.append(self.__getSplitter(node, i))
+
+    def __getSplitter(self, group, index):
+        """Returns a new or reused splitter between the children at index
+        and index + 1 of the given group"""
+        if self.unusedSplitters:
+            splitter = self.unusedSplitters.pop()
+            splitter.show()
+        else:
+            name = 'splitter%d' % self.componentCounter
+            self.componentCounter += 1
+            splitter = self.createcomponent(
+                name, (), 'splitter',
+                DirectFrame, (self,),
+                numStates = 2,
+                frameColor = self['splitterColor'],
+                state = 'normal')
+            splitter.bind(DGG.ENTER, self.enter, [splitter])
+            splitter.bind(DGG.EXIT, self.exit, [splitter])
+            splitter.bind(DGG.B1PRESS, self.dragStart, [splitter])
+            splitter.bind(DGG.B1RELEASE, self.dragStop, [splitter])
+        splitter.splitGroup = group
+        splitter.splitIndex = index
+        return splitter
+
+    def getPane(self, name):
+        """Returns the frame of the pane with the given name"""
+        return self.panes[name]
+
+    def getLayout(self):
+        """
+        Returns the current split tree including the sizes set by the user as
+        dict which can be stored and set as layout again later
+        """
+        if self.rootNode is None:
+            return None
+        return self.rootNode.toDict()
+
+    def refresh(self):
+        """
+        Recalculate the size and position of all panes and splitters
+        """
+        # sanity checks so we don't get here to early
+        if self.skipInitRefresh: return
+        if self.rootNode is None: return
+
+        self.__computeLimits(self.rootNode, None)
+        fs = self["frameSize"]
+        self.__layoutNode(self.rootNode, (fs[0], fs[1], fs[2], fs[3]))
+        self.__notify()
+
+    def __computeLimits(self, node, parentOrientation):
+        """Store the (min, max) sizes along both axes of every node"""
+        limits = {}
+        for axis in (DGG.HORIZONTAL, DGG.VERTICAL):
+            if axis == parentOrientation:
+                lo = node.minSize or 0
+                hi = node.maxSize if node.maxSize is not None else math.inf
+            else:
+                lo, hi = 0, math.inf
+            limits[axis] = [lo, hi]
+
+        if isinstance(node, DirectSplitGroup):
+            for child in node.children:
+                self.__computeLimits(child, node.orientation)
+            gaps = self['splitterWidth'] * (len(node.children) - 1)
+            for axis in (DGG.HORIZONTAL, DGG.VERTICAL):
+                childLimits = [child.limits[axis] for child in node.children]
+                if axis == node.orientation:
+                    lo = sum(l[0] for l in childLimits) + gaps
+                    hi = sum(l[1] for l in childLimits) + gaps
+                else:
+                    lo = max(l[0] for l in childLimits)
+                    hi = min(l[1] for l in childLimits)
+                limits[axis][0] = max(limits[axis][0], lo)
+                limits[axis][1] = min(limits[axis][1], hi)
+        node.limits = limits
+
+    def __layoutNode(self, node, rect):
+        """Place the node and all its children within the given rect"""
+        node.rect = rect
+        left, right, bottom, top = rect
+        if isinstance(node, DirectSplitPane):
+            self.__placePane(node, rect)
+            return
+
+        sw = self['splitterWidth']
+        horizontal = node.orientation == DGG.HORIZONTAL
+        available = (right - left if horizontal else top - bottom) - sw * (len(node.children) - 1)
+        sizes = _distribute(
+            available,
+            [child.weight for child in node.children],
+            [child.limits[node.orientation] for child in node.children])
+
+        pos = left if horizontal else top
+        for i, child in enumerate(node.children):
+            if horizontal:
+                self.__layoutNode(child, (pos, pos + sizes[i], bottom, top))
+                pos += sizes[i]
+            else:
+                self.__layoutNode(child, (left, right, pos - sizes[i], pos))
+                pos -= sizes[i]
+
+            if i < len(node.splitters):
+                splitter = node.splitters[i]
+                if horizontal:
+                    splitter["frameSize"] = (-sw/2, sw/2, bottom, top)
+                    splitter.setPos(pos + sw/2, 0, 0)
+                    pos += sw
+                else:
+                    splitter["frameSize"] = (left, right, -sw/2, sw/2)
+                    splitter.setPos(0, 0, pos - sw/2)
+                    pos -= sw
+
+    def __placePane(self, node, rect):
+        left, right, bottom, top = rect
+        pane = self.panes[node.name]
+        width = right - left
+        height = top - bottom
+        pane.setPos((left + right) / 2, 0, (bottom + top) / 2)
+        if pane.paneSize != (width, height):
+            # only resized panes need to update their content
+            pane.paneSize = (width, height)
+            pane["frameSize"] = (-width/2, width/2, -height/2, height/2)
+            self.changedPanes.append(node.name)
+
+    def __notify(self):
+        """Inform about all panes that changed their size"""
+        changedPanes = self.changedPanes
+        self.changedPanes = []
+        for name in changedPanes:
+            func = self['paneUpdateSizeFuncs'].get(name)
+            if func is not None:
+                func()
+        base.messenger.send(self.uniqueName("update-size"))
+
+    def moveSplitter(self, group, index, pos):
+        """
+        Move the splitter between the children at index and index + 1 of the
+        given group to the given position along the groups orientation. Only
+        the two neighbouring children and their content will be resized.
+        """
+        sw = self['splitterWidth']
+        first = group.children[index]
+        second = group.children[index + 1]
+        if group.orientation == DGG.HORIZONTAL:
+            total = second.rect[1] - first.rect[0] - sw
+            firstSize = pos - sw/2 - first.rect[0]
+            sizeIndex = 0
+        else:
+            total = first.rect[3] - second.rect[2] - sw
+            firstSize = first.rect[3] - (pos + sw/2)
+            sizeIndex = 1
+        firstLo, firstHi = first.limits[group.orientation]
+        secondLo, secondHi = second.limits[group.orientation]
+        firstSize = max(firstSize, firstLo, total - secondHi)
+        firstSize = min(firstSize, firstHi, total - secondLo)
+        currentSize = (
+            first.rect[1] - first.rect[0],
+            first.rect[3] - first.rect[2])[sizeIndex]
+        if abs(firstSize - currentSize) < 1e-6:
+            # e.g. still dragged beyond a limit, nothing to relayout
+            return
+
+        # use the current sizes as weights so the other children keep theirs
+        for child in group.children:
+            child.weight = (
+                child.rect[1] - child.rect[0],
+                child.rect[3] - child.rect[2])[sizeIndex]
+        first.weight = firstSize
+        second.weight = total - firstSize
+
+        self.__layoutNode(group, group.rect)
+        self.__notify()
+
+    def enter(self, splitter, event):
+        splitter["frameColor"] = self['splitterHighlightColor']
+
+    def exit(self, splitter, event):
+        if self.dragDropTask is None:
+            splitter["frameColor"] = self['splitterColor']
+
+    def dragStart(self, splitter, event):
+        """
+        Start dragging the splitter around
+        """
+        if self.dragDropTask is not None:
+            # remove any existing tasks
+            taskMgr.remove(self.dragDropTask)
+
+        splitter["frameColor"] = self['splitterHighlightColor']
+
+        # get the mouse position as seen from this frame
+        vMouse = self.getRelativePoint(
+            render2d, Point3(event.getMouse()[0], 0, event.getMouse()[1]))
+        # calculate the vector between the mouse and the splitter
+        editVec = Vec3(splitter.getPos() - vMouse)
+        # create the task and store the values in it, so we can use it in there
+        self.dragDropTask = taskMgr.add(self.dragTask, self.taskName("dragDropTask"))
+        self.dragDropTask.editVec = editVec
+        self.dragDropTask.splitter = splitter
+
+    def dragTask(self, t):
+        """
+        Calculate the new splitter position every frame
+        """
+        mwn = base.mouseWatcherNode
+        if mwn.hasMouse():
+            vMouse = self.getRelativePoint(
+                render2d, Point3(mwn.getMouse()[0], 0, mwn.getMouse()[1]))
+            newPos = vMouse + t.editVec
+            splitter = t.splitter
+            if splitter.splitGroup.orientation == DGG.HORIZONTAL:
+                pos = newPos.getX()
+                oldPos = splitter.getX()
+            else:
+                pos = newPos.getZ()
+                oldPos = splitter.getZ()
+            if pos != oldPos:
+                self.moveSplitter(splitter.splitGroup, splitter.splitIndex, pos)
+        return t.cont
+
+    def dragStop(self, splitter, event):
+        """
+        Stop dragging the splitter around
+        """
+        # kill the drag and drop task
+        taskMgr.remove(self.dragDropTask)
+        self.dragDropTask = None
+        splitter["frameColor"] = self['splitterColor']
@@ -2,7 +2,9 @@
 
 __all__ = ['DirectOptionMenu']
 
-from panda3d.core import *
+import bisect
+import heapq
+from panda3d.core import MouseButton, PGButton, TextNode, VBase3
 from direct.gui import DirectGuiGlobals as DGG
 #import DirectGuiGlobalsExtra as DGG #<- TODO: Why doesn't this work as expected
 DGG.MWUP = PGButton.getPressPrefix() + MouseButton.wheel_up().getName() + '-'
@@ -11,9 +13,11 @@ DGG.LEFT = "left"
 DGG.RIGHT = "right"
 DGG.ABOVE = "above"
 DGG.BELOW = "below"
-from direct.gui.DirectButton import *
-from direct.gui.DirectLabel import *
-from direct.gui.DirectFrame import *
+from direct.gui.DirectButton import DirectButton
+from direct.gui.DirectFrame import DirectFrame
+from direct.gui.DirectEntry import DirectEntry
+from direct.showbase import ShowBaseGlobal
+from . import DirectGuiHelper as DGH
 
 class DirectOptionMenu(DirectButton):
     """
@@ -47,6 +51,21 @@ class DirectOptionMenu(DirectButton):
             ('text_align',  TextNode.ALeft, None),
             # Remove press effect because it looks a bit funny
             ('pressEffect',     0,          DGG.INITOPT),
+            # Only create buttons for the visible part of the popup menu
+            # and reuse them while scrolling. Meant for very long lists.
+            ('virtualized',     False,      DGG.INITOPT),
+            # Number of items shown at once in the virtualized popup menu
+            ('numVisibleItems', 20,         DGG.INITOPT),
+            # Jump to items by typing their first letters while the popup
+            # menu is shown
+            ('typeAhead',       True,       None),
+            # Seconds after which typing starts a new type-ahead search
+            ('typeAheadTimeout', 1.0,       None),
+            # Show an entry on top of the popup menu to filter the items
+            ('filterField',     False,      DGG.INITOPT),
+            # Let the filter match items containing the text anywhere rather
+            # than only those starting with it
+            ('filterSubstring', True,       None),
            )
         # Merge keyword options with default options
         self.defineoptions(kw, optiondefs)
@@ -76,8 +95,27 @@ class DirectOptionMenu(DirectButton):
             self.popupMarker.guiItem.clearSound(DGG.B1PRESS + self.popupMarker.guiId)
         # This is created when you set the menu's items
         self.popupMenu = None
+        self.itemButtons = []
+        self.itemCounter = 0
+        self.minX = self.maxX = self.minZ = self.maxZ = None
         self.selectedIndex = None
+        self.selectedItem = None
         self.highlightedIndex = None
+        # Index of the item shown in the topmost button of the popup menu.
+        # This is only changed when the popup menu is virtualized.
+        self.firstVisibleIndex = 0
+        self.highlightedSlot = None
+        # The button currently highlighted and its original frame color
+        self.highlightedButton = None
+        self.highlightedButtonColor = None
+        # Indices of the items shown in the popup menu while it is filtered
+        self.filteredIndices = None
+        self.filterEntry = None
+        self.typeAheadText = ''
+        self.typeAheadTime = 0
+        self.keystrokeEvent = None
+        # the button thrower we set up the keystroke event on, if any
+        self.keystrokeThrower = None
         if 'item_text_scale' in kw:
             self.prevItemTextScale = kw['item_text_scale']
         else:
@@ -105,69 +143,41 @@ class DirectOptionMenu(DirectButton):
     def setItems(self):
         """
         self['items'] = itemList
-        Create new popup menu to reflect specified set of items
+        Update the popup menu to reflect specified set of items. Buttons of
+        items which are still in the list will be kept.
         """
-        # Remove old component if it exits
-        if self.popupMenu != None:
-            self.destroycomponent('popupMenu')
-        # Create new component
-        self.popupMenu = self.createcomponent('popupMenu', (), None,
-                                              DirectFrame,
-                                              (self,),
-                                              relief = 'raised',
-                                              )
-        # Make sure it is on top of all the other gui widgets
-        self.popupMenu.setBin('gui-popup', 0)
+        newPopupMenu = self.popupMenu is None or self['virtualized']
+        if newPopupMenu:
+            # Remove old component if it exits
+            if self.popupMenu != None:
+                self.destroycomponent('popupMenu')
+            # Create new component
+            self.popupMenu = self.createcomponent('popupMenu', (), None,
+                                                  DirectFrame,
+                                                  (self,),
+                                                  relief = 'raised',
+                                                  )
+            # Make sure it is on top of all the other gui widgets
+            self.popupMenu.setBin('gui-popup', 0)
+            self.itemButtons = []
+            self.itemCounter = 0
+            self.filterEntry = None
+        else:
+            # start from the unfiltered popup menu
+            self.setFilter('')
+        self.filteredIndices = None
+        self.highlightedButton = None
+        self.__buildSearchIndex()
         if not self['items']:
+            for c in self.itemButtons:
+                self.destroycomponent(c.componentName)
+            self.itemButtons = []
             return
-        # Create a new component for each item
-        # Find the maximum extents of all items
-        itemIndex = 0
-        self.minX = self.maxX = self.minZ = self.maxZ = None
-        for item in self['items']:
-            c = self.createcomponent(
-                'item%d' % itemIndex, (), 'item',
-                DirectButton, (self.popupMenu,),
-                text = item, text_align = TextNode.ALeft,
-                command = lambda i = itemIndex: self.set(i))
-            bounds = c.getBounds()
-            if self.minX == None:
-                self.minX = bounds[0]
-            elif bounds[0] < self.minX:
-                self.minX = bounds[0]
-            if self.maxX == None:
-                self.maxX = bounds[1]
-            elif bounds[1] > self.maxX:
-                self.maxX = bounds[1]
-            if self.minZ == None:
-                self.minZ = bounds[2]
-            elif bounds[2] < self.minZ:
-                self.minZ = bounds[2]
-            if self.maxZ == None:
-                self.maxZ = bounds[3]
-            elif bounds[3] > self.maxZ:
-                self.maxZ = bounds[3]
-            itemIndex += 1
-        # Calc max width and height
-        self.maxWidth = self.maxX - self.minX
-        self.maxHeight = self.maxZ - self.minZ
-        # Adjust frame size for each item and bind actions to mouse events
-        for i in range(itemIndex):
-            item = self.component('item%d' %i)
-            # So entire extent of item's slot on popup is reactive to mouse
-            item['frameSize'] = (self.minX, self.maxX, self.minZ, self.maxZ)
-            # Move it to its correct position on the popup
-            item.setPos(-self.minX, 0, -self.maxZ - i * self.maxHeight)
-            item.bind(DGG.B1RELEASE, self.hidePopupMenu)
-            # Highlight background when mouse is in item
-            item.bind(DGG.WITHIN,
-                      lambda x, i=i, item=item:self._highlightItem(item, i))
-            # Restore specified color upon exiting
-            fc = item['frameColor']
-            item.bind(DGG.WITHOUT,
-                      lambda x, item=item, fc=fc: self._unhighlightItem(item, fc))
-            item.bind(DGG.MWDOWN, self.scrollPopUpMenu, [-1])
-            item.bind(DGG.MWUP, self.scrollPopUpMenu, [1])
+        self.firstVisibleIndex = 0
+        if self['virtualized']:
+            itemIndex = self.__createVirtualItems()
+        else:
+            itemIndex = self.__updateItemButtons()
         # Set popup menu frame size to encompass all items
         f = self.component('popupMenu')
         f['frameSize'] = (0, self.maxWidth, -self.maxHeight * itemIndex, 0)
@@ -175,8 +185,24 @@ class DirectOptionMenu(DirectButton):
         # break the bounds calculation.
         self.popupMenu.setRelief(self['popupMenu_relief'])
 
+        if self.filterEntry is not None:
+            self.filterEntry['width'] = self.maxWidth
+        elif self['filterField']:
+            # The filter entry is placed right on top of the popup menu
+            self.filterEntry = self.createcomponent(
+                'filterEntry', (), None,
+                DirectEntry, (self.popupMenu,),
+                width = self.maxWidth,
+                command = self.__acceptFilter)
+            self.filterEntry.setPos(0, 0, -DGH.getBounds(self.filterEntry)[2])
+            self.filterEntry.bind(DGG.TYPE, self.__filterChanged)
+            self.filterEntry.bind(DGG.ERASE, self.__filterChanged)
+
         # Determine what initial item to display and set text accordingly
-        if self['initialitem']:
+        if not newPopupMenu and self.selectedItem in self['items']:
+            # Keep the selection of updated items
+            self.set(self.selectedItem, fCommand = 0)
+        elif self['initialitem']:
             self.set(self['initialitem'], fCommand = 0)
         else:
             # No initial item specified, just use first item
@@ -204,12 +230,322 @@ class DirectOptionMenu(DirectButton):
         bounds[1] += pmw
         self['frameSize'] = (bounds[0], bounds[1], bounds[2], bounds[3])
         # Set initial state
-        self.hidePopupMenu()
+        if newPopupMenu:
+            self.hidePopupMenu()
         self.bind(DGG.MWDOWN, self.scrollPopUpMenu, [-1])
         self.bind(DGG.MWUP, self.scrollPopUpMenu, [1])
         self.cancelFrame.bind(DGG.MWDOWN, self.scrollPopUpMenu, [-1])
         self.cancelFrame.bind(DGG.MWUP, self.scrollPopUpMenu, [1])
 
+    def __createVirtualItems(self):
+        """
+        Create a fixed amount of buttons for the popup menu which will show
+        the items from firstVisibleIndex on. All buttons are measured with a
+        sample of the items rather than measuring every single item.
+        Returns the number of created buttons.
+        """
+        items = self['items']
+        numSlots = min(self['numVisibleItems'], len(items))
+        # Measure the first items as well as the longest ones which will most
+        # likely be the widest
+        sample = list(items[:numSlots])
+        sample += heapq.nlargest(numSlots, items, key=len)
+        self.minX = self.maxX = self.minZ = self.maxZ = None
+        for slot in range(numSlots):
+            c = self.createcomponent(
+                'item%d' % slot, (), 'item',
+                DirectButton, (self.popupMenu,),
+                text = items[slot], text_align = TextNode.ALeft,
+                command = lambda slot = slot: self.set(
+                    self.__rowIndex(self.firstVisibleIndex + slot)))
+            c.componentName = 'item%d' % slot
+            self.itemButtons.append(c)
+        c = self.itemButtons[0]
+        for text in sample:
+            c['text'] = text
+            c.resetFrameSize()
+            bounds = c.getBounds()
+            self.minX = bounds[0] if self.minX is None else min(self.minX, bounds[0])
+            self.maxX = bounds[1] if self.maxX is None else max(self.maxX, bounds[1])
+            self.minZ = bounds[2] if self.minZ is None else min(self.minZ, bounds[2])
+            self.maxZ = bounds[3] if self.maxZ is None else max(self.maxZ, bounds[3])
+        c['text'] = items[0]
+        # Calc max width and height
+        self.maxWidth = self.maxX - self.minX
+        self.maxHeight = self.maxZ - self.minZ
+        # Adjust frame size for each button and bind actions to mouse events
+        for slot in range(numSlots):
+            item = self.itemButtons[slot]
+            item['frameSize'] = (self.minX, self.maxX, self.minZ, self.maxZ)
+            item.setPos(-self.minX, 0, -self.maxZ - slot * self.maxHeight)
+            item.bind(DGG.B1RELEASE, self.hidePopupMenu)
+            item.bind(DGG.WITHIN,
+                      lambda x, slot=slot, item=item: self._highlightItem(
+                          item, self.__rowIndex(self.firstVisibleIndex + slot), slot))
+            fc = item['frameColor']
+            item.bind(DGG.WITHOUT,
+                      lambda x, item=item, fc=fc: self._unhighlightItem(item, fc))
+            item.bind(DGG.MWDOWN, self.scrollPopUpMenu, [-1])
+            item.bind(DGG.MWUP, self.scrollPopUpMenu, [1])
+        return numSlots
+
+    def __createItemButton(self, item):
+        """Create and measure the popup menu button for the given item"""
+        name = 'item%d' % self.itemCounter
+        self.itemCounter += 1
+        c = self.createcomponent(
+            name, (), 'item',
+            DirectButton, (self.popupMenu,),
+            text = item, text_align = TextNode.ALeft)
+        c.componentName = name
+        c.itemKey = item
+        c.itemBounds = c.getBounds()
+        c['command'] = lambda c = c: self.set(c.itemIndex)
+        c.bind(DGG.B1RELEASE, self.hidePopupMenu)
+        # Highlight background when mouse is in item
+        c.bind(DGG.WITHIN,
+               lambda x, c = c: self._highlightItem(c, c.itemIndex))
+        # Restore specified color upon exiting
+        fc = c['frameColor']
+        c.bind(DGG.WITHOUT,
+               lambda x, c = c, fc = fc: self._unhighlightItem(c, fc))
+        c.bind(DGG.MWDOWN, self.scrollPopUpMenu, [-1])
+        c.bind(DGG.MWUP, self.scrollPopUpMenu, [1])
+        return c
+
+    def __updateItemButtons(self):
+        """
+        Match the popup menu buttons with the current items. Buttons of items
+        that are still in the list are kept as they are, buttons of removed
+        items get the text of new items and only if no such button is left,
+        new ones will be created. Only buttons with a new text are measured.
+        Returns the number of buttons.
+        """
+        # buttons by the item they currently show
+        oldButtons = {}
+        for c in self.itemButtons:
+            oldButtons.setdefault(c.itemKey, []).append(c)
+        buttons = [None] * len(self['items'])
+        unmatched = []
+        for i, item in enumerate(self['items']):
+            if oldButtons.get(item):
+                buttons[i] = oldButtons[item].pop(0)
+            else:
+                unmatched.append(i)
+        leftover = [c for cs in oldButtons.values() for c in cs]
+        changed = set()
+        for i in unmatched:
+            item = self['items'][i]
+            if leftover:
+                # reuse the button of a removed item
+                c = leftover.pop()
+                c['text'] = item
+                c['frameSize'] = None
+                c.itemKey = item
+                c.itemBounds = c.getBounds()
+            else:
+                c = self.__createItemButton(item)
+            buttons[i] = c
+            changed.add(c)
+        for c in leftover:
+            self.destroycomponent(c.componentName)
+        self.itemButtons = buttons
+
+        # Find the maximum extents of all items
+        extents = (
+            min(c.itemBounds[0] for c in buttons),
+            max(c.itemBounds[1] for c in buttons),
+            min(c.itemBounds[2] for c in buttons),
+            max(c.itemBounds[3] for c in buttons))
+        if extents != (self.minX, self.maxX, self.minZ, self.maxZ):
+            # all buttons need to be resized
+            changed = set(buttons)
+        self.minX, self.maxX, self.minZ, self.maxZ = extents
+        # Calc max width and height
+        self.maxWidth = self.maxX - self.minX
+        self.maxHeight = self.maxZ - self.minZ
+        for i, c in enumerate(buttons):
+            if c in changed:
+                # So entire extent of item's slot on popup is reactive to mouse
+                c['frameSize'] = extents
+            if c in changed or getattr(c, 'itemIndex', None) != i:
+                # Move it to its correct position on the popup
+                c.setPos(-self.minX, 0, -self.maxZ - i * self.maxHeight)
+            c.itemIndex = i
+        return len(buttons)
+
+    def insertItem(self, index, item):
+        """Insert the item at the given index of the items list"""
+        items = list(self['items'])
+        items.insert(index, item)
+        self['items'] = items
+
+    def removeItem(self, index):
+        """Remove the item at the given index or the given item"""
+        index = self.index(index)
+        if index is None:
+            return
+        items = list(self['items'])
+        del items[index]
+        self['items'] = items
+
+    def updateItem(self, index, item):
+        """Replace the item at the given index or the given item"""
+        index = self.index(index)
+        if index is None:
+            return
+        items = list(self['items'])
+        items[index] = item
+        self['items'] = items
+
+    def __showVirtualItems(self, firstVisibleIndex, force = False):
+        """Fill the buttons of the virtualized popup menu with the items
+        starting at the given row"""
+        numRows = self.__numRows()
+        numSlots = min(self['numVisibleItems'], numRows)
+        firstVisibleIndex = max(0, min(firstVisibleIndex, numRows - numSlots))
+        if firstVisibleIndex == self.firstVisibleIndex and not force:
+            return
+        self.firstVisibleIndex = firstVisibleIndex
+        for slot in range(min(self['numVisibleItems'], len(self['items']))):
+            item = self.itemButtons[slot]
+            if slot < numSlots:
+                item['text'] = self['items'][self.__rowIndex(firstVisibleIndex + slot)]
+                item.show()
+            else:
+                # less items left than we have buttons
+                item.hide()
+        if self.highlightedSlot is not None:
+            # the item under the mouse changed
+            self.highlightedIndex = self.__rowIndex(firstVisibleIndex + self.highlightedSlot)
+
+    def __numRows(self):
+        """Number of items shown in the popup menu with the filter applied"""
+        if self.filteredIndices is None:
+            return len(self['items'])
+        return len(self.filteredIndices)
+
+    def __rowIndex(self, row):
+        """Returns the index of the item shown at the given row of the popup
+        menu with the filter applied"""
+        if self.filteredIndices is None:
+            return row
+        return self.filteredIndices[row]
+
+    def __itemRow(self, index):
+        """Returns the row the item at the given index is shown at in the
+        popup menu with the filter applied or None if it is filtered out"""
+        if self.filteredIndices is None:
+            return index
+        row = bisect.bisect_left(self.filteredIndices, index)
+        if row < len(self.filteredIndices) and self.filteredIndices[row] == index:
+            return row
+        return None
+
+    def __buildSearchIndex(self):
+        """Set up the lookup tables used to search for items"""
+        self.searchTexts = [str(item).lower() for item in self['items']]
+        self.sortedSearchTexts = sorted(
+            (text, i) for i, text in enumerate(self.searchTexts))
+
+    def findItems(self, text, prefixOnly = False):
+        """
+        Returns the indices of all items starting with the given text or, if
+        prefixOnly is not set, containing the text. The search is case
+        insensitive and the indices are returned in the order of the items.
+        """
+        text = text.lower()
+        if not prefixOnly:
+            return [i for i, t in enumerate(self.searchTexts) if text in t]
+        start = bisect.bisect_left(self.sortedSearchTexts, (text,))
+        indices = []
+        for t, i in self.sortedSearchTexts[start:]:
+            if not t.startswith(text):
+                break
+            indices.append(i)
+        return sorted(indices)
+
+    def setFilter(self, text):
+        """
+        Only show items matching the given text in the popup menu. An empty
+        text will show all items again. No buttons are created by this, the
+        existing ones will only be moved or refilled.
+        """
+        if text:
+            rows = self.findItems(text, not self['filterSubstring'])
+        else:
+            rows = None
+        if rows is None and self.filteredIndices is None:
+            return
+        if self.highlightedButton is not None:
+            self._unhighlightItem(self.highlightedButton, self.highlightedButtonColor)
+
+        if self['virtualized']:
+            self.filteredIndices = rows
+            self.__showVirtualItems(0, True)
+            numSlots = min(self['numVisibleItems'], self.__numRows())
+        else:
+            allRows = range(len(self['items']))
+            oldRows = allRows if self.filteredIndices is None else self.filteredIndices
+            newRows = allRows if rows is None else rows
+            if rows is not None:
+                shown = set(rows)
+                for i in oldRows:
+                    if i not in shown:
+                        self.itemButtons[i].hide()
+            for row, i in enumerate(newRows):
+                item = self.itemButtons[i]
+                item.setPos(-self.minX, 0, -self.maxZ - row * self.maxHeight)
+                item.show()
+            self.filteredIndices = rows
+            numSlots = len(newRows)
+        self.popupMenu['frameSize'] = (
+            0, self.maxWidth, -self.maxHeight * numSlots, 0)
+
+    def __filterChanged(self, event = None):
+        self.setFilter(self.filterEntry.get())
+
+    def __acceptFilter(self, text):
+        """Select the first item shown if enter was pressed in the filter"""
+        if self.highlightedIndex is None and self.__numRows() > 0:
+            self.set(self.__rowIndex(0))
+            self.hidePopupMenu()
+        else:
+            self.selectHighlightedIndex()
+
+    def __typeAhead(self, key):
+        """Highlight the first item starting with the recently typed text"""
+        if not key.isprintable():
+            return
+        now = ShowBaseGlobal.globalClock.getFrameTime()
+        if now - self.typeAheadTime > self['typeAheadTimeout']:
+            self.typeAheadText = ''
+        self.typeAheadTime = now
+        self.typeAheadText += key
+        indices = self.findItems(self.typeAheadText, True)
+        if indices:
+            self.highlightIndex(indices[0])
+
+    def highlightIndex(self, index):
+        """Highlight the item at the given index and make sure it is visible
+        in the popup menu"""
+        row = self.__itemRow(index)
+        if row is None:
+            # filtered out of the popup menu
+            return
+        if self.highlightedButton is not None:
+            self._unhighlightItem(self.highlightedButton, self.highlightedButtonColor)
+        if self['virtualized']:
+            numSlots = min(self['numVisibleItems'], self.__numRows())
+            if not self.firstVisibleIndex <= row < self.firstVisibleIndex + numSlots:
+                self.__showVirtualItems(row - numSlots // 2)
+            slot = row - self.firstVisibleIndex
+            self._highlightItem(self.itemButtons[slot], index, slot)
+        else:
+            # line up the item with the button
+            self.popupMenu.setZ(self, self.minZ + (row + 1) * self.maxHeight)
+            self._highlightItem(self.itemButtons[index], index)
+
     def showPopupMenu(self, event = None):
         """
         Make popup visible and try to position it just to right of
@@ -225,6 +561,13 @@ class DirectOptionMenu(DirectButton):
         if not items:
             return
 
+        if self['virtualized']:
+            # Make sure the selected item is visible
+            numSlots = min(self['numVisibleItems'], len(items))
+            if not self.firstVisibleIndex <= self.selectedIndex < self.firstVisibleIndex + numSlots:
+                self.__showVirtualItems(self.selectedIndex - numSlots // 2)
+        selectedRow = self.selectedIndex - self.firstVisibleIndex
+
         # Show the menu
         self.popupMenu.show()
         # Make sure its at the right scale
@@ -256,7 +599,7 @@ class DirectOptionMenu(DirectButton):
         else:
             # Try to set height to line up selected item with button
             self.popupMenu.setZ(
-                self, self.minZ + (self.selectedIndex + 1)*self.maxHeight)
+                self, self.minZ + (selectedRow + 1)*self.maxHeight)
         # Make sure the whole popup menu is visible
         pos = self.popupMenu.getPos(render2d)
         scale = self.popupMenu.getScale(render2d)
@@ -284,7 +627,7 @@ class DirectOptionMenu(DirectButton):
                 # Menu too large to show on screen entirely
                 # Try to set height to line up selected item with button
                 self.popupMenu.setZ(
-                    self, self.minZ + (self.selectedIndex + 1)*self.maxHeight)
+                    self, self.minZ + (selectedRow + 1)*self.maxHeight)
         elif maxZ > 1.0:
             # Menu too high, move it down
             self.popupMenu.setZ(render2d, pos[2] + (1.0 - maxZ))
@@ -295,23 +638,51 @@ class DirectOptionMenu(DirectButton):
                 # Menu too large to show on screen entirely
                 # Try to set height to line up selected item with button
                 self.popupMenu.setZ(
-                    self, self.minZ + (self.selectedIndex + 1)*self.maxHeight)
+                    self, self.minZ + (selectedRow + 1)*self.maxHeight)
         # Also display cancel frame to catch clicks outside of the popup
         self.cancelFrame.show()
         # Position and scale cancel frame to fill entire window
         self.cancelFrame.setPos(render2d, 0, 0, 0)
         self.cancelFrame.setScale(render2d, 1, 1, 1)
 
+        # Keyboard handling while the popup menu is shown
+        if self.filterEntry is not None:
+            self.filterEntry['focus'] = 1
+        elif self['typeAhead']:
+            if self.keystrokeEvent is None:
+                self.keystrokeEvent, self.keystrokeThrower = DGH.acquireKeystrokeEvent()
+            self.typeAheadText = ''
+            self.accept(self.keystrokeEvent, self.__typeAhead)
+            self.accept('enter', self.selectHighlightedIndex)
+        self.accept('escape', self.hidePopupMenu)
+
     def hidePopupMenu(self, event = None):
         """ Put away popup and cancel frame """
         self.popupMenu.hide()
         self.cancelFrame.hide()
+        self.ignore('escape')
+        self.ignore('enter')
+        if self.keystrokeEvent is not None:
+            self.ignore(self.keystrokeEvent)
+            self.keystrokeEvent = None
+            DGH.releaseKeystrokeEvent(self.keystrokeThrower)
+            self.keystrokeThrower = None
+        if self.filterEntry is not None:
+            self.filterEntry['focus'] = 0
+            self.filterEntry.enterText('')
+        # a filter set by setFilter would otherwise still be applied the next
+        # time the popup opens, with the selected row placed unfiltered
+        self.setFilter('')
 
     def scrollPopUpMenu(self, direction, event = None):
         """ Scroll the item frame up and down depending on the direction
         which must be a nummeric value. A positive value will scroll up
         while a negative value will scroll down. It will only work if
         items are out of bounds of the window """
+        if self['virtualized']:
+            # move the visible slice of items instead of the popup menu
+            self.__showVirtualItems(self.firstVisibleIndex + direction)
+            return
         fb = self.popupMenu.getBounds()
         pos = self.popupMenu.getPos(render2d)
         scale = self.popupMenu.getScale(render2d)
@@ -322,13 +693,17 @@ class DirectOptionMenu(DirectButton):
             oldZ = self.popupMenu.getZ()
             self.popupMenu.setZ(oldZ + direction * self.maxHeight)
 
-    def _highlightItem(self, item, index):
+    def _highlightItem(self, item, index, slot = None):
         """ Set frame color of highlighted item, record index """
+        if item is not self.highlightedButton:
+            self.highlightedButton = item
+            self.highlightedButtonColor = item['frameColor']
         self.prevItemTextScale = item['text_scale']
         item['frameColor'] = self['highlightColor']
         #item['frameSize'] = (self['highlightScale'][0]*self.minX, self['highlightScale'][0]*self.maxX, self['highlightScale'][1]*self.minZ, self['highlightScale'][1]*self.maxZ)
         item['text_scale'] = self['highlightScale']
         self.highlightedIndex = index
+        self.highlightedSlot = slot
 
     def _unhighlightItem(self, item, frameColor):
         """ Clear frame color, clear highlightedIndex """
@@ -336,6 +711,8 @@ class DirectOptionMenu(DirectButton):
         item['frameSize'] = (self.minX, self.maxX, self.minZ, self.maxZ)
         item['text_scale'] = self.prevItemTextScale
         self.highlightedIndex = None
+        self.highlightedSlot = None
+        self.highlightedButton = None
 
     def selectHighlightedIndex(self, event = None):
         """
@@ -365,6 +742,7 @@ class DirectOptionMenu(DirectButton):
         if newIndex is not None:
             self.selectedIndex = newIndex
             item = self['items'][self.selectedIndex]
+            self.selectedItem = item
             self['text'] = item
             if fCommand and self['command']:
                 # Pass any extra args to command
@@ -380,3 +758,8 @@ class DirectOptionMenu(DirectButton):
         Command is executed in response to selecting menu items
         """
         pass
+
+    def destroy(self):
+        DGH.releaseKeystrokeEvent(self.keystrokeThrower)
+        self.keystrokeThrower = None
+        DirectButton.destroy(self)
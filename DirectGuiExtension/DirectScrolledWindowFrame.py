@@ -5,7 +5,7 @@ It will create a scrolled frame with an extra frame on top of it
 
 __all__ = ['DirectScrolledWindowFrame']
 
-from panda3d.core import *
+from panda3d.core import Point3, Vec3
 from direct.gui import DirectGuiGlobals as DGG
 from direct.gui.DirectFrame import DirectFrame
 from direct.gui.DirectButton import DirectButton
@@ -68,18 +68,17 @@ Options available for this Widget are:
 
 __all__ = ['DirectSpinBox']
 
-import os
-
-from panda3d.core import *
+from panda3d.core import MouseButton, PGButton, TextNode
 from direct.gui import DirectGuiGlobals as DGG
 from direct.directnotify import DirectNotifyGlobal
 from direct.task.Task import Task
-from direct.gui.DirectFrame import *
-from direct.gui.DirectEntry import *
-from direct.gui.DirectButton import *
+from direct.gui.DirectFrame import DirectFrame
+from direct.gui.DirectEntry import DirectEntry
+from direct.gui.DirectButton import DirectButton
 
 from direct.showbase.MessengerGlobal import messenger
 from direct.task.TaskManagerGlobal import taskMgr
+from . import DirectGuiAssets
 
 DGG.MWUP = PGButton.getPressPrefix() + MouseButton.wheel_up().getName() + '-'
 DGG.MWDOWN = PGButton.getPressPrefix() + MouseButton.wheel_down().getName() + '-'
@@ -138,8 +137,8 @@ class DirectSpinBox(DirectFrame):
             self.setValue(0)
 
         # This font contains the up and down arrow
-        root = Filename.fromOsSpecific(os.path.dirname(__file__))
-        shuttle_controls_font = loader.loadFont(f'{root}/data/shuttle_controls')
+        shuttle_controls_font = DirectGuiAssets.getFont(
+            DirectGuiAssets.getDataPath('shuttle_controls'))
 
         # create the up arrow button
         self.incButton = self.createcomponent(
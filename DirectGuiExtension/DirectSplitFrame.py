@@ -10,7 +10,7 @@
 
 __all__ = ['DirectSplitFrame']
 
-from panda3d.core import *
+from panda3d.core import PGItem, Point3, TextNode, Vec3
 from direct.gui import DirectGuiGlobals as DGG
 from direct.gui.DirectFrame import DirectFrame
 from . import DirectGuiHelper as DGH
@@ -35,6 +35,14 @@ class DirectSplitFrame(DirectFrame):
     Two frames that can be resized with a small line between them
     """
 
+    # How size changes get propagated to the frames while dragging
+    # resize the frames every frame
+    DM_Live = 'live'
+    # resize the frames at most dragUpdateRate times per second
+    DM_Throttled = 'throttled'
+    # resize the frames once the splitter got released
+    DM_Release = 'release'
+
     def __init__(self, parent = None, **kw):
         self.skipInitRefresh = True
         optiondefs = (
@@ -60,11 +68,26 @@ class DirectSplitFrame(DirectFrame):
             ('firstFrameMinSize', None,     None),
             ('secondFrameMinSize', None,    None),
 
+            # One of the DM_ modes defined above
+            ('dragUpdateMode', DirectSplitFrame.DM_Live, None),
+            # Updates per second if the drag update mode is DM_Throttled
+            ('dragUpdateRate', 10,          None),
+            # Show a ghost splitter at the dragged position while the frames
+            # are not resized live
+            ('ghostSplitter',  True,        None),
+            ('ghostSplitterColor', (.9, .9, .9, .5), None),
+
             ('suppressMouse',  0,           None)
             )
 
         self._splitterWidth = 0
 
+        # available sizes to the measured (frame, layout of the frames)
+        self.measureCache = {}
+        # the result of the last measure call which arrange will use
+        self.measured = None
+        self.needsArrange = False
+
         # Merge keyword options with default options
         self.defineoptions(kw, optiondefs)
 
@@ -75,6 +98,9 @@ class DirectSplitFrame(DirectFrame):
 
         self.dragDropTask = None
         self.ignoreMinSizeCheck = False
+        # the position the splitter got dragged to but not yet applied
+        self.dragPos = None
+        self.lastDragUpdateTime = 0
 
         self.firstFrame = self.createcomponent(
             'firstFrame', (), None,
@@ -99,6 +125,13 @@ class DirectSplitFrame(DirectFrame):
             text_align = TextNode.ACenter,
             state = 'normal')
 
+        self.ghostSplitter = self.createcomponent(
+            'ghostSplitter', (), None,
+            DirectFrame, (self,),
+            frameSize = (-0.01, 0.01, -1, 1),
+            frameColor = self['ghostSplitterColor'])
+        self.ghostSplitter.hide()
+
         # Call option initialization functions
         self.initialiseoptions(DirectSplitFrame)
 
@@ -133,55 +166,114 @@ class DirectSplitFrame(DirectFrame):
         if self.skipInitRefresh: return
         if not hasattr(self, "bounds"): return
 
+        self.invalidateMeasure()
+        self.measure()
+        self.arrange()
+
+    #
+    # MEASURE AND ARRANGE
+    #
+    def measure(self, availableSize=None):
+        """
+        Calculate the sizes and positions of both frames and the splitter and
+        return the real frame (left, right, bottom, top) of the split frame.
+        The result is cached until invalidateMeasure is called.
+        """
+        if availableSize is not None:
+            availableSize = tuple(availableSize)
+        cached = self.measureCache.get(availableSize)
+        if cached is not None:
+            self.measured = cached
+            return cached[0]
+
         width = DGH.getRealWidth(self)
         height = DGH.getRealHeight(self)
+        splitterPos = self.clampSplitterPos(self["splitterPos"])
 
         if self["orientation"] == DGG.HORIZONTAL:
-            self.splitter.setX(self["splitterPos"])
-            self.splitter.setZ(0)
-            self.checkMinSIze()
-
             if self["pixel2d"]:
-                splitterPosInPercent = 1 - self["splitterPos"]/width
+                splitterPosInPercent = 1 - splitterPos/width
                 leftWidth = width * (1-splitterPosInPercent) - (self["splitterWidth"] / 2)
                 rightWidth = width * splitterPosInPercent - (self["splitterWidth"] / 2)
             else:
-                leftWidth = (width / 2) + self["splitterPos"] - (self["splitterWidth"] / 2)
-                rightWidth = (width / 2) - self["splitterPos"] - (self["splitterWidth"] / 2)
-
-            self.firstFrame["frameSize"] = (-leftWidth/2, leftWidth/2, self["frameSize"][2], self["frameSize"][3])
-            self.firstFrame.setX((-leftWidth / 2) - (self["splitterWidth"] / 2) + self["splitterPos"])
-            self.firstFrame.setZ(0)
-            self.secondFrame["frameSize"] = (-rightWidth/2, rightWidth/2, self["frameSize"][2], self["frameSize"][3])
-            self.secondFrame.setX((rightWidth / 2) + (self["splitterWidth"] / 2) + self["splitterPos"])
-            self.secondFrame.setZ(0)
-
-            self.splitter["frameSize"] = (-self["splitterWidth"]/2, self["splitterWidth"]/2, self["frameSize"][2], self["frameSize"][3])
-            self.splitter["text_roll"] = 0
+                leftWidth = (width / 2) + splitterPos - (self["splitterWidth"] / 2)
+                rightWidth = (width / 2) - splitterPos - (self["splitterWidth"] / 2)
+
+            layout = (
+                # frame size and position of the first and second frame
+                (-leftWidth/2, leftWidth/2, self["frameSize"][2], self["frameSize"][3]),
+                ((-leftWidth / 2) - (self["splitterWidth"] / 2) + splitterPos, 0, 0),
+                (-rightWidth/2, rightWidth/2, self["frameSize"][2], self["frameSize"][3]),
+                ((rightWidth / 2) + (self["splitterWidth"] / 2) + splitterPos, 0, 0),
+                # frame size, position and text roll of the splitter
+                (-self["splitterWidth"]/2, self["splitterWidth"]/2, self["frameSize"][2], self["frameSize"][3]),
+                (splitterPos, 0, 0),
+                0)
 
         elif self["orientation"] == DGG.VERTICAL:
-            self.splitter.setZ(self["splitterPos"])
-            self.splitter.setX(0)
-            self.checkMinSIze()
-
             if self["pixel2d"]:
-                splitterPosInPercent = 1 - self["splitterPos"]/height
+                splitterPosInPercent = 1 - splitterPos/height
                 topHeight = height * splitterPosInPercent - (self["splitterWidth"] / 2)
                 bottomHeight = height * (1-splitterPosInPercent) - (self["splitterWidth"] / 2)
             else:
-                topHeight = (height / 2) - self["splitterPos"] - (self["splitterWidth"] / 2)
-                bottomHeight = (height / 2) + self["splitterPos"] - (self["splitterWidth"] / 2)
-
-            self.firstFrame["frameSize"] = (self["frameSize"][0], self["frameSize"][1], -topHeight/2, topHeight/2)
-            self.firstFrame.setX(0)
-            self.firstFrame.setZ((topHeight / 2) + (self["splitterWidth"] / 2) + self["splitterPos"])
-            self.secondFrame["frameSize"] = (self["frameSize"][0], self["frameSize"][1], -bottomHeight/2, bottomHeight/2)
-            self.secondFrame.setX(0)
-            self.secondFrame.setZ((-bottomHeight / 2) - (self["splitterWidth"] / 2) + self["splitterPos"])
+                topHeight = (height / 2) - splitterPos - (self["splitterWidth"] / 2)
+                bottomHeight = (height / 2) + splitterPos - (self["splitterWidth"] / 2)
+
+            layout = (
+                (self["frameSize"][0], self["frameSize"][1], -topHeight/2, topHeight/2),
+                (0, 0, (topHeight / 2) + (self["splitterWidth"] / 2) + splitterPos),
+                (self["frameSize"][0], self["frameSize"][1], -bottomHeight/2, bottomHeight/2),
+                (0, 0, (-bottomHeight / 2) - (self["splitterWidth"] / 2) + splitterPos),
+                (self["frameSize"][0], self["frameSize"][1], -self["splitterWidth"]/2, self["splitterWidth"]/2),
+                (0, 0, splitterPos),
+                90)
+        else:
+            layout = None
 
-            self.splitter["frameSize"] = (self["frameSize"][0], self["frameSize"][1], -self["splitterWidth"]/2, self["splitterWidth"]/2)
-            self.splitter["text_roll"] = 90
+        desired = (
+            DGH.getRealLeft(self), DGH.getRealRight(self),
+            DGH.getRealBottom(self), DGH.getRealTop(self))
+        self.measured = (desired, layout)
+        self.measureCache[availableSize] = self.measured
+        self.needsArrange = True
+        return desired
 
+    def arrange(self, frameSize=None):
+        """
+        Resize and place both frames and the splitter as measured. If a frame
+        size is given, the split frame takes that size first.
+        """
+        if frameSize is not None and frameSize != self["frameSize"]:
+            self["frameSize"] = frameSize
+            # the frames depend on our size, so they have to be measured again
+            self.measureCache = {}
+            self.measured = None
+        if self.measured is None:
+            self.measure()
+        if not self.needsArrange:
+            return
+
+        # store a position that had to be moved to respect the minimum sizes
+        splitterPos = self["splitterPos"]
+        self.checkMinSIze()
+        if self["splitterPos"] != splitterPos:
+            # the corrected position has been arranged already
+            return
+
+        layout = self.measured[1]
+        self.needsArrange = False
+        if layout is None:
+            return
+        (firstFrameSize, firstPos, secondFrameSize, secondPos,
+            splitterFrameSize, splitterPos, textRoll) = layout
+
+        self.firstFrame["frameSize"] = firstFrameSize
+        self.firstFrame.setPos(firstPos)
+        self.secondFrame["frameSize"] = secondFrameSize
+        self.secondFrame.setPos(secondPos)
+        self.splitter.setPos(splitterPos)
+        self.splitter["frameSize"] = splitterFrameSize
+        self.splitter["text_roll"] = textRoll
 
         base.messenger.send(self.uniqueName("update-size"))
         if self['firstFrameUpdateSizeFunc'] is not None:
@@ -189,28 +281,52 @@ class DirectSplitFrame(DirectFrame):
         if self['secondFrameUpdateSizeFunc'] is not None:
             self['secondFrameUpdateSizeFunc']()
 
-    def checkMinSIze(self):
-        if self.ignoreMinSizeCheck: return
-        # ignore further minimum size checks until we are done
-        self.ignoreMinSizeCheck = True
+    def invalidateMeasure(self):
+        """
+        Drop the cached measurements of this frame and the layout widgets
+        enclosing it, so they will measure again on their next refresh.
+        """
+        if not self.measureCache and self.measured is None: return
+        self.measureCache = {}
+        self.measured = None
+        DGH.invalidateParentMeasure(self)
 
+    def clampSplitterPos(self, pos):
+        """
+        Returns the given splitter position moved into the range that
+        respects the minimum sizes of both frames
+        """
         if self["orientation"] == DGG.HORIZONTAL:
             minLeft = self['firstFrameMinSize'] if self['firstFrameMinSize'] is not None else 0
             minRight = self['secondFrameMinSize'] if self['secondFrameMinSize'] is not None else 0
-            if self.splitter.getX() - self["splitterWidth"] / 2 < self["frameSize"][0] + minLeft:
-                self.splitter.setX(self["frameSize"][0] + self["splitterWidth"] / 2 + minLeft)
-            elif self.splitter.getX() + self["splitterWidth"] / 2 > self["frameSize"][1] - minRight:
-                self.splitter.setX(self["frameSize"][1] - self["splitterWidth"] / 2 - minRight)
-            self["splitterPos"] = self.splitter.getX()
+            if pos - self["splitterWidth"] / 2 < self["frameSize"][0] + minLeft:
+                pos = self["frameSize"][0] + self["splitterWidth"] / 2 + minLeft
+            elif pos + self["splitterWidth"] / 2 > self["frameSize"][1] - minRight:
+                pos = self["frameSize"][1] - self["splitterWidth"] / 2 - minRight
 
         elif self["orientation"] == DGG.VERTICAL:
             minTop = self['firstFrameMinSize'] if self['firstFrameMinSize'] is not None else 0
             minBottom = self['secondFrameMinSize'] if self['secondFrameMinSize'] is not None else 0
-            if self.splitter.getZ() - self["splitterWidth"] / 2 < self["frameSize"][2] + minTop:
-                self.splitter.setZ(self["frameSize"][2] + self["splitterWidth"] / 2 + minTop)
-            elif self.splitter.getZ() + self["splitterWidth"] / 2 > self["frameSize"][3] - minBottom:
-                self.splitter.setZ(self["frameSize"][3] - self["splitterWidth"] / 2 - minBottom)
-            self["splitterPos"] = self.splitter.getZ()
+            if pos - self["splitterWidth"] / 2 < self["frameSize"][2] + minTop:
+                pos = self["frameSize"][2] + self["splitterWidth"] / 2 + minTop
+            elif pos + self["splitterWidth"] / 2 > self["frameSize"][3] - minBottom:
+                pos = self["frameSize"][3] - self["splitterWidth"] / 2 - minBottom
+        return pos
+
+    def checkMinSIze(self):
+        if self.ignoreMinSizeCheck: return
+        # ignore further minimum size checks until we are done
+        self.ignoreMinSizeCheck = True
+
+        pos = self.clampSplitterPos(self["splitterPos"])
+        # setting the option triggers another refresh, only do so if the
+        # position actually had to be corrected
+        if pos != self["splitterPos"]:
+            if self["orientation"] == DGG.HORIZONTAL:
+                self.splitter.setX(pos)
+            elif self["orientation"] == DGG.VERTICAL:
+                self.splitter.setZ(pos)
+            self["splitterPos"] = pos
 
         self.ignoreMinSizeCheck = False
 
@@ -236,6 +352,16 @@ class DirectSplitFrame(DirectFrame):
         vMouse2render2d = Point3(event.getMouse()[0], 0, event.getMouse()[1])
         # calculate the vector between the mosue and the window
         editVec = Vec3(vWidget2render2d - vMouse2render2d)
+
+        self.dragPos = None
+        self.lastDragUpdateTime = globalClock.getFrameTime()
+        if self['dragUpdateMode'] != DirectSplitFrame.DM_Live \
+        and self['ghostSplitter']:
+            # preview the new position with the ghost splitter
+            self.ghostSplitter["frameSize"] = self.splitter["frameSize"]
+            self.ghostSplitter.setPos(self.splitter.getPos())
+            self.ghostSplitter.show()
+
         # create the task and store the values in it, so we can use it in there
         self.dragDropTask = taskMgr.add(self.dragTask, self.taskName("dragDropTask"))
         self.dragDropTask.editVec = editVec
@@ -252,28 +378,58 @@ class DirectSplitFrame(DirectFrame):
             vMouse2render2d = Point3(mwn.getMouse()[0], 0, mwn.getMouse()[1])
             # calculate the new position using the mouse position and the start
             # vector of the window
-            newPos = vMouse2render2d + t.editVec
-            # Now set the new windows new position
+            newPos = self.getRelativePoint(render2d, vMouse2render2d + t.editVec)
+            # Now calculate the new splitter position
             if self["orientation"] == DGG.HORIZONTAL:
-                newPos.setY(0)
-                newPos.setZ(self.splitter.getZ(render2d))
-                self.splitter.setPos(render2d, newPos)
-                self.checkMinSIze()
-
+                pos = self.clampSplitterPos(newPos.getX())
             elif self["orientation"] == DGG.VERTICAL:
-                newPos.setX(self.splitter.getX(render2d))
-                newPos.setY(0)
-                self.splitter.setPos(render2d, newPos)
-                self.checkMinSIze()
-            self.refresh()
+                pos = self.clampSplitterPos(newPos.getZ())
+            else:
+                return t.cont
+
+            if pos != self.dragPos:
+                self.dragPos = pos
+                if self['dragUpdateMode'] == DirectSplitFrame.DM_Live:
+                    self.__applyDragPos()
+                else:
+                    self.__previewDragPos()
+
+            if self['dragUpdateMode'] == DirectSplitFrame.DM_Throttled \
+            and self.dragPos != self["splitterPos"]:
+                now = globalClock.getFrameTime()
+                if now - self.lastDragUpdateTime >= 1.0 / self['dragUpdateRate']:
+                    self.lastDragUpdateTime = now
+                    self.__applyDragPos()
             self.splitter["frameColor"] = self['splitterHighlightColor']
         return t.cont
 
+    def __previewDragPos(self):
+        """Show the dragged position without resizing the frames"""
+        if self['ghostSplitter']:
+            preview = self.ghostSplitter
+        else:
+            preview = self.splitter
+        if self["orientation"] == DGG.HORIZONTAL:
+            preview.setX(self.dragPos)
+        else:
+            preview.setZ(self.dragPos)
+
+    def __applyDragPos(self):
+        """Resize the frames to the dragged position"""
+        # this will refresh the frames and inform the children
+        self["splitterPos"] = self.dragPos
+
     def dragStop(self, event):
         """
         Stop dragging the splitter around
         """
         # kill the drag and drop task
         taskMgr.remove(self.dragDropTask)
+        self.ghostSplitter.hide()
         self.splitter["frameColor"] = self['splitterColor']
-        self.refresh()
+        if self.dragPos is None:
+            self.refresh()
+        elif self.dragPos != self["splitterPos"]:
+            # apply the last position that wasn't propagated yet
+            self.__applyDragPos()
+        self.dragPos = None
@@ -7,7 +7,7 @@ multiple parented frames
 __all__ = ['DirectTabbedFrame']
 
 from uuid import uuid4
-from panda3d.core import *
+from panda3d.core import TextNode
 from direct.directnotify import DirectNotifyGlobal
 from direct.gui import DirectGuiGlobals as DGG
 from direct.gui.DirectFrame import DirectFrame
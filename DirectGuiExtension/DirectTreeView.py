@@ -2,17 +2,17 @@
 
 __all__ = ['DirectTreeView']
 
-import os
 import uuid
 import logging
 
-from panda3d.core import *
+from panda3d.core import NodePath, SamplerState, TextNode, TransparencyAttrib
 
-from direct.gui.DirectCheckBox import *
-from direct.gui.DirectLabel import *
-from direct.gui.DirectFrame import *
+from direct.gui.DirectLabel import DirectLabel
+from direct.gui.DirectFrame import DirectFrame
 from .DirectBoxSizer import DirectBoxSizer
 from . import DirectGuiHelper as DGH
+from . import DirectGuiAssets
+from .DirectWidgetPool import DirectWidgetPool
 from direct.gui import DirectGuiGlobals as DGG
 #from dataclasses import dataclass
 
@@ -30,17 +30,35 @@ class DirectTreeView(DirectBoxSizer):
 
     The Trees visualization can be defined by overwriting the createEntry method
     which must return one widget that will be added as a tree node.
+
+    The widgets of the default entries are taken from a DirectWidgetPool and
+    given back to it on every refresh. A pool can be shared between trees by
+    passing it as the widgetPool option.
+
+    With batchText enabled, the default entries don't get a label. Instead
+    the texts of batchPageSize rows each are generated into one node, which
+    will only be generated again if the texts or positions of its rows
+    changed. The frames of the rows stay in place to react to the mouse.
     """
     def __init__(self, parent = None, **kw):
-        root = Filename.fromOsSpecific(os.path.dirname(__file__))
+        # the text node used to generate the batched texts, the unscaled
+        # tight bounds of the texts measured so far and the list of
+        # (rows, node) of the generated pages
+        self.batchTextNode = None
+        self.batchTextBounds = {}
+        self.textPages = []
+
         optiondefs = (
-            ('imageCollapse', f"{root}/data/icons/minusnode.gif", DGG.INITOPT),
-            ('imageCollapsed', f"{root}/data/icons/plusnode.gif", DGG.INITOPT),
+            ('imageCollapse', str(DirectGuiAssets.getDataPath('icons/minusnode.gif')), DGG.INITOPT),
+            ('imageCollapsed', str(DirectGuiAssets.getDataPath('icons/plusnode.gif')), DGG.INITOPT),
             ('collapseImageScale', 0.025, self.refreshTree),
             ('collapseFrameSize', (-0.05, 0.05, -0.05, 0.05), self.refreshTree),
             ('treeTextScale', 0.1, self.refreshTree),
             ('tree',    {},   self.refreshTree),
-            ('indentationWidth', 0.1, None)
+            ('indentationWidth', 0.1, None),
+            ('widgetPool', None, DGG.INITOPT),
+            ('batchText', False, self.refreshTree),
+            ('batchPageSize', 100, self.refreshTree)
             )
         # Merge keyword options with default options
         self.defineoptions(kw, optiondefs)
@@ -51,17 +69,37 @@ class DirectTreeView(DirectBoxSizer):
         self.collapsedElements = []
         self.indent_level = 0
 
+        self.ownsWidgetPool = self['widgetPool'] is None
+        if self.ownsWidgetPool:
+            self.widgetPool = DirectWidgetPool()
+        else:
+            self.widgetPool = self['widgetPool']
+
         # Call option initialization functions
         self.initialiseoptions(DirectTreeView)
 
         self.refreshTree()
 
+    def destroy(self):
+        for item in self["items"]:
+            self.releaseEntry(item.element)
+        self.removeAllItems(False)
+        if self.ownsWidgetPool:
+            self.widgetPool.destroy()
+        DirectBoxSizer.destroy(self)
+
     def refreshTree(self):
         for item in self["items"]:
-            item.element.destroy()
+            self.releaseEntry(item.element)
         self.removeAllItems(False)
         self.__createTree(self["tree"])
         self.refresh()
+        # an empty tree won't be arranged, so make sure old texts are gone
+        self.__updateTextPages()
+
+    def arrange(self, frameSize=None):
+        DirectBoxSizer.arrange(self, frameSize)
+        self.__updateTextPages()
 
     def __createTree(self, branch, indent_level=0):
         for element, sub_branch in branch.items():
@@ -78,31 +116,117 @@ class DirectTreeView(DirectBoxSizer):
                 self.addItem(entry, skipRefresh=True)
 
     def createEntry(self, element, hasChildren, indent_level, sub_branch):
-        frame = DirectFrame(
+        frame = self.widgetPool.acquire(
+            DirectFrame,
             frameColor=(0,0,0,0)
         )
+        frame.entryWidgets = []
+        frame.batchText = None
 
         indentation = self["indentationWidth"] * indent_level
 
         img_scale = self["collapseImageScale"]
 
         if hasChildren:
-            self.createCollapseCheckBox(frame, indentation, element, img_scale)
+            frame.entryWidgets.append(
+                self.createCollapseCheckBox(frame, indentation, element, img_scale))
 
         element_name = self.getElementName(element)
 
-        lbl = DirectLabel(
+        if self["batchText"]:
+            # only measure the text, it will be drawn by the text pages
+            textX = img_scale*2+0.02+indentation
+            textScale = self["treeTextScale"]
+            frame.batchText = (element_name, textX)
+            # size the row by the tight bounds of the text like a label
+            # would, the line metrics of the text node are much higher
+            bounds = self.batchTextBounds.get(element_name)
+            if bounds is None:
+                textNode = self.__getBatchTextNode()
+                textNode.setText(element_name)
+                bounds = NodePath(textNode.generate()).getTightBounds()
+                if bounds is None:
+                    bounds = ((0, 0, 0), (0, 0, 0))
+                self.batchTextBounds[element_name] = bounds
+            frame["frameSize"] = (
+                0, textX + (bounds[1][0] - bounds[0][0]) * textScale,
+                bounds[0][2] * textScale, bounds[1][2] * textScale)
+            return frame
+
+        lbl = self.widgetPool.acquire(
+            DirectLabel,
+            frame,
             text=element_name,
             scale=self["treeTextScale"],
             text_align=TextNode.ALeft,
-            pos=(img_scale*2+0.02+indentation,0,0),
-            parent=frame
+            pos=(img_scale*2+0.02+indentation,0,0)
         )
+        frame.entryWidgets.append(lbl)
 
         frame["frameSize"] = (0, img_scale*2+0.02+indentation+DGH.getRealWidth(lbl), DGH.getRealBottom(lbl), DGH.getRealTop(lbl))
 
         return frame
 
+    def __getBatchTextNode(self):
+        if self.batchTextNode is None:
+            self.batchTextNode = TextNode('batchText')
+            self.batchTextNode.setFont(DGG.getDefaultFont())
+            self.batchTextNode.setAlign(TextNode.ALeft)
+            self.batchTextNode.setTextColor(0, 0, 0, 1)
+        return self.batchTextNode
+
+    def __updateTextPages(self):
+        """
+        Generate the batched texts of all pages whose rows changed since
+        they have been generated the last time.
+        """
+        rows = []
+        if self["batchText"]:
+            for item in self["items"]:
+                batchText = getattr(item.element, "batchText", None)
+                if batchText is None:
+                    continue
+                text, textX = batchText
+                pos = item.element.getPos()
+                rows.append((text, pos[0] + textX, pos[2]))
+        pageSize = max(1, self["batchPageSize"])
+        pages = [
+            tuple(rows[i:i+pageSize]) for i in range(0, len(rows), pageSize)]
+        for index, page in enumerate(pages):
+            if index < len(self.textPages):
+                if self.textPages[index][0] == page:
+                    continue
+                self.textPages[index][1].removeNode()
+                self.textPages[index] = (page, self.__generateTextPage(page))
+            else:
+                self.textPages.append((page, self.__generateTextPage(page)))
+        for page, node in self.textPages[len(pages):]:
+            node.removeNode()
+        del self.textPages[len(pages):]
+
+    def __generateTextPage(self, rows):
+        """Returns a node holding the flattened texts of the given rows"""
+        textNode = self.__getBatchTextNode()
+        textScale = self["treeTextScale"]
+        page = self.attachNewNode('textPage')
+        for text, x, z in rows:
+            textNode.setText(text)
+            np = page.attachNewNode(textNode.generate())
+            np.setPos(x, 0, z)
+            np.setScale(textScale)
+        page.flattenStrong()
+        return page
+
+    def releaseEntry(self, entry):
+        """
+        Give the widgets of an entry back to the widget pool. Entries that
+        weren't taken from the pool will be destroyed.
+        """
+        for widget in getattr(entry, 'entryWidgets', []):
+            self.widgetPool.release(widget)
+        if not self.widgetPool.release(entry):
+            entry.destroy()
+
     def getElementName(self, element):
         if hasattr(element, "name"):
             return element.name
@@ -113,17 +237,22 @@ class DirectTreeView(DirectBoxSizer):
         return ""
 
     def createCollapseCheckBox(self, parent, x_pos, element, img_scale=0.025):
+        # DirectCheckBox loads all of direct.gui.DirectGui, so only import it
+        # once a tree actually has collapsible entries
+        from direct.gui.DirectCheckBox import DirectCheckBox
         imgFilter = SamplerState.FT_nearest
 
-        imgCollapse = loader.loadTexture(self["imageCollapse"])
+        imgCollapse = DirectGuiAssets.getTexture(self["imageCollapse"])
         imgCollapse.setMagfilter(imgFilter)
         imgCollapse.setMinfilter(imgFilter)
 
-        imgCollapsed = loader.loadTexture(self["imageCollapsed"])
+        imgCollapsed = DirectGuiAssets.getTexture(self["imageCollapsed"])
         imgCollapsed.setMagfilter(imgFilter)
         imgCollapsed.setMinfilter(imgFilter)
 
-        btnC = DirectCheckBox(
+        btnC = self.widgetPool.acquire(
+            DirectCheckBox,
+            parent,
             relief=DGG.FLAT,
             pos=(img_scale+x_pos,0,0.03),
             frameSize=self["collapseFrameSize"],
@@ -134,9 +263,9 @@ class DirectTreeView(DirectBoxSizer):
             uncheckedImage=imgCollapse,
             checkedImage=imgCollapsed,
             image_scale=img_scale,
-            isChecked=element in self.collapsedElements,
-            parent=parent)
+            isChecked=element in self.collapsedElements)
         btnC.setTransparency(TransparencyAttrib.M_alpha)
+        return btnC
 
     def collapseElement(self, collapse, element):
         if element is not None:
@@ -0,0 +1,144 @@
+"""This module contains the DirectWidgetPool class."""
+
+__all__ = ['DirectWidgetPool']
+
+from direct.gui import DirectGuiGlobals as DGG
+from direct.showbase import ShowBaseGlobal
+
+# initialisation options which are applied to the node path and can
+# therefore be changed on reused widgets, with the setter and the value to
+# use if the option is not set
+POSE_OPTIONS = {
+    'pos': ('setPos', (0, 0, 0)),
+    'hpr': ('setHpr', (0, 0, 0)),
+    'scale': ('setScale', 1),
+    'color': ('setColor', None),
+}
+
+
+class DirectWidgetPool:
+    """
+    Hands out DirectGui widgets of any class and takes them back once they
+    are not needed anymore, so rebuilding lists and menus doesn't have to
+    construct new widgets every time.
+
+    Widgets get reused for requests of the same class, the same key and the
+    same option names. Only the options whose values differ from the reused
+    widget get configured. Initialisation options that can not be changed
+    after construction are part of the key, except for pos, hpr, scale and
+    color which will be set on the node path.
+
+    At most maxFree released widgets are kept, further released widgets get
+    destroyed.
+    """
+    def __init__(self, maxFree=256):
+        self.maxFree = maxFree
+        self.numFree = 0
+        # pool key to a list of (widget, options) tuples
+        self.freeWidgets = {}
+        # id of the widget to (widget, pool key, options)
+        self.usedWidgets = {}
+        # widget class to the names of its initialisation options
+        self.initOptions = {}
+
+    def acquire(self, widgetClass, parent=None, key=None, **kw):
+        """
+        Returns a widget of the given class with the given options, parented
+        to parent or aspect2d. The key can be used to keep widgets that are
+        set up differently by their user apart.
+        """
+        poolKey = self.__getPoolKey(widgetClass, key, kw)
+        free = self.freeWidgets.get(poolKey)
+        if free:
+            widget, lastKw = free.pop()
+            self.numFree -= 1
+            self.__reconfigure(widget, lastKw, kw)
+            widget.reparentTo(
+                parent if parent is not None else ShowBaseGlobal.aspect2d)
+            widget.show()
+        else:
+            widget = widgetClass(parent, **kw)
+            if poolKey is None:
+                self.initOptions[widgetClass] = {
+                    name for name, info in widget._optionInfo.items()
+                    if info[DGG._OPT_FUNCTION] is DGG.INITOPT}
+                poolKey = self.__getPoolKey(widgetClass, key, kw)
+        self.usedWidgets[id(widget)] = (widget, poolKey, kw)
+        return widget
+
+    def release(self, widget):
+        """
+        Hide the widget and give it back to the pool. Returns False if the
+        widget wasn't acquired from this pool.
+        """
+        info = self.usedWidgets.pop(id(widget), None)
+        if info is None:
+            return False
+        widget, poolKey, kw = info
+        if widget.isEmpty():
+            # the widget got destroyed while it was in use
+            return True
+        if self.numFree >= self.maxFree:
+            widget.destroy()
+            return True
+        widget.hide()
+        widget.reparentTo(ShowBaseGlobal.hidden)
+        self.freeWidgets.setdefault(poolKey, []).append((widget, kw))
+        self.numFree += 1
+        return True
+
+    def owns(self, widget):
+        """Returns True if the widget is currently acquired from this pool"""
+        return id(widget) in self.usedWidgets
+
+    def clear(self):
+        """Destroy all released widgets"""
+        for free in self.freeWidgets.values():
+            for widget, kw in free:
+                widget.destroy()
+        self.freeWidgets = {}
+        self.numFree = 0
+
+    def destroy(self):
+        """Destroy all widgets of the pool, including the ones in use"""
+        self.clear()
+        for widget, poolKey, kw in self.usedWidgets.values():
+            if not widget.isEmpty():
+                widget.destroy()
+        self.usedWidgets = {}
+
+    def __getPoolKey(self, widgetClass, key, kw):
+        initOptions = self.initOptions.get(widgetClass)
+        if initOptions is None:
+            # no widget of this class has been created yet
+            return None
+        names = tuple(sorted(kw))
+        initValues = tuple(
+            repr(kw[name]) for name in names
+            if name in initOptions and name not in POSE_OPTIONS)
+        return (widgetClass, key, names, initValues)
+
+    def __reconfigure(self, widget, lastKw, kw):
+        optionInfo = widget._optionInfo
+        changed = {}
+        for name, value in kw.items():
+            if name in POSE_OPTIONS:
+                setter, default = POSE_OPTIONS[name]
+                optionInfo[name][DGG._OPT_VALUE] = value
+                if value is None:
+                    if default is None:
+                        widget.clearColor()
+                        continue
+                    value = default
+                getattr(widget, setter)(value)
+            elif name in optionInfo:
+                # compare with the current value as the widget may have
+                # changed its own options, e.g. a clicked check box
+                current = optionInfo[name][DGG._OPT_VALUE]
+                if current is not value and current != value:
+                    changed[name] = value
+            elif lastKw[name] is not value and lastKw[name] != value:
+                # component options are only known by the last request
+                changed[name] = value
+        if changed:
+            widget.configure(**changed)
@@ -0,0 +1,47 @@
+"""
+A set of extensions for the DirectGUI system of the Panda3D engine.
+
+Importing the package doesn't import any of its modules, they will be
+imported on first access, e.g. DirectGuiExtension.DirectBoxSizer. All
+widget classes are available from the lazy DirectGui namespace module.
+"""
+
+import importlib
+
+# the modules of this package that get imported on first access
+_SUBMODULES = {
+    'DirectAccordion',
+    'DirectAutoSizer',
+    'DirectBoxSizer',
+    'DirectCollapsibleFrame',
+    'DirectDatePicker',
+    'DirectDiagram',
+    'DirectGridSizer',
+    'DirectGui',
+    'DirectGuiAssets',
+    'DirectGuiHelper',
+    'DirectGuiTestHarness',
+    'DirectLayoutProfiler',
+    'DirectMenuBar',
+    'DirectMenuItem',
+    'DirectMultiSplitFrame',
+    'DirectOptionMenu',
+    'DirectScrolledWindowFrame',
+    'DirectSpinBox',
+    'DirectSplitFrame',
+    'DirectTabbedFrame',
+    'DirectTooltip',
+    'DirectTreeView',
+    'DirectWidgetPool',
+}
+
+def __getattr__(name):
+    if name in _SUBMODULES:
+        # importing sets the module as attribute of this package, so this
+        # will only be called once per module
+        return importlib.import_module('.' + name, __name__)
+    raise AttributeError(
+        "module {!r} has no attribute {!r}".format(__name__, name))
+
+def __dir__():
+    return sorted(set(globals()) | _SUBMODULES)
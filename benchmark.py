@@ -0,0 +1,457 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+"""Headless layout benchmarks for the DirectGuiExtension widgets.
+
+Time the construction, refresh, add/remove and resize of the widgets at
+different numbers of items and store the results as JSON:
+
+    python benchmark.py --output before.json
+    python benchmark.py --scales 10 100 1000 10000 100000 --output after.json
+
+Measure the cold import time of the package modules instead, every import
+runs in a fresh interpreter:
+
+    python benchmark.py --imports --output imports.json
+
+Compare two result files and flag regressions:
+
+    python benchmark.py --compare before.json after.json
+"""
+
+import argparse
+import contextlib
+import json
+import math
+import os
+import platform
+import subprocess
+import sys
+import time
+
+from panda3d.core import loadPrcFileData, PandaSystem
+
+# The widgets and benchmarks themselves are imported after ShowBase has
+# been set up headless, see setupShowBase
+
+
+#
+# TIMING HELPERS
+#
+class PhaseTimer:
+    """Collects the wall time of the named phases of one benchmark run"""
+    def __init__(self):
+        self.results = {}
+
+    @contextlib.contextmanager
+    def measure(self, phase):
+        start = time.perf_counter()
+        yield
+        self.results[phase] = time.perf_counter() - start
+
+
+#
+# BENCHMARKS
+#
+# Each benchmark gets the number of items and a PhaseTimer. It has to
+# destroy all widgets it created before returning.
+def benchBoxSizer(n, timer):
+    with timer.measure("construct"):
+        sizer = DirectBoxSizer(orientation=DGG.VERTICAL)
+        for i in range(n):
+            sizer.addItem(
+                DirectFrame(frameSize=(-0.1, 0.1, -0.02, 0.02)),
+                skipRefresh=True)
+        sizer.refresh()
+    with timer.measure("refresh"):
+        sizer.refresh()
+    with timer.measure("add"):
+        sizer.addItem(DirectFrame(frameSize=(-0.1, 0.1, -0.02, 0.02)))
+    with timer.measure("remove"):
+        sizer.removeItem(sizer["items"][0].element)
+    with timer.measure("resize"):
+        sizer["items"][0].element["frameSize"] = (-0.2, 0.2, -0.04, 0.04)
+        sizer.refresh()
+    sizer.removeAllItems(refresh=False, removeNodes=True)
+    sizer.destroy()
+
+def benchGridSizer(n, timer):
+    columns = max(1, int(math.sqrt(n)))
+    rows = int(math.ceil(n / columns)) + 1
+    with timer.measure("construct"):
+        sizer = DirectGridSizer(numRows=rows, numColumns=columns)
+        for i in range(n):
+            sizer.addItem(
+                DirectFrame(frameSize=(-0.1, 0.1, -0.02, 0.02)),
+                i // columns, i % columns)
+    with timer.measure("refresh"):
+        sizer.refresh()
+    with timer.measure("add"):
+        sizer.addItem(
+            DirectFrame(frameSize=(-0.1, 0.1, -0.02, 0.02)), rows - 1, 0)
+    with timer.measure("remove"):
+        sizer.removeItem(sizer["items"][0].element)
+    with timer.measure("resize"):
+        sizer["items"][0].element["frameSize"] = (-0.2, 0.2, -0.04, 0.04)
+        sizer.refresh()
+    sizer.destroy()
+
+def benchAutoSizer(n, timer):
+    size = [-1, 1, -1, 1]
+    with timer.measure("construct"):
+        child = DirectBoxSizer(
+            orientation=DGG.VERTICAL, autoUpdateFrameSize=False)
+        for i in range(n):
+            child.addItem(
+                DirectFrame(frameSize=(-0.1, 0.1, -0.02, 0.02)),
+                skipRefresh=True)
+        sizer = DirectAutoSizer(
+            child=child,
+            childUpdateSizeFunc=child.refresh,
+            updateOnWindowResize=False,
+            parentGetSizeFunction=lambda: size)
+    with timer.measure("refresh"):
+        sizer.refresh()
+    with timer.measure("resize"):
+        size[1] = 1.5
+        sizer.refresh()
+    sizer.destroy()
+
+def benchTreeView(n, timer):
+    # a tree with ten children per branch
+    def buildTree(count, prefix):
+        if count <= 10:
+            return {"{}{}".format(prefix, i): None for i in range(count)}
+        subCount = int(math.ceil(count / 10))
+        tree = {}
+        for i in range(10):
+            if count <= 0:
+                break
+            tree["{}{}".format(prefix, i)] = buildTree(
+                min(subCount, count) - 1, "{}{}.".format(prefix, i))
+            count -= min(subCount, count)
+        return tree
+    tree = buildTree(n, "")
+    with timer.measure("construct"):
+        treeView = DirectTreeView(tree=tree)
+    with timer.measure("refresh"):
+        treeView.refreshTree()
+    with timer.measure("collapse"):
+        treeView.collapseElement(True, "0")
+    with timer.measure("extend"):
+        treeView.collapseElement(False, "0")
+    treeView.destroy()
+
+def benchDiagram(n, timer):
+    data = [math.sin(i / 10.0) for i in range(n)]
+    with timer.measure("construct"):
+        diagram = DirectDiagram(data=data, numPosSteps=4, numNegSteps=4)
+    with timer.measure("refresh"):
+        diagram.refresh()
+    with timer.measure("add"):
+        diagram.setData(data + [1.0])
+    with timer.measure("resize"):
+        diagram["frameSize"] = (-1, 1, -0.5, 0.5)
+        diagram.refresh()
+    diagram.destroy()
+
+def benchOptionMenu(n, timer):
+    items = ["item {}".format(i) for i in range(n)]
+    with timer.measure("construct"):
+        menu = DirectOptionMenu(items=items, scale=0.1)
+    with timer.measure("showPopup"):
+        menu.showPopupMenu()
+        menu.hidePopupMenu()
+    with timer.measure("add"):
+        menu.insertItem(n // 2, "new item")
+    with timer.measure("remove"):
+        menu.removeItem(n // 2)
+    menu.destroy()
+
+def benchMenuItem(n, timer):
+    items = [
+        DirectMenuItemEntry("entry {}".format(i), print, [i])
+        for i in range(n)]
+    with timer.measure("construct"):
+        menu = DirectMenuItem(text="Menu", scale=0.1, items=items)
+    with timer.measure("showPopup"):
+        menu.showPopupMenu()
+        menu.hidePopupMenu()
+    with timer.measure("add"):
+        menu.insertItem(n // 2, DirectMenuItemEntry("new entry", print, []))
+    with timer.measure("remove"):
+        menu.removeItem(n // 2)
+    menu.destroy()
+
+def benchTabbedFrame(n, timer):
+    with timer.measure("construct"):
+        tabbedFrame = DirectTabbedFrame(frameSize=(-1, 1, -1, 1))
+        tabs = [
+            tabbedFrame.add_tab("tab {}".format(i), DirectFrame(tabbedFrame))
+            for i in range(n)]
+    with timer.measure("switch"):
+        tabbedFrame.select_tab(tabs[-1])
+    with timer.measure("add"):
+        tabs.append(tabbedFrame.add_tab("new tab", DirectFrame(tabbedFrame)))
+    with timer.measure("remove"):
+        tabbedFrame.close_tab(tabs[0])
+    tabbedFrame.destroy()
+
+# name, benchmark function and the largest number of items it will be run
+# with unless --no-limits is given. Widgets which refresh on every added
+# item can't reasonably be run with huge numbers of items.
+BENCHMARKS = [
+    ("DirectBoxSizer",      benchBoxSizer,      100000),
+    ("DirectGridSizer",     benchGridSizer,     1000),
+    ("DirectAutoSizer",     benchAutoSizer,     100000),
+    ("DirectTreeView",      benchTreeView,      10000),
+    ("DirectDiagram",       benchDiagram,       100000),
+    ("DirectOptionMenu",    benchOptionMenu,    10000),
+    ("DirectMenuItem",      benchMenuItem,      10000),
+    ("DirectTabbedFrame",   benchTabbedFrame,   1000),
+]
+
+
+#
+# IMPORT TIME
+#
+# statements whose import time gets measured in a fresh interpreter
+IMPORTS = [
+    "import DirectGuiExtension",
+    "from DirectGuiExtension import DirectGui",
+    "from DirectGuiExtension.DirectAccordion import DirectAccordion",
+    "from DirectGuiExtension.DirectAutoSizer import DirectAutoSizer",
+    "from DirectGuiExtension.DirectBoxSizer import DirectBoxSizer",
+    "from DirectGuiExtension.DirectCollapsibleFrame import DirectCollapsibleFrame",
+    "from DirectGuiExtension.DirectDatePicker import DirectDatePicker",
+    "from DirectGuiExtension.DirectDiagram import DirectDiagram",
+    "from DirectGuiExtension.DirectGridSizer import DirectGridSizer",
+    "from DirectGuiExtension.DirectMenuBar import DirectMenuBar",
+    "from DirectGuiExtension.DirectMenuItem import DirectMenuItem",
+    "from DirectGuiExtension.DirectMultiSplitFrame import DirectMultiSplitFrame",
+    "from DirectGuiExtension.DirectOptionMenu import DirectOptionMenu",
+    "from DirectGuiExtension.DirectScrolledWindowFrame import DirectScrolledWindowFrame",
+    "from DirectGuiExtension.DirectSpinBox import DirectSpinBox",
+    "from DirectGuiExtension.DirectSplitFrame import DirectSplitFrame",
+    "from DirectGuiExtension.DirectTabbedFrame import DirectTabbedFrame",
+    "from DirectGuiExtension.DirectTooltip import DirectTooltip",
+    "from DirectGuiExtension.DirectTreeView import DirectTreeView",
+    "from DirectGuiExtension.DirectGui import *",
+]
+
+# the Panda3D modules every widget depends on. The package phase imports
+# them before the timing starts to only measure the package itself.
+IMPORT_BASE = "import panda3d.core, direct.gui.DirectFrame"
+
+IMPORT_SCRIPT = """
+import time
+{base}
+start = time.perf_counter()
+{statement}
+print(time.perf_counter() - start)
+"""
+
+def timeImport(statement, directory, base=""):
+    """
+    Returns the seconds the statement takes in a fresh interpreter started
+    in the given directory or None if it failed, e.g. when comparing with a
+    tree missing the module
+    """
+    process = subprocess.run(
+        [sys.executable, "-c", IMPORT_SCRIPT.format(base=base, statement=statement)],
+        cwd=directory,
+        stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+        universal_newlines=True)
+    if process.returncode != 0:
+        return None
+    return float(process.stdout.split()[-1])
+
+def runImportBenchmarks(args):
+    # time loading the cached bytecode like for an installed package, not
+    # compiling the sources. The bytecode is written for a temporary copy of
+    # the package to keep it out of the source tree.
+    import compileall
+    import shutil
+    import tempfile
+    with tempfile.TemporaryDirectory() as directory:
+        package = os.path.join(directory, "DirectGuiExtension")
+        shutil.copytree(
+            os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                "DirectGuiExtension"),
+            package, ignore=shutil.ignore_patterns("__pycache__"))
+        compileall.compile_dir(package, quiet=1)
+        results = timeImports(args, directory)
+    return writeResults(results, args)
+
+def timeImports(args, directory):
+    """Time all import statements with the package found in the directory"""
+    results = {}
+    for statement in IMPORTS:
+        # keep the best time of every phase over all repeats
+        best = {}
+        for i in range(args.repeat):
+            phases = {
+                "cold": timeImport(statement, directory),
+                "package": timeImport(statement, directory, IMPORT_BASE),
+            }
+            if None in phases.values():
+                break
+            for phase, duration in phases.items():
+                best[phase] = min(duration, best.get(phase, duration))
+        if not best:
+            print("{:<80} failed".format(statement))
+            continue
+        # imports have no item count, store them like a single scale
+        results[statement] = {"0": best}
+        print("{:<80} {}".format(statement, "  ".join(
+            "{}={:.4f}s".format(phase, duration)
+            for phase, duration in best.items())))
+        sys.stdout.flush()
+    return results
+
+
+#
+# RUNNING
+#
+def setupShowBase(windowType):
+    """Start a ShowBase without a visible window"""
+    loadPrcFileData("", "window-type {}".format(windowType))
+    loadPrcFileData("", "audio-library-name null")
+    from direct.showbase.ShowBase import ShowBase
+    ShowBase()
+
+    global DGG, DirectFrame, DirectBoxSizer, DirectGridSizer, DirectAutoSizer
+    global DirectTreeView, DirectDiagram, DirectOptionMenu, DirectTabbedFrame
+    global DirectMenuItem, DirectMenuItemEntry
+    from direct.gui import DirectGuiGlobals as DGG
+    from direct.gui.DirectFrame import DirectFrame
+    from DirectGuiExtension.DirectBoxSizer import DirectBoxSizer
+    from DirectGuiExtension.DirectGridSizer import DirectGridSizer
+    from DirectGuiExtension.DirectAutoSizer import DirectAutoSizer
+    from DirectGuiExtension.DirectTreeView import DirectTreeView
+    from DirectGuiExtension.DirectDiagram import DirectDiagram
+    from DirectGuiExtension.DirectOptionMenu import DirectOptionMenu
+    from DirectGuiExtension.DirectTabbedFrame import DirectTabbedFrame
+    from DirectGuiExtension.DirectMenuItem import DirectMenuItem, DirectMenuItemEntry
+
+def runBenchmarks(args):
+    setupShowBase(args.window_type)
+    results = {}
+    for name, func, maxScale in BENCHMARKS:
+        if args.only and name not in args.only:
+            continue
+        results[name] = {}
+        for scale in args.scales:
+            if scale > maxScale and not args.no_limits:
+                continue
+            # keep the best time of every phase over all repeats
+            best = {}
+            for i in range(args.repeat):
+                timer = PhaseTimer()
+                func(scale, timer)
+                # let pending tasks run, e.g. delayed destruction
+                base.taskMgr.step()
+                for phase, duration in timer.results.items():
+                    best[phase] = min(duration, best.get(phase, duration))
+            results[name][str(scale)] = best
+            print("{:<20} {:>7} {}".format(name, scale, "  ".join(
+                "{}={:.4f}s".format(phase, duration)
+                for phase, duration in best.items())))
+            sys.stdout.flush()
+    return writeResults(results, args)
+
+def writeResults(results, args):
+    data = {
+        "meta": {
+            "time": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "python": platform.python_version(),
+            "panda3d": PandaSystem.getVersionString(),
+            "platform": platform.platform(),
+            "windowType": args.window_type,
+            "repeat": args.repeat,
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as outFile:
+            json.dump(data, outFile, indent=4)
+    return data
+
+def compareResults(oldFile, newFile, threshold, minDelta):
+    """
+    Print the changes between two result files and return the number of
+    regressions, that is phases which became slower than the threshold
+    allows and by more than minDelta seconds.
+    """
+    with open(oldFile) as f:
+        old = json.load(f)["results"]
+    with open(newFile) as f:
+        new = json.load(f)["results"]
+
+    regressions = 0
+    print("{:<20} {:>7} {:<12} {:>10} {:>10} {:>8}".format(
+        "widget", "items", "phase", "old", "new", "change"))
+    for name in sorted(set(old) & set(new)):
+        for scale in sorted(set(old[name]) & set(new[name]), key=int):
+            for phase in old[name][scale]:
+                if phase not in new[name][scale]:
+                    continue
+                oldTime = old[name][scale][phase]
+                newTime = new[name][scale][phase]
+                change = (newTime - oldTime) / oldTime if oldTime > 0 else 0
+                flag = ""
+                if change > threshold and newTime - oldTime > minDelta:
+                    flag = "REGRESSION"
+                    regressions += 1
+                elif change < -threshold and oldTime - newTime > minDelta:
+                    flag = "improved"
+                print("{:<20} {:>7} {:<12} {:>10.4f} {:>10.4f} {:>+7.0%} {}".format(
+                    name, scale, phase, oldTime, newTime, change, flag))
+    print("{} regression(s) found".format(regressions))
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Headless layout benchmarks for DirectGuiExtension")
+    parser.add_argument(
+        "--scales", type=int, nargs="+", default=[10, 100, 1000],
+        help="numbers of items to run every benchmark with")
+    parser.add_argument(
+        "--only", nargs="+", metavar="WIDGET",
+        help="only run the benchmarks of the given widgets")
+    parser.add_argument(
+        "--repeat", type=int, default=3,
+        help="runs per benchmark, the fastest one will be reported")
+    parser.add_argument(
+        "--no-limits", action="store_true",
+        help="run slow benchmarks at all scales too")
+    parser.add_argument(
+        "--window-type", default="offscreen", choices=["none", "offscreen"],
+        help="use no window at all or render into an offscreen buffer")
+    parser.add_argument(
+        "--output", "-o",
+        help="JSON file to write the results to")
+    parser.add_argument(
+        "--imports", action="store_true",
+        help="measure the import time of the package modules instead")
+    parser.add_argument(
+        "--compare", nargs=2, metavar=("OLD", "NEW"),
+        help="compare two result files instead of running the benchmarks")
+    parser.add_argument(
+        "--threshold", type=float, default=0.1,
+        help="relative slowdown that counts as regression in compare mode")
+    parser.add_argument(
+        "--min-delta", type=float, default=0.001,
+        help="ignore changes smaller than this many seconds in compare mode")
+    args = parser.parse_args()
+
+    if args.compare:
+        regressions = compareResults(
+            args.compare[0], args.compare[1], args.threshold, args.min_delta)
+        sys.exit(1 if regressions else 0)
+    if args.imports:
+        runImportBenchmarks(args)
+    else:
+        runBenchmarks(args)
+
+if __name__ == "__main__":
+    main()
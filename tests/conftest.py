@@ -0,0 +1,9 @@
+import pytest
+
+from DirectGuiExtension.DirectGuiTestHarness import startHeadless
+
+
+@pytest.fixture(scope='session', autouse=True)
+def base():
+    """One headless ShowBase with a fixed frame time for all tests"""
+    return startHeadless()
@@ -0,0 +1,33 @@
+import time
+
+import pytest
+
+from DirectGuiExtension import DirectGuiAssets
+from DirectGuiExtension.DirectGuiTestHarness import step
+
+
+def waitFor(calls):
+    for i in range(500):
+        if calls:
+            return
+        step()
+        time.sleep(0.001)
+    raise AssertionError('preload did not finish')
+
+@pytest.mark.parametrize('fonts, textures', [
+    (['/nonexistent.egg'], []),
+    (['/nonexistent.ttf'], ['/nonexistent.png'])])
+def test_preload_reports_done_on_missing_files(fonts, textures):
+    calls = []
+    DirectGuiAssets.preload(fonts, textures, calls.append, ['done'])
+    waitFor(calls)
+    assert calls == ['done']
+    assert not any(DirectGuiAssets.isLoaded(path) for path in fonts + textures)
+
+def test_preload_bundled_assets():
+    DirectGuiAssets.clear()
+    calls = []
+    DirectGuiAssets.preload(callback=calls.append, extraArgs=['done'])
+    waitFor(calls)
+    assert calls == ['done']
+    assert DirectGuiAssets.isLoaded(DirectGuiAssets.getDataPath('icons/plusnode.gif'))
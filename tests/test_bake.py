@@ -0,0 +1,59 @@
+from direct.gui.DirectButton import DirectButton
+from direct.gui.DirectLabel import DirectLabel
+from direct.gui.DirectScrolledFrame import DirectScrolledFrame
+from DirectGuiExtension.DirectBoxSizer import DirectBoxSizer
+from DirectGuiExtension.DirectGridSizer import DirectGridSizer
+from DirectGuiExtension.DirectGuiTestHarness import step
+
+
+def getGeomCount(nodePath):
+    return sum(
+        geomNode.node().getNumGeoms()
+        for geomNode in nodePath.findAllMatches('**/+GeomNode'))
+
+def test_bake_grid():
+    grid = DirectGridSizer(numRows=4, numColumns=5)
+    for i in range(20):
+        grid.addItem(DirectLabel(text='L{}'.format(i), scale=0.05), i // 5, i % 5)
+    grid['bake'] = True
+    assert grid.bakedNode is None
+    step()
+    assert grid.bakedNode is not None
+    assert len(grid.bakedStateDefs) == 20
+    assert all(stateDef.isHidden() for stateDef in grid.bakedStateDefs)
+    # frames and texts end up in one geom per layer
+    assert getGeomCount(grid.bakedNode) <= 3
+
+    stateDefs = grid.bakedStateDefs
+    grid['bake'] = False
+    assert grid.bakedNode is None
+    assert not any(stateDef.isHidden() for stateDef in stateDefs)
+    grid.destroy()
+
+def test_layout_change_bakes_again():
+    sizer = DirectBoxSizer(bake=True)
+    sizer.addItem(DirectLabel(text='first', scale=0.05))
+    step()
+    assert sizer.bakedNode is not None
+    sizer.addItem(DirectLabel(text='second', scale=0.05))
+    # restored right away, baked on the next frame
+    assert sizer.bakedNode is None
+    step()
+    assert len(sizer.bakedStateDefs) == 2
+    sizer.destroy()
+
+def test_interactive_widgets_are_not_baked():
+    sizer = DirectBoxSizer()
+    label = DirectLabel(text='label', scale=0.05)
+    sizer.addItem(label)
+    sizer.addItem(DirectButton(text='button', scale=0.05))
+    scrolledFrame = DirectScrolledFrame(
+        frameSize=(-0.5, 0.5, -0.25, 0.25), canvasSize=(-0.5, 0.5, -2, 0.25))
+    DirectLabel(parent=scrolledFrame.getCanvas(), text='clipped', scale=0.1, pos=(0, 0, -1.5))
+    sizer.addItem(scrolledFrame)
+    sizer.bake()
+    # only the plain label, not the button or the scrolled canvas content
+    assert len(sizer.bakedStateDefs) == 1
+    bottom = sizer.bakedNode.getTightBounds(sizer)[0][2]
+    assert bottom >= sizer['frameSize'][2] - 1e-4
+    sizer.destroy()
@@ -0,0 +1,67 @@
+import pytest
+
+from direct.gui import DirectGuiGlobals as DGG
+from direct.gui.DirectFrame import DirectFrame
+from DirectGuiExtension.DirectBoxSizer import DirectBoxSizer
+
+
+def getPositions(sizer):
+    return [tuple(item.element.getPos()) for item in sizer['items']]
+
+def test_wrap_onto_new_lines():
+    sizer = DirectBoxSizer(wrap=True, wrapSize=0.5)
+    for i in range(5):
+        sizer.addItem(DirectFrame(frameSize=(0, 0.2, 0, 0.1)))
+    positions = getPositions(sizer)
+    # two items per line, three lines
+    assert [round(x, 4) for x, y, z in positions] == [0, 0.2, 0, 0.2, 0]
+    assert positions[0][2] == positions[1][2]
+    assert positions[2][2] == positions[3][2] == pytest.approx(positions[0][2] - 0.1)
+    assert positions[4][2] == pytest.approx(positions[0][2] - 0.2)
+    assert sizer['frameSize'][1] == pytest.approx(0.5)
+    sizer.destroy()
+
+def test_vertical_wrap():
+    sizer = DirectBoxSizer(orientation=DGG.VERTICAL, wrap=True, wrapSize=0.25)
+    for i in range(4):
+        sizer.addItem(DirectFrame(frameSize=(0, 0.2, 0, 0.1)))
+    xs = sorted(set(round(x, 4) for x, y, z in getPositions(sizer)))
+    assert len(xs) == 2
+    sizer.destroy()
+
+def test_grow_distributes_free_space():
+    sizer = DirectBoxSizer(frameSize=(0, 1, 0, 0.1), autoUpdateFrameSize=False)
+    frames = [DirectFrame(frameSize=(0, 0.1, 0, 0.1)) for i in range(3)]
+    sizer.addItem(frames[0], grow=1)
+    sizer.addItem(frames[1], grow=3)
+    sizer.addItem(frames[2])
+    widths = [frame['frameSize'][1] - frame['frameSize'][0] for frame in frames]
+    # 0.7 of free space split by 1:3
+    assert widths == pytest.approx([0.275, 0.625, 0.1])
+    sizer.destroy()
+
+def test_shrink_takes_missing_space():
+    sizer = DirectBoxSizer(frameSize=(0, 0.2, 0, 0.1), autoUpdateFrameSize=False)
+    frames = [DirectFrame(frameSize=(0, 0.1, 0, 0.1)) for i in range(3)]
+    for frame in frames:
+        sizer.addItem(frame, shrink=1)
+    widths = [frame['frameSize'][1] - frame['frameSize'][0] for frame in frames]
+    assert widths == pytest.approx([0.2 / 3] * 3)
+
+    # items get their original size back once there is enough space
+    sizer['frameSize'] = (0, 1, 0, 0.1)
+    sizer.refresh()
+    widths = [frame['frameSize'][1] - frame['frameSize'][0] for frame in frames]
+    assert widths == pytest.approx([0.1] * 3)
+    sizer.destroy()
+
+def test_grow_vertical_scaled_item():
+    sizer = DirectBoxSizer(
+        orientation=DGG.VERTICAL, frameSize=(0, 0.1, -1, 0), autoUpdateFrameSize=False)
+    # vertical sizes are measured with the second scale component
+    frame = DirectFrame(frameSize=(0, 0.1, 0, 0.1), scale=(1, 0.5, 0.25))
+    sizer.addItem(frame, grow=1)
+    sizer.addItem(DirectFrame(frameSize=(0, 0.1, 0, 0.1)))
+    fs = frame['frameSize']
+    assert (fs[3] - fs[2]) * 0.5 == pytest.approx(0.9)
+    sizer.destroy()
@@ -0,0 +1,12 @@
+from direct.gui.DirectGuiBase import DirectGuiWidget
+from direct.gui.DirectLabel import DirectLabel
+from DirectGuiExtension.DirectCollapsibleFrame import DirectCollapsibleFrame
+
+
+def test_destroy_stashed_content():
+    frame = DirectCollapsibleFrame(collapseMode=DirectCollapsibleFrame.CM_Stash)
+    label = DirectLabel(parent=frame, text='content', scale=0.05)
+    frame.toggleCollapsed()
+    assert label.getParent() == frame.contentNode
+    frame.destroy()
+    assert label.guiId not in DirectGuiWidget.guiDict
@@ -0,0 +1,31 @@
+import datetime
+
+from DirectGuiExtension.DirectDatePicker import DirectDatePicker, DirectDatePickerPool
+
+
+def test_range_accepts_its_own_result():
+    picker = DirectDatePicker(selectionMode='range')
+    picker.setDate(datetime.date(2024, 3, 5))
+    picker.setRange(datetime.date(2024, 3, 9), datetime.date(2024, 3, 3))
+    start, end = picker.getRange()
+    assert (start.day, end.day) == (3, 9)
+    picker.setRange(*picker.getRange())
+    assert picker.getRange() == (start, end)
+    picker.destroy()
+
+def test_pool_shows_given_range_in_range_mode():
+    pool = DirectDatePickerPool()
+    picker = pool.acquire(
+        rangeStart=datetime.datetime(2024, 3, 3),
+        rangeEnd=datetime.datetime(2024, 3, 9))
+    assert picker['selectionMode'] == 'range'
+    assert picker.getRange() == (
+        datetime.datetime(2024, 3, 3), datetime.datetime(2024, 3, 9))
+    pool.release(picker)
+
+    # the released picker is reused without the range
+    reused = pool.acquire(date=datetime.date(2024, 3, 5))
+    assert reused is picker
+    assert reused['selectionMode'] == 'single'
+    assert reused.getRange() is None
+    pool.destroy()
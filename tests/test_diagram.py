@@ -0,0 +1,67 @@
+import time
+
+import pytest
+
+from DirectGuiExtension.DirectDiagram import DirectDiagram
+from DirectGuiExtension.DirectGuiTestHarness import step
+
+
+def getGeoms(diagram):
+    return [entry[1] for entry in diagram.seriesGeoms]
+
+def getNumVertices(diagram):
+    return [geom.getPrimitive(0).getNumVertices() for geom in getGeoms(diagram)]
+
+def waitForRefresh(diagram):
+    for i in range(500):
+        if not diagram.refreshRunning:
+            return
+        step()
+        time.sleep(0.001)
+    raise AssertionError('threaded refresh did not finish')
+
+@pytest.mark.parametrize('chartType, verticesPerValue', [
+    ('bar', 6), ('stackedBar', 6), ('scatter', 1)])
+def test_chart_types(chartType, verticesPerValue):
+    diagram = DirectDiagram(data=[[1, -2, 3], [2, 1, -1]], chartType=chartType)
+    assert getNumVertices(diagram) == [3 * verticesPerValue] * 2
+    geoms = getGeoms(diagram)
+    # the geoms are updated in place
+    diagram['data'] = [[1, 2, 3, 4], [1, 2, 3, 4]]
+    assert getNumVertices(diagram) == [4 * verticesPerValue] * 2
+    assert geoms == getGeoms(diagram)
+    diagram.destroy()
+
+def test_area_is_split_at_the_center_line():
+    diagram = DirectDiagram(data=[1, -1, -2], chartType='area')
+    # one triangle on each side of the crossing and a quad after it
+    assert getNumVertices(diagram) == [12]
+    diagram.destroy()
+
+def test_line_chart_keeps_line_node_path():
+    diagram = DirectDiagram(data=[1, 2, 3])
+    assert diagram.seriesGeoms == []
+    assert diagram.lines.getNumVertices() == 4
+    diagram.destroy()
+
+def test_threaded_refresh():
+    diagram = DirectDiagram(data=[1, 2], chartType='bar', threadedRefresh=True)
+    waitForRefresh(diagram)
+    assert getNumVertices(diagram) == [12]
+    diagram['data'] = [1, 2, 3]
+    # the old data is shown until the prepared one got swapped in
+    assert getNumVertices(diagram) == [12]
+    waitForRefresh(diagram)
+    assert getNumVertices(diagram) == [18]
+    diagram.destroy()
+
+def test_stale_threaded_result_is_dropped():
+    diagram = DirectDiagram(data=[1, 2, 3], chartType='bar', threadedRefresh=True)
+    waitForRefresh(diagram)
+    diagram['data'] = [5, 5, 5, 5]
+    diagram['threadedRefresh'] = False
+    diagram['data'] = [1]
+    waitForRefresh(diagram)
+    step(5)
+    assert getNumVertices(diagram) == [6]
+    diagram.destroy()
@@ -0,0 +1,25 @@
+"""
+Check the layout of the scenes of the test harness against the snapshots
+stored in layout.json. After an intended layout change, record them again:
+
+    python -m DirectGuiExtension.DirectGuiTestHarness --record tests/layout.json
+"""
+import json
+import os
+
+import pytest
+
+from DirectGuiExtension.DirectGuiTestHarness import SCENES, compareSnapshots, snapshotScenes
+
+SNAPSHOT_FILE = os.path.join(os.path.dirname(__file__), 'layout.json')
+
+
+@pytest.fixture(scope='module')
+def expected():
+    with open(SNAPSHOT_FILE) as f:
+        return json.load(f)
+
+@pytest.mark.parametrize('name', list(SCENES))
+def test_scene_layout(expected, name):
+    actual = snapshotScenes([name])[name]
+    assert compareSnapshots(expected[name], actual) == []
@@ -0,0 +1,50 @@
+from panda3d.core import ButtonThrower, NodePath
+from DirectGuiExtension.DirectMenuBar import DirectMenuBar
+from DirectGuiExtension.DirectMenuItem import DirectMenuItem, DirectMenuItemEntry
+
+
+def test_shared_shortcut_survives_reindex():
+    calls = []
+    fileMenu = DirectMenuItem(text='File', items=[
+        DirectMenuItemEntry('Save', calls.append, ['save'], shortcut='control-s')])
+    editMenu = DirectMenuItem(text='Edit', items=[
+        DirectMenuItemEntry('Store', calls.append, ['store'], shortcut='control-s')])
+    menuBar = DirectMenuBar(menuItems=[fileMenu, editMenu])
+    messenger.send('control-s')
+    assert calls == ['store']
+
+    editMenu['items'] = [DirectMenuItemEntry('Other', calls.append, ['other'])]
+    menuBar.indexMenuItem(editMenu)
+    messenger.send('control-s')
+    assert calls == ['store', 'save']
+    assert menuBar.findShortcut('control-s').text == 'Save'
+    menuBar.destroy()
+
+def test_keystroke_event_is_restored_on_close(monkeypatch):
+    # headless there is no button thrower
+    buttonThrower = ButtonThrower('buttons')
+    monkeypatch.setattr(base, 'buttonThrowers', [NodePath(buttonThrower)])
+    fileMenu = DirectMenuItem(text='File', items=[DirectMenuItemEntry('Quit', print)])
+    menuBar = DirectMenuBar(menuItems=[fileMenu])
+    menuBar.showPopupMenuItem(fileMenu)
+    assert buttonThrower.getKeystrokeEvent() == 'keystroke'
+    menuBar.hidePopupMenu(fileMenu)
+    assert buttonThrower.getKeystrokeEvent() == ''
+
+    # destroyed while a menu is open
+    menuBar.showPopupMenuItem(fileMenu)
+    menuBar.destroy()
+    assert buttonThrower.getKeystrokeEvent() == ''
+
+def test_shared_mnemonic_survives_reindex():
+    fileMenu = DirectMenuItem(text='File', items=[DirectMenuItemEntry('Quit', print)])
+    formatMenu = DirectMenuItem(text='Format', items=[DirectMenuItemEntry('Bold', print)])
+    menuBar = DirectMenuBar(menuItems=[fileMenu, formatMenu])
+    assert menuBar.mnemonicIndex['f'] is formatMenu
+
+    formatMenu['text'] = 'Style'
+    menuBar.indexMenuItem(formatMenu)
+    assert menuBar.mnemonicIndex['f'] is fileMenu
+    messenger.send('alt-f')
+    assert menuBar.selected_menu_item is fileMenu
+    menuBar.destroy()
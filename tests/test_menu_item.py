@@ -0,0 +1,97 @@
+import pytest
+
+from direct.gui import DirectGuiGlobals as DGG
+from DirectGuiExtension.DirectGuiTestHarness import FakeMouseWatcher, step
+from DirectGuiExtension.DirectMenuItem import (
+    DirectMenuItem, DirectMenuItemEntry, DirectMenuItemSubMenu, menuController)
+
+
+@pytest.fixture
+def mouse():
+    mouse = FakeMouseWatcher()
+    mouse.install()
+    yield mouse
+    mouse.uninstall()
+
+def getItemWidgets(menu):
+    """Returns the widgets of the popup menu of the given menu item"""
+    return [item.element for item in menu.popupMenu['items']]
+
+def createFileMenu(calls, **kw):
+    return DirectMenuItem(text='File', scale=0.1, items=[
+        DirectMenuItemSubMenu('Recent >', [
+            DirectMenuItemEntry('A', calls.append, ['A'])]),
+        DirectMenuItemEntry('Quit', calls.append, ['Quit'])], **kw)
+
+def test_sub_menu_popup_is_built_on_first_use():
+    menu = createFileMenu([])
+    menu.showPopupMenu()
+    assert len(getItemWidgets(menu)) == 2
+    subMenu = getItemWidgets(menu)[0]
+    assert subMenu.popupMenu is None
+    subMenu.showPopupMenu()
+    assert len(getItemWidgets(subMenu)) == 1
+    menu.destroy()
+
+def test_destroy_before_eviction():
+    menu = createFileMenu([])
+    menu.showPopupMenu()
+    subMenu = getItemWidgets(menu)[0]
+    subMenu['subMenuEvictDelay'] = 0.1
+    subMenu.showPopupMenu()
+    subMenu.hidePopupMenu()
+    menu.destroy()
+    step(20)
+
+def test_hovered_sub_menu_opens_after_delay(mouse):
+    menu = createFileMenu([])
+    menu.showPopupMenu()
+    subMenu = getItemWidgets(menu)[0]
+    mouse.enter(subMenu)
+    assert subMenu.popupMenu is None
+    step(int(menu['subMenuDelay'] * 60) + 2)
+    assert subMenu.popupMenu is not None
+    assert not subMenu.popupMenu.isHidden()
+
+    # leaving it for another item closes it again
+    mouse.exit(subMenu)
+    mouse.enter(getItemWidgets(menu)[1])
+    step(int(menu['subMenuDelay'] * 60) + 2)
+    assert subMenu.popupMenu.isHidden()
+    menu.destroy()
+
+def test_destroy_while_hovered(mouse):
+    menu = createFileMenu([])
+    menu.showPopupMenu()
+    subMenu = getItemWidgets(menu)[0]
+    mouse.enter(subMenu)
+    menu.destroy()
+    # the pending sub menu update must not touch the destroyed menus
+    step(int(0.5 * 60))
+    assert menuController.hoverMenu is None
+    assert menuController.hoverItem is None
+    assert not menuController.pendingSubMenus
+    assert not menuController.openSubMenus
+
+@pytest.mark.parametrize('lazyItems', [False, True])
+def test_group_options_apply_to_all_items(lazyItems):
+    menu = createFileMenu(
+        [], lazyItems=lazyItems, item_relief=DGG.RIDGE,
+        item_frameColor=(1, 0, 0, 1), popupMenu_frameColor=(0, 1, 0, 1))
+    menu.showPopupMenu()
+    menu.insertItem(1, DirectMenuItemEntry('Save', print))
+    for widget in getItemWidgets(menu):
+        assert widget['relief'] == DGG.RIDGE
+        assert widget['frameColor'] == (1, 0, 0, 1)
+    assert menu.popupMenu['frameColor'] == (0, 1, 0, 1)
+    menu.destroy()
+
+def test_remove_unknown_item():
+    menu = createFileMenu([])
+    items = menu['items']
+    menu.removeItem(DirectMenuItemEntry('Other', print))
+    menu.updateItem(DirectMenuItemEntry('Other', print), items[0])
+    assert menu['items'] == items
+    menu.removeItem(items[0])
+    assert menu['items'] == items[1:]
+    menu.destroy()
@@ -0,0 +1,40 @@
+import pytest
+
+from direct.gui import DirectGuiGlobals as DGG
+from direct.showbase.DirectObject import DirectObject
+from DirectGuiExtension.DirectGuiTestHarness import FakeMouseWatcher, step
+from DirectGuiExtension.DirectMultiSplitFrame import (
+    DirectMultiSplitFrame, DirectSplitGroup, DirectSplitPane)
+
+
+@pytest.fixture
+def mouse():
+    mouse = FakeMouseWatcher()
+    mouse.install()
+    yield mouse
+    mouse.uninstall()
+
+def test_drag_beyond_limit_does_not_relayout(mouse):
+    updates = []
+    frame = DirectMultiSplitFrame(
+        frameSize=(-1, 1, -1, 1),
+        layout=DirectSplitGroup(DGG.HORIZONTAL, [
+            DirectSplitPane('a', maxSize=0.5), DirectSplitPane('b')]))
+    listener = DirectObject()
+    listener.accept(frame.uniqueName('update-size'), updates.append, [True])
+    splitter = frame.rootNode.splitters[0]
+    mouse.press(splitter)
+    for x in (-0.6, -0.5):
+        mouse.moveMouse(x, 0)
+        step()
+    assert len(updates) == 2
+
+    # the pane stays at its limit while the mouse moves on
+    for x in (-0.3, -0.15, 0, 0.15):
+        mouse.moveMouse(x, 0)
+        step()
+    assert len(updates) == 3
+    assert frame.panes['a']['frameSize'][1] * 2 == pytest.approx(0.5)
+    mouse.release(splitter)
+    listener.ignoreAll()
+    frame.destroy()
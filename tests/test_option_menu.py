@@ -0,0 +1,59 @@
+import pytest
+
+from panda3d.core import ButtonThrower, NodePath
+from DirectGuiExtension.DirectOptionMenu import DirectOptionMenu
+
+
+def test_filter_is_reset_on_close():
+    menu = DirectOptionMenu(items=['item {}'.format(i) for i in range(30)], scale=0.05)
+    menu.set(12)
+    menu.showPopupMenu()
+    z = menu.popupMenu.getZ()
+    menu.hidePopupMenu()
+
+    menu.setFilter('2')
+    menu.hidePopupMenu()
+    assert menu.filteredIndices is None
+    menu.showPopupMenu()
+    assert menu.popupMenu.getZ() == pytest.approx(z)
+    menu.hidePopupMenu()
+    menu.destroy()
+
+def test_keystroke_event_is_restored_on_close(monkeypatch):
+    # headless there is no button thrower
+    buttonThrower = ButtonThrower('buttons')
+    monkeypatch.setattr(base, 'buttonThrowers', [NodePath(buttonThrower)])
+    menu = DirectOptionMenu(items=['a', 'b', 'c'], typeAhead=True)
+    menu.showPopupMenu()
+    assert buttonThrower.getKeystrokeEvent() == 'keystroke'
+    messenger.send('keystroke', ['b'])
+    assert menu.highlightedIndex == 1
+    menu.hidePopupMenu()
+    assert buttonThrower.getKeystrokeEvent() == ''
+
+    # keep the event an application has set up itself
+    buttonThrower.setKeystrokeEvent('typed')
+    menu.showPopupMenu()
+    menu.hidePopupMenu()
+    assert buttonThrower.getKeystrokeEvent() == 'typed'
+    menu.destroy()
+
+@pytest.mark.parametrize('virtualized', [False, True])
+def test_highlight_filtered_item(virtualized):
+    items = ['item {}'.format(i) for i in range(30)]
+    menu = DirectOptionMenu(
+        items=items, scale=0.05, virtualized=virtualized, numVisibleItems=5)
+    menu.showPopupMenu()
+    menu.setFilter('2')
+    # item 2, 12 and 20 to 29 are left
+    menu.highlightIndex(25)
+    assert menu.highlightedIndex == 25
+    assert menu.highlightedButton['text'] == 'item 25'
+    if not virtualized:
+        # the highlighted row is lined up with the button
+        assert menu.highlightedButton.getZ(menu) == pytest.approx(0, abs=1e-4)
+    # items that are filtered out can't be highlighted
+    menu.highlightIndex(3)
+    assert menu.highlightedIndex == 25
+    menu.hidePopupMenu()
+    menu.destroy()
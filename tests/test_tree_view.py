@@ -0,0 +1,30 @@
+import pytest
+
+from DirectGuiExtension.DirectTreeView import DirectTreeView
+
+TREE = {'root {}'.format(i): {'child {}'.format(j): None for j in range(3)} for i in range(4)}
+
+
+def getRows(treeView):
+    return [(item.element['frameSize'], item.element.getZ()) for item in treeView['items']]
+
+def test_batched_text_keeps_layout():
+    treeView = DirectTreeView(tree=TREE)
+    expected = getRows(treeView)
+    treeView.destroy()
+
+    treeView = DirectTreeView(tree=TREE, batchText=True)
+    actual = getRows(treeView)
+    assert len(actual) == len(expected) == 16
+    for (frameA, zA), (frameB, zB) in zip(expected, actual):
+        assert frameB == pytest.approx(frameA, abs=1e-3)
+        assert zB == pytest.approx(zA, abs=1e-3)
+    assert len(treeView.textPages) == 1
+    treeView.destroy()
+
+def test_refresh_reuses_row_widgets():
+    treeView = DirectTreeView(tree=TREE)
+    rows = [item.element for item in treeView['items']]
+    treeView.refreshTree()
+    assert sorted(map(id, rows)) == sorted(id(item.element) for item in treeView['items'])
+    treeView.destroy()
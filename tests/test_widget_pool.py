@@ -0,0 +1,61 @@
+import pytest
+
+from direct.gui.DirectButton import DirectButton
+from direct.gui.DirectFrame import DirectFrame
+from direct.gui.DirectLabel import DirectLabel
+from DirectGuiExtension.DirectWidgetPool import DirectWidgetPool
+
+
+def test_released_widget_is_reused():
+    pool = DirectWidgetPool()
+    label = pool.acquire(DirectLabel, text='a', scale=0.1, pos=(0, 0, 0))
+    assert pool.owns(label)
+    assert pool.release(label)
+    assert label.isHidden()
+    assert not pool.owns(label)
+
+    reused = pool.acquire(DirectLabel, text='b', scale=0.2, pos=(1, 0, 0))
+    assert reused is label
+    assert not reused.isHidden()
+    assert reused['text'] == 'b'
+    assert reused.getScale()[0] == pytest.approx(0.2)
+    assert reused.getX() == pytest.approx(1)
+    pool.destroy()
+
+def test_different_requests_get_different_widgets():
+    pool = DirectWidgetPool()
+    label = pool.acquire(DirectLabel, text='a')
+    pool.release(label)
+    # a different class, a different key and different option names
+    assert pool.acquire(DirectFrame) is not label
+    assert pool.acquire(DirectLabel, key='other', text='a') is not label
+    assert pool.acquire(DirectLabel, text='a', text_scale=0.1) is not label
+    assert pool.acquire(DirectLabel, text='a') is label
+    pool.destroy()
+
+def test_init_options_are_part_of_the_key():
+    pool = DirectWidgetPool()
+    button = pool.acquire(DirectButton, text='a', pressEffect=1)
+    pool.release(button)
+    assert pool.acquire(DirectButton, text='a', pressEffect=0) is not button
+    assert pool.acquire(DirectButton, text='b', pressEffect=1) is button
+    pool.destroy()
+
+def test_release_of_foreign_widget():
+    pool = DirectWidgetPool()
+    label = DirectLabel(text='a')
+    assert not pool.release(label)
+    assert not label.isEmpty()
+    label.destroy()
+
+def test_max_free_widgets():
+    pool = DirectWidgetPool(maxFree=1)
+    first = pool.acquire(DirectFrame)
+    second = pool.acquire(DirectFrame)
+    pool.release(first)
+    pool.release(second)
+    assert pool.numFree == 1
+    assert not first.isEmpty()
+    assert second.isEmpty()
+    pool.destroy()
+    assert first.isEmpty()